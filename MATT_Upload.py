@@ -3,17 +3,81 @@ import pandas as pd
 import os
 
 from config import ENABLE_FIREWALL, FIREWALL_PASSCODE, DEVELOPER_MODE
-from scripts.process_matt import process_matt_data
+from scripts.ingest_jobs import ingest_matt_bytes, start_ingest_job, get_ingest_job, cancel_ingest_job
+from scripts.dataset_registry import get_dataset, get_session_dataset_id, set_session_dataset
+from scripts.snapshot_store import list_snapshot_dates, open_matt_snapshot
+from scripts.drop_folder import start_drop_folder_watcher, latest_dropped_export, drop_folder_errors
+from scripts.matt_schema import validate_matt_sample
+from scripts.matt_compression import UPLOAD_TYPES, open_matt_source
+from scripts.dimensions import dimension_key_conflicts
 
 # --- Set up the Streamlit page ---
 st.set_page_config(page_title="MATT Upload", layout="wide")
 st.title("MATT Report Upload Page")
 
-# --- Define required MATT headers for validation (same names, new positions) ---
-REQUIRED_COLUMNS = {
-    "DIV_CODE_DESC", "PROJECT", "BUYER_NAME", "COMMUNITY",
-    "PLAN_CODE", "SALE_DATE", "NHC_NAME", "SALES_CANCELLATION_DATE"
-}
+# --- Scheduled exports dropped into the data folder are ingested in the background ---
+start_drop_folder_watcher()
+
+# Session keys of the background ingest started from this page
+INGEST_JOB_KEY = 'matt_ingest_job'
+INGEST_FILE_KEY = 'matt_ingest_file'
+# Session key of the current upload's dataset while a past export is selected in MATT History
+HISTORY_RETURN_KEY = 'matt_history_return'
+
+# --- Use a dataset as the current upload, or keep it for when MATT History returns to the current upload ---
+def set_current_dataset(dataset_id: str) -> None:
+    if HISTORY_RETURN_KEY in st.session_state:
+        st.session_state[HISTORY_RETURN_KEY] = dataset_id
+    else:
+        set_session_dataset(dataset_id)
+
+# --- Check the header and first rows before handing the file to a background ingest ---
+def validate_matt_upload(raw_bytes: bytes) -> bool:
+    try:
+        source, _ = open_matt_source(raw_bytes)
+        validation = validate_matt_sample(source)
+    except (ValueError, OSError, EOFError) as e:
+        st.error(f"The uploaded file could not be opened. {e}")
+        return False
+    st.write("**Uploaded Columns:**", validation.columns)  # Debugging aid
+    for error in validation.errors:
+        st.error(error)
+    if validation.errors:
+        return False
+
+    for warning in validation.warnings:
+        st.warning(warning)
+    stored_dates = list_snapshot_dates()
+    if validation.as_of is not None and stored_dates and validation.as_of < stored_dates[-1]:
+        st.warning(
+            f"This MATT is as of {validation.as_of:%m/%d/%Y}, before the newest stored export "
+            f"({stored_dates[-1]:%m/%d/%Y}). Reports will use this older export."
+        )
+    return True
+
+# --- Forget the previous upload's job so its outcome is not shown for a rejected file ---
+def clear_ingest_job() -> None:
+    st.session_state.pop(INGEST_JOB_KEY, None)
+    st.session_state.pop(INGEST_FILE_KEY, None)
+
+# --- Poll a running ingest without rerunning the rest of the page ---
+@st.fragment(run_every=1.0)
+def show_ingest_progress(job_id: str) -> None:
+    job = get_ingest_job(job_id)
+    if job is None or job.status != 'running':
+        st.rerun()
+    st.progress(job.progress, text=f"{job.stage}... {job.progress:.0%}")
+    st.caption("Other pages keep using the previous MATT report until this one is ready.")
+    if not job.committed and st.button("Cancel", key="matt_ingest_cancel"):
+        cancel_ingest_job(job_id)
+
+# --- Report date values that did not match the expected MM/DD/YYYY format ---
+def show_date_parse_failures(df: pd.DataFrame) -> None:
+    failures = {col: count for col, count in df.attrs.get('date_parse_failures', {}).items() if count}
+    if failures:
+        st.warning("Some dates could not be parsed and were left blank: " + ", ".join(
+            f"{col} ({count:,})" for col, count in failures.items()
+        ))
 
 # --- Firewall logic to restrict access ---
 if ENABLE_FIREWALL and not st.session_state.get("authenticated"):
@@ -31,39 +95,90 @@ if ENABLE_FIREWALL and not st.session_state.get("authenticated"):
 if DEVELOPER_MODE:
     try:
         sample_path = os.path.join(os.path.dirname(__file__), 'data', 'Homesite Detail Data (MATT).csv')
-        df = pd.read_csv(sample_path, low_memory=False)
-        st.session_state['matt_raw'] = df
-        st.session_state['matt_processed'] = process_matt_data(df)
-        st.success("Latest MATT Report Loaded.")
+        with open(sample_path, 'rb') as f:
+            dataset_id, from_cache = ingest_matt_bytes(f.read())
+        set_current_dataset(dataset_id)
+        st.success("Latest MATT Report Loaded." + (" (from cache)" if from_cache else ""))
+        show_date_parse_failures(get_dataset(dataset_id))
     except Exception as e:
         st.error("Failed to load sample file. Please ensure 'Homesite Detail Data (MATT).csv' exists in the data folder.")
 
 # --- User file upload logic ---
 else:
-    st.markdown("""
+    st.markdown(f"""
     Upload the **raw MATT report CSV** as exported from the company data portal. Once uploaded,
     the file will be processed and available across all pages of the application.
+    Compressed exports ({', '.join('.' + file_type for file_type in UPLOAD_TYPES if file_type != 'csv')})
+    upload much faster and are decompressed while they are processed.
     """)
 
-    uploaded_file = st.file_uploader("Upload MATT Report CSV", type="csv")
+    uploaded_file = st.file_uploader("Upload MATT Report CSV", type=UPLOAD_TYPES)
 
-    if uploaded_file is not None:
+    # Start one background ingest per uploaded file; reruns only poll it
+    if uploaded_file is not None and st.session_state.get(INGEST_FILE_KEY) != uploaded_file.file_id:
         try:
-            df = pd.read_csv(uploaded_file, low_memory=False)
-            st.write("**Uploaded Columns:**", list(df.columns))  # Debugging aid
-            normalized_cols = {col.strip() for col in df.columns}
-            missing_cols = REQUIRED_COLUMNS - normalized_cols
-            if missing_cols:
-                st.error("The uploaded file does not appear to be a valid MATT Report. Missing columns: " + ", ".join(missing_cols))
+            raw_bytes = uploaded_file.getvalue()
+            if validate_matt_upload(raw_bytes):
+                st.session_state[INGEST_JOB_KEY] = start_ingest_job(raw_bytes)
+                st.session_state[INGEST_FILE_KEY] = uploaded_file.file_id
             else:
-                st.session_state['matt_raw'] = df
-                st.session_state['matt_processed'] = process_matt_data(df)
-                st.success("MATT Report uploaded and processed successfully.")
+                clear_ingest_job()
         except Exception as e:
+            clear_ingest_job()
             st.error("Failed to read the uploaded file. Please ensure it is a valid CSV.")
             st.exception(e)
+
+    job = get_ingest_job(st.session_state.get(INGEST_JOB_KEY))
+    if job is None:
+        dropped = latest_dropped_export()
+        if uploaded_file is None and dropped is not None:
+            if get_session_dataset_id() is None:
+                set_current_dataset(dropped.dataset_id)
+            st.success(f"The latest MATT Report (as of {dropped.as_of:%m/%d/%Y}) is loaded. Upload a file to use a different one.")
+        elif uploaded_file is None:
+            st.warning("Please upload a file to proceed.")
+    elif job.status == 'running':
+        show_ingest_progress(job.job_id)
+    elif job.status == 'done':
+        if st.session_state.get(HISTORY_RETURN_KEY, get_session_dataset_id()) != job.dataset_id:
+            set_current_dataset(job.dataset_id)
+        st.success("MATT Report uploaded and processed successfully." + (" (from cache)" if job.from_cache else ""))
+        show_date_parse_failures(get_dataset(job.dataset_id))
+    elif job.status == 'cancelled':
+        st.info("Processing was cancelled. Reports keep using the previous MATT report.")
     else:
-        st.warning("Please upload a file to proceed.")
+        st.error("Failed to read the uploaded file. Please ensure it is a valid CSV.")
+        st.exception(job.error)
+
+    for path, error in drop_folder_errors().items():
+        st.warning(f"Drop folder file {os.path.basename(path)} was skipped. {error}")
+
+# --- Past MATT exports kept in the history store (time travel) ---
+snapshot_dates = list_snapshot_dates()
+if snapshot_dates:
+    st.subheader("MATT History")
+    history_options = ["Current upload"] + [f"{as_of:%m/%d/%Y}" for as_of in reversed(snapshot_dates)]
+    history_choice = st.selectbox("Run reports on the MATT as of", history_options, key="matt_history_as_of")
+    if history_choice != "Current upload":
+        dataset_id = open_matt_snapshot(pd.to_datetime(history_choice, format="%m/%d/%Y"))
+        if dataset_id is not None:
+            st.session_state.setdefault(HISTORY_RETURN_KEY, get_session_dataset_id())
+            set_session_dataset(dataset_id)
+            st.success(f"Reports now use the MATT as of {history_choice}.")
+        else:
+            st.error(f"The MATT as of {history_choice} could not be loaded from the history store.")
+    elif HISTORY_RETURN_KEY in st.session_state:
+        current_id = st.session_state.pop(HISTORY_RETURN_KEY)
+        if current_id is not None:
+            set_session_dataset(current_id)
+
+# --- Reference table checks (duplicated keys would otherwise multiply MATT rows) ---
+for table_name, conflicting_keys in dimension_key_conflicts().items():
+    if conflicting_keys:
+        st.warning(
+            f"{table_name} lists {len(conflicting_keys)} key(s) on multiple rows with different details; "
+            "the first row is used: " + ", ".join(str(key) for key in conflicting_keys)
+        )
 
 # --- Streamlit command to run this file locally ---
 # streamlit run MATT_Upload.py
@@ -6,3 +6,40 @@ FIREWALL_PASSCODE = "2025"
 
 # Toggle developer mode (automatically loads sample file)
 DEVELOPER_MODE = True
+
+# Processed MATT cache (Parquet files keyed by upload + Hub/Plan contents)
+ENABLE_CACHE = True
+CACHE_DIR = "data/cache"
+CACHE_MAX_MB = 500
+
+# CSV engine for MATT ingest: "pyarrow" (multi-threaded, falls back to pandas) or "pandas"
+CSV_ENGINE = "pyarrow"
+
+# Processed datasets kept in memory and shared by all sessions of a server process
+REGISTRY_MAX_DATASETS = 3
+
+# Write processed datasets as memory-mapped Arrow snapshots shared by all server processes
+ENABLE_ARROW_SNAPSHOTS = True
+
+# Memory bound for filtered row selections cached per (dataset, filters) across pages and sessions
+FILTER_CACHE_MAX_MB = 64
+
+# Keep every processed MATT export in a history store partitioned by its AS OF date
+ENABLE_SNAPSHOT_STORE = True
+SNAPSHOT_STORE_DIR = "data/history"
+# Newest exports kept in the history store; older AS OF dates are pruned (None keeps every export)
+SNAPSHOT_STORE_MAX_EXPORTS = 104
+
+# Reprocess only the homesites that changed since the stored export in effect on the upload's AS OF date
+ENABLE_DELTA_INGEST = True
+
+# Files larger than this are ingested in chunks of about this size (bounds peak ingest memory)
+INGEST_CHUNK_MB = 32
+
+# Watch a folder for scheduled MATT exports and ingest each new AS OF date in the background
+ENABLE_DROP_FOLDER = True
+DROP_FOLDER_DIR = "data"
+DROP_FOLDER_POLL_SECONDS = 60
+
+# Uploads whose AS OF date is older than this many days get a warning before processing (None skips the check)
+MATT_MAX_AGE_DAYS = 14
@@ -4,10 +4,19 @@ import plotly.express as px
 import plotly.graph_objects as go
 import datetime
 
+from scripts.process_matt import DOW_ORDER
+from scripts.dataset_registry import get_session_dataset
+from scripts.filters import apply_core_filters, apply_filter_spec, make_filter_spec
+from scripts.sales_cube import get_session_sales_cube, query_sales_cube
+from scripts.drop_folder import start_drop_folder_watcher
+
 # --- Page setup ---
 st.set_page_config(page_title="DOW Report", layout="wide")
 st.title("Day of Week (DOW) Sales Report")
 
+# --- Scheduled MATT exports are ingested in the background from the first page run ---
+start_drop_folder_watcher()
+
 # --- Custom CSS for multi-select filter tags ---
 st.markdown("""
     <style>
@@ -18,75 +27,29 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Check if processed MATT data is available in session ---
-uploaded = 'matt_processed' in st.session_state
-if not uploaded:
+df = get_session_dataset()
+if df is None:
     st.warning("Please upload a valid MATT report on the MATT Upload page.")
     st.stop()
 
-df = st.session_state['matt_processed']
-
 # --- Sidebar filters ---
-st.sidebar.header("Filters")
-
-# Division filter
-div_selection = st.sidebar.multiselect(
-    "Division",
-    options=df['DIV_CODE_DESC'].dropna().unique(),
-    default=["HB Dallas-Fort Worth"],
-    key="div_selection"
-)
-
-# Sale date range filter
 most_recent_sunday = datetime.date.today() - datetime.timedelta(days=datetime.date.today().weekday() + 1)
-sale_date_range = st.sidebar.date_input(
-    "Sale Date Range",
-    value=(datetime.date(2024, 9, 1), most_recent_sunday),
-    key="sale_date_range"
-)
-if isinstance(sale_date_range, tuple) and len(sale_date_range) == 2:
-    start_date = pd.to_datetime(sale_date_range[0])
-    end_date = pd.to_datetime(sale_date_range[1])
-else:
-    st.error("Invalid date range selection.")
-    st.stop()
-
-# Investor sale filter with default set to Retail
-investor_filter = st.sidebar.selectbox(
-    "Investor Sale",
-    options=["All", "Retail", "Investor"],
-    index=["All", "Retail", "Investor"].index("Retail"),
-    key="investor_filter"
-)
+filter_spec = apply_core_filters(df, "dow", datetime.date(2024, 9, 1), most_recent_sunday)
+investor_selection = dict(filter_spec.filters).get('Investor Sale')
 
-# Realtor/Direct filter
-cobroke_filter = st.sidebar.selectbox(
-    "Realtor/Direct",
-    options=["All", "Realtor", "Direct"],
-    index=["All", "Realtor", "Direct"].index("All"),
-    key="cobroke_filter"
-)
-
-# --- Apply filters to the dataset ---
-mask = df['DIV_CODE_DESC'].isin(div_selection)
-mask &= df['SALE_DATE'].between(pd.to_datetime(start_date), pd.to_datetime(end_date))
-if investor_filter != "All":
-    mask &= df['Investor Sale'] == investor_filter
-if cobroke_filter != "All":
-    mask &= df['Realtor/Direct'] == cobroke_filter
-filtered_df = df[mask].copy()
+# --- Apply filters to the pre-aggregated sales cube ---
+sales_cube = get_session_sales_cube()
+cube_filters = dict(filter_spec.filters)
+sale_start, sale_end = filter_spec.date_range('SALE_DATE')
 
 # --- Stop if no data available ---
-if filtered_df.empty or 'Weekday_Group' not in filtered_df.columns:
+dow_sales = query_sales_cube(sales_cube, ['DOW_Sale'], cube_filters, sale_start, sale_end)
+if dow_sales.empty:
     st.warning("No data available for the selected filters.")
     st.stop()
 
 # --- Waterfall chart: DOW Summary ---
-dow_summary = (
-    filtered_df.groupby('DOW_Sale')
-    .agg(Sales=('DOW_Sale', 'count'))
-    .reindex(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'])
-    .fillna(0)
-)
+dow_summary = dow_sales[['Sales']].reindex(DOW_ORDER).fillna(0)
 dow_summary['Sales %'] = 100 * dow_summary['Sales'] / dow_summary['Sales'].sum()
 dow_summary['Running %'] = dow_summary['Sales %'].cumsum()
 
@@ -117,8 +80,9 @@ fig_waterfall = go.Figure(go.Waterfall(
 fig_waterfall.update_layout(title='DOW Sales Distribution', title_font=dict(size=20), yaxis_title='% of Weekly Sales')
 
 # --- Monthly bar + line trend chart ---
-filtered_df['Sales_Month'] = filtered_df['SALE_DATE'].dt.to_period('M')
-dow_group = filtered_df.groupby(['Sales_Month', 'Weekday_Group']).size().unstack().fillna(0)
+monthly_sales = query_sales_cube(sales_cube, ['Sales_Month', 'Weekday_Group'], cube_filters, sale_start, sale_end)
+dow_group = monthly_sales['Sales'].unstack().fillna(0)
+dow_group.columns = dow_group.columns.astype(str)
 dow_group['M-F'] = dow_group.get('M-F', 0)
 dow_group['Sat-Sun'] = dow_group.get('Sat-Sun', 0)
 dow_group['Total'] = dow_group.sum(axis=1)
@@ -183,18 +147,15 @@ most_recent_monday = datetime.date.today() - datetime.timedelta(days=datetime.da
 week_start = st.date_input("Select Week Start Date", most_recent_monday)
 week_end = week_start + datetime.timedelta(days=6)
 
-# Filter sales data by date range first
-sales_week_df = df[df['SALE_DATE'].between(pd.to_datetime(week_start), pd.to_datetime(week_end))]
-
-# Apply existing investor sale filter if not "All"
-if investor_filter != "All":
-    sales_week_df = sales_week_df[sales_week_df['Investor Sale'] == investor_filter]
+# Filter sales data by week, plus the existing investor sale filter if not "All"
+week_filters = {'Investor Sale': investor_selection} if investor_selection else {}
+sales_week_df = apply_filter_spec(df, make_filter_spec(week_filters, {'SALE_DATE': (week_start, week_end)}))
 
 total_sales = sales_week_df.shape[0]
 st.subheader(f"Total Sales This Week: {total_sales}")
 
 if not sales_week_df.empty:
-    weekly_chart_data = sales_week_df.groupby(['SALE_DATE', 'Realtor/Direct']).size().reset_index(name='Homes Sold')
+    weekly_chart_data = sales_week_df.groupby(['SALE_DATE', 'Realtor/Direct'], observed=True).size().reset_index(name='Homes Sold')
     weekly_chart_data['DateLabel'] = weekly_chart_data['SALE_DATE'].dt.strftime('%A<br>%m/%d/%Y')
     weekly_chart_data.sort_values('SALE_DATE', inplace=True)
     date_order = weekly_chart_data['DateLabel'].unique().tolist()
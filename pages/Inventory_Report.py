@@ -6,11 +6,18 @@ import datetime
 import os
 
 from scripts.process_matt import color_map
+from scripts.dataset_registry import get_session_dataset
+from scripts.hierarchy_index import get_session_hierarchy, hierarchy_options
+from scripts.filters import apply_filter_spec, make_filter_spec
+from scripts.drop_folder import start_drop_folder_watcher
 
 # --- Set up the Streamlit page ---
 st.set_page_config(page_title="Inventory Report", layout="wide")
 st.title("Inventory Report")
 
+# --- Scheduled MATT exports are ingested in the background from the first page run ---
+start_drop_folder_watcher()
+
 # --- Apply custom styles for filter tags ---
 st.markdown("""
     <style>
@@ -21,13 +28,11 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Check for uploaded MATT data ---
-uploaded = 'matt_processed' in st.session_state
-if not uploaded:
+df = get_session_dataset()
+if df is None:
     st.warning("Please upload a valid MATT report on the MATT Upload page.")
     st.stop()
 
-df = st.session_state['matt_processed']
-
 # --- Sidebar filters ---
 with st.sidebar:
     st.header("Filters")
@@ -48,23 +53,24 @@ with st.sidebar:
     # Aggregation level (Hub, Community Name, Plan Name)
     agg_level = st.selectbox("Aggregation Level", ["Hub", "Community Name", "Plan Name"], index=0, key="inv_agg_level")
 
-    # Hub filter
-    all_hubs = sorted(df['Hub'].dropna().unique())
+    # Hub filter (options cascade from the dataset's Hub -> Community -> Collection -> Plan index)
+    hierarchy = get_session_hierarchy()
+    all_hubs = hierarchy_options(hierarchy, [])
     selected_hubs = st.multiselect("Hub", options=all_hubs, key="inv_hubs")
     hubs = all_hubs if not selected_hubs else selected_hubs
 
     # Community filter
-    community_options = sorted(df[df['Hub'].isin(hubs)]['Community Name'].dropna().unique())
+    community_options = hierarchy_options(hierarchy, [hubs])
     selected_communities = st.multiselect("Community Name", options=community_options, key="inv_communities")
     communities = community_options if not selected_communities else selected_communities
 
     # Collection filter
-    collection_options = sorted(df[df['Hub'].isin(hubs) & df['Community Name'].isin(communities)]['Collection'].dropna().unique())
+    collection_options = hierarchy_options(hierarchy, [hubs, communities])
     selected_collections = st.multiselect("Collection", options=collection_options, key="inv_collections")
     collections = collection_options if not selected_collections else selected_collections
 
     # Plan filter (only used if Plan Name is selected)
-    plan_options = sorted(df[df['Hub'].isin(hubs) & df['Community Name'].isin(communities) & df['Collection'].isin(collections)]['Plan Name'].dropna().unique())
+    plan_options = hierarchy_options(hierarchy, [hubs, communities, collections])
     selected_plans = st.multiselect("Plan Name", options=plan_options, key="inv_plans")
     plans = plan_options if not selected_plans else selected_plans
 
@@ -75,17 +81,15 @@ with st.sidebar:
         selected_statuses = all_statuses
 
 # --- Apply all filters ---
-filtered_df = df[
-    (df['EST_COE_DATE'] >= est_coe_start) &
-    (df['EST_COE_DATE'] <= est_coe_end) &
-    (df['HS_TYPE_LABEL'].isin(selected_statuses)) &
-    (df['Hub'].isin(hubs)) &
-    (df['Community Name'].isin(communities)) &
-    (df['Collection'].isin(collections))
-]
-
+filters = {
+    'HS_TYPE_LABEL': selected_statuses,
+    'Hub': hubs,
+    'Community Name': communities,
+    'Collection': collections
+}
 if agg_level == "Plan Name":
-    filtered_df = filtered_df[filtered_df['Plan Name'].isin(plans)]
+    filters['Plan Name'] = plans
+filtered_df = apply_filter_spec(df, make_filter_spec(filters, {'EST_COE_DATE': (est_coe_start, est_coe_end)}))
 
 # --- Create monthly summary pivot table ---
 summary_df = filtered_df.copy()
@@ -100,6 +104,7 @@ pivot = pd.pivot_table(
     columns='MonthYear',
     aggfunc='count',
     fill_value=0,
+    observed=True,
     margins=True,
     margins_name='Grand Total'
 ).rename_axis("Status")
@@ -129,11 +134,11 @@ else:
     group_col = ["Community Name", "Plan Name"]
 
 if isinstance(group_col, list):
-    chart_data = filtered_df.groupby(group_col + ['HS_TYPE_LABEL']).size().reset_index(name='Count')
-    chart_data['Label'] = chart_data['Plan Name'] + " (" + chart_data['Community Name'] + ")"
+    chart_data = filtered_df.groupby(group_col + ['HS_TYPE_LABEL'], observed=True).size().reset_index(name='Count')
+    chart_data['Label'] = chart_data['Plan Name'].astype(str) + " (" + chart_data['Community Name'].astype(str) + ")"
     x_col = 'Label'
 else:
-    chart_data = filtered_df.groupby([group_col, 'HS_TYPE_LABEL']).size().reset_index(name='Count')
+    chart_data = filtered_df.groupby([group_col, 'HS_TYPE_LABEL'], observed=True).size().reset_index(name='Count')
     x_col = group_col
 
 fig = go.Figure()
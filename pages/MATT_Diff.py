@@ -0,0 +1,90 @@
+import streamlit as st
+import pandas as pd
+
+from scripts.dataset_registry import get_dataset, get_dataset_index
+from scripts.snapshot_store import list_snapshot_dates, open_matt_snapshot
+from scripts.matt_diff import CHANGE_CATEGORIES, compare_matt_exports, status_transitions
+from scripts.drop_folder import start_drop_folder_watcher
+
+# --- Page setup ---
+st.set_page_config(page_title="MATT Changes", layout="wide")
+st.title("MATT Changes Between Exports")
+
+# --- Scheduled MATT exports are ingested in the background from the first page run ---
+start_drop_folder_watcher()
+
+# --- Custom CSS for multi-select tags ---
+st.markdown("""
+    <style>
+        .stMultiSelect [data-baseweb=\"tag\"] {
+            background-color: #1f77b4 !important;
+        }
+    </style>
+""", unsafe_allow_html=True)
+
+# --- Check for stored exports ---
+export_dates = list_snapshot_dates()
+if len(export_dates) < 2:
+    st.warning("Upload MATT reports with at least two different AS OF dates on the MATT Upload page to compare exports.")
+    st.stop()
+
+# --- Sidebar: exports to compare ---
+with st.sidebar:
+    st.header("Exports")
+    export_labels = [f"{as_of:%m/%d/%Y}" for as_of in reversed(export_dates)]
+    current_label = st.selectbox("Current Export (AS OF)", export_labels, index=0, key="diff_current_export")
+    previous_label = st.selectbox("Previous Export (AS OF)", export_labels, index=1, key="diff_previous_export")
+
+if current_label == previous_label:
+    st.warning("Select two different exports to compare.")
+    st.stop()
+
+current_id = open_matt_snapshot(pd.to_datetime(current_label, format="%m/%d/%Y"))
+previous_id = open_matt_snapshot(pd.to_datetime(previous_label, format="%m/%d/%Y"))
+previous_df = get_dataset(previous_id) if previous_id else None
+if current_id is None or previous_df is None:
+    st.error("The selected exports could not be loaded from the history store.")
+    st.stop()
+
+# --- Change sets (computed once per pair of exports and shared by all sessions) ---
+change_sets = get_dataset_index(
+    current_id, f"diff:{previous_id}", lambda current_df: compare_matt_exports(previous_df, current_df)
+)
+
+# --- Division filter ---
+with st.sidebar:
+    st.header("Filters")
+    all_divisions = sorted({div for changes in change_sets.values() for div in changes['DIV_CODE_DESC'].dropna().unique()})
+    divisions = st.multiselect("Division", options=all_divisions, key="diff_divisions") or all_divisions
+
+change_sets = {
+    category: changes[changes['DIV_CODE_DESC'].isin(divisions)]
+    for category, changes in change_sets.items()
+}
+
+# --- Summary counts ---
+st.markdown(f"Changes from the MATT as of **{previous_label}** to the MATT as of **{current_label}**.")
+for column, category in zip(st.columns(len(CHANGE_CATEGORIES)), CHANGE_CATEGORIES):
+    column.metric(category, f"{len(change_sets[category]):,}")
+
+# --- Homesite status transitions ---
+if not change_sets['Status Changes'].empty:
+    st.subheader("Status Transitions (Previous → Current)")
+    st.dataframe(status_transitions(change_sets['Status Changes']), use_container_width=True)
+
+# --- Change detail tables ---
+st.subheader("Change Detail")
+for tab, category in zip(st.tabs(CHANGE_CATEGORIES), CHANGE_CATEGORIES):
+    with tab:
+        changes = change_sets[category]
+        if changes.empty:
+            st.info(f"No {category.lower()} between these exports.")
+            continue
+        st.dataframe(changes.sort_values(['Hub', 'Community Name', 'HOMESITE']), use_container_width=True, hide_index=True)
+        st.download_button(
+            f"Download {category} (CSV)",
+            changes.to_csv(index=False).encode('utf-8'),
+            file_name=f"MATT {category} {previous_label.replace('/', '-')} to {current_label.replace('/', '-')}.csv",
+            mime="text/csv",
+            key=f"diff_download_{category}"
+        )
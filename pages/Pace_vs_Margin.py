@@ -4,11 +4,18 @@ import datetime
 import plotly.express as px
 
 from scripts.process_matt import compute_pace_vs_margin
+from scripts.dataset_registry import get_session_dataset
+from scripts.filters import apply_filter_spec, make_filter_spec, select_rows
+from scripts.status_timeline import get_session_status_timeline, take_timeline
+from scripts.drop_folder import start_drop_folder_watcher
 
 # --- Page setup ---
 st.set_page_config(page_title="Pace vs. Margin", layout="wide")
 st.title("Pace vs. Margin")
 
+# --- Scheduled MATT exports are ingested in the background from the first page run ---
+start_drop_folder_watcher()
+
 # --- Custom CSS for multi-select tags ---
 st.markdown("""
     <style>
@@ -19,13 +26,11 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Check for uploaded data ---
-uploaded = 'matt_processed' in st.session_state
-if not uploaded:
+matt_df = get_session_dataset()
+if matt_df is None:
     st.warning("Please upload a valid MATT report on the MATT Upload page.")
     st.stop()
 
-matt_df = st.session_state['matt_processed']
-
 # --- Sidebar filters ---
 with st.sidebar:
     st.header("Filters")
@@ -57,15 +62,15 @@ with st.sidebar:
         selected_communities = all_communities
 
 # --- Apply filters to MATT data ---
-matt_df = matt_df[
-    (matt_df['EST_COE_DATE'] >= est_coe_start) &
-    (matt_df['EST_COE_DATE'] <= est_coe_end) &
-    (matt_df['Hub'].isin(selected_hubs)) &
-    (matt_df['Community Name'].isin(selected_communities))
-].copy()
+filter_spec = make_filter_spec(
+    {'Hub': selected_hubs, 'Community Name': selected_communities},
+    {'EST_COE_DATE': (est_coe_start, est_coe_end)}
+)
+matt_df = apply_filter_spec(matt_df, filter_spec)
+timeline = take_timeline(get_session_status_timeline(), select_rows(filter_spec))
 
 # --- Calculate sales pace and break-even ---
-summary, slope = compute_pace_vs_margin(matt_df, target_date, est_coe_start, est_coe_end)
+summary, slope = compute_pace_vs_margin(matt_df, target_date, est_coe_start, est_coe_end, timeline)
 
 # --- Remove communities with no valid COE ---
 est_coe_col = 'EST_COE_DATE'
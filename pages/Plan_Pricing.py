@@ -4,12 +4,19 @@ import os
 import datetime
 import streamlit as st
 import plotly.graph_objects as go
-from scripts.process_matt import compute_plan_pricing
+from scripts.dataset_registry import get_session_dataset
+from scripts.filters import apply_core_filters
+from scripts.sales_cube import get_session_sales_cube, query_sales_cube, cube_plan_pricing
+from scripts.hierarchy_index import get_session_hierarchy, hierarchy_options
+from scripts.drop_folder import start_drop_folder_watcher
 
 # --- Page setup ---
 st.set_page_config(page_title="Plan Pricing", layout="wide")
 st.title("Plan Pricing Chart")
 
+# --- Scheduled MATT exports are ingested in the background from the first page run ---
+start_drop_folder_watcher()
+
 # --- Styling for multi-select tags ---
 st.markdown("""
     <style>
@@ -20,77 +27,63 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Ensure MATT data is loaded ---
-uploaded = 'matt_processed' in st.session_state
-if not uploaded:
+df = get_session_dataset()
+if df is None:
     st.warning("Please upload a valid MATT report on the MATT Upload page.")
     st.stop()
 
-df = st.session_state['matt_processed'].copy()
-
 # --- Sidebar Filters ---
-st.sidebar.header("Filters")
-
-# Division filter
-div_selection = st.sidebar.multiselect("Division", options=df['DIV_CODE_DESC'].dropna().unique(), default=["HB Dallas-Fort Worth"], key="div_selection")
-
-# Sale date range filter
-sale_date_range = st.sidebar.date_input("Sale Date Range", value=(datetime.date(2025, 4, 1), datetime.date.today() - datetime.timedelta(days=1)), key="sale_date_range")
+# Division, sale date range and investor sale filters
+filter_spec = apply_core_filters(
+    df, "plan", datetime.date(2025, 4, 1), datetime.date.today() - datetime.timedelta(days=1), realtor=False
+)
+start_date, end_date = filter_spec.date_range('SALE_DATE')
 
 # Aggregation level (Hub, Community Name, Plan Name)
 agg_level = st.sidebar.selectbox("Aggregation Level", ["Hub", "Community Name", "Plan Name"], index=0, key="plan_agg_level")
 group_col = agg_level
 
-# Validate and convert date range
-if isinstance(sale_date_range, tuple) and len(sale_date_range) == 2:
-    start_date = pd.to_datetime(sale_date_range[0])
-    end_date = pd.to_datetime(sale_date_range[1])
-else:
-    st.error("Invalid date range selection.")
-    st.stop()
-
-# Dynamic filter options
-
-# Date filtered base
-date_mask = df['SALE_DATE'].between(start_date, end_date)
+# Dynamic filter options (labels with a sale in the date range, from the hierarchy index)
+hierarchy = get_session_hierarchy()
+sale_window = dict(date_column='SALE_DATE', start=start_date, end=end_date)
 
 # Hub filter
-hub_options = sorted(df[date_mask]['Hub'].dropna().unique())
+hub_options = hierarchy_options(hierarchy, [], **sale_window)
 selected_hubs = st.sidebar.multiselect("Hub", options=hub_options, key="plan_hubs")
 hubs = hub_options if not selected_hubs else selected_hubs
 
 # Community filter
-community_options = sorted(df[date_mask & df['Hub'].isin(hubs)]['Community Name'].dropna().unique())
+community_options = hierarchy_options(hierarchy, [hubs], **sale_window)
 selected_communities = st.sidebar.multiselect("Community Name", options=community_options, key="plan_communities")
 communities = community_options if not selected_communities else selected_communities
 
 # Collection filter
-collection_options = sorted(df[date_mask & df['Hub'].isin(hubs) & df['Community Name'].isin(communities)]['Collection'].dropna().unique())
+collection_options = hierarchy_options(hierarchy, [hubs, communities], **sale_window)
 selected_collections = st.sidebar.multiselect("Collection", options=collection_options, key="plan_collections")
 collections = collection_options if not selected_collections else selected_collections
 
 # Plan filter
-plan_options = sorted(df[date_mask & df['Hub'].isin(hubs) & df['Community Name'].isin(communities) & df['Collection'].isin(collections)]['Plan Name'].dropna().unique())
+plan_options = hierarchy_options(hierarchy, [hubs, communities, collections], **sale_window)
 selected_plans = st.sidebar.multiselect("Plan Name", options=plan_options, key="plan_plans")
 plans = plan_options if not selected_plans else selected_plans
 
-# Investor sale filter
-investor_filter = st.sidebar.selectbox("Investor Sale", options=["All", "Retail", "Investor"], index=1, key="investor_filter")
+# --- Slice the sales cube to sold homes within date and group selections ---
+sales_cube = get_session_sales_cube()
+sold_filters = dict(filter_spec.with_filters({
+    'Hub': hubs,
+    'Community Name': communities,
+    'Collection': collections,
+    'Plan Name': plans
+}).filters)
 
-# --- Filter to only sold homes within date and group selections ---
-sold_df = df[
-    df['SALE_DATE'].between(start_date, end_date) &
-    df['Hub'].isin(hubs) &
-    df['Community Name'].isin(communities) &
-    df['Collection'].isin(collections) &
-    df['Plan Name'].isin(plans) &
-    df['DIV_CODE_DESC'].isin(div_selection)
-]
+def sold_rollup(keys: list) -> pd.DataFrame:
+    return query_sales_cube(sales_cube, keys, sold_filters, start_date, end_date)
 
 # --- Compute average pricing ---
-if group_col == "Plan Name":
-    pricing_df = compute_plan_pricing(sold_df, start_date, end_date, group_col=["Community Name", "Plan Name"])
-else:
-    pricing_df = compute_plan_pricing(sold_df, start_date, end_date, group_col=group_col)
+pricing_keys = ["Community Name", "Plan Name"] if group_col == "Plan Name" else [group_col]
+pricing_rollup = sold_rollup(pricing_keys)
+pricing_df = cube_plan_pricing(pricing_rollup)
+plan_counts = pricing_rollup['Sales'].rename("Sold Homes").reset_index()
 
 if pricing_df.empty:
     st.warning("No sold home data available for the selected filters.")
@@ -98,7 +91,7 @@ if pricing_df.empty:
 
 # --- Create scatter plot of pricing ---
 if group_col == "Plan Name":
-    x_labels = pricing_df["Plan Name"] + " (" + pricing_df["Community Name"] + ")"
+    x_labels = pricing_df["Plan Name"].astype(str) + " (" + pricing_df["Community Name"].astype(str) + ")"
 else:
     x_labels = pricing_df[group_col]
 x_positions = list(range(len(x_labels)))
@@ -134,7 +127,6 @@ st.markdown("### Pricing Data Table")
 
 # Format table output by aggregation level
 if group_col == "Hub":
-    plan_counts = sold_df.groupby("Hub").size().reset_index(name="Sold Homes")
     formatted_df = pricing_df.merge(plan_counts, on="Hub", how="left")
     formatted_df["Community Name"] = ""
     formatted_df["Collection"] = ""
@@ -142,10 +134,8 @@ if group_col == "Hub":
     formatted_df = formatted_df[["Hub", "Community Name", "Collection", "Plan Name"] + [col for col in pricing_df.columns if col not in ["Hub"]] + ["Sold Homes"]]
 
 elif group_col == "Community Name":
-    plan_counts = sold_df.groupby("Community Name").size().reset_index(name="Sold Homes")
     formatted_df = (
-        sold_df[["Hub", "Community Name"]]
-        .drop_duplicates()
+        sold_rollup(["Hub", "Community Name"]).index.to_frame(index=False)
         .merge(pricing_df, on="Community Name", how="right")
         .merge(plan_counts, on="Community Name", how="left")
     )
@@ -154,10 +144,8 @@ elif group_col == "Community Name":
     formatted_df = formatted_df[["Hub", "Community Name", "Collection", "Plan Name"] + [col for col in pricing_df.columns if col not in ["Community Name"]] + ["Sold Homes"]]
 
 else:
-    plan_counts = sold_df.groupby(["Community Name", "Plan Name"]).size().reset_index(name="Sold Homes")
     formatted_df = (
-        sold_df[["Hub", "Community Name", "Collection", "Plan Name"]]
-        .drop_duplicates()
+        sold_rollup(["Hub", "Community Name", "Collection", "Plan Name"]).index.to_frame(index=False)
         .merge(pricing_df, on=["Community Name", "Plan Name"], how="right")
         .merge(plan_counts, on=["Community Name", "Plan Name"], how="left")
     )
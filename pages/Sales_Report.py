@@ -2,12 +2,19 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import datetime
-from scripts.process_matt import compute_snapshot_unsold_inventory
+from scripts.process_matt import compute_unsold_inventory_snapshots
+from scripts.dataset_registry import get_session_dataset
+from scripts.filters import apply_filter_spec, make_filter_spec, select_rows
+from scripts.status_timeline import get_session_status_timeline, take_timeline
+from scripts.drop_folder import start_drop_folder_watcher
 
 # --- Streamlit page config ---
 st.set_page_config(page_title="Sales Report", layout="wide")
 st.title("Sales Report")
 
+# --- Scheduled MATT exports are ingested in the background from the first page run ---
+start_drop_folder_watcher()
+
 # --- Custom style for selected filters ---
 st.markdown("""
 <style>
@@ -18,12 +25,11 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Check for uploaded data ---
-if 'matt_processed' not in st.session_state:
+df = get_session_dataset()
+if df is None:
     st.warning("Please upload a valid MATT report on the MATT Upload page.")
     st.stop()
 
-df = st.session_state['matt_processed'].copy()
-
 # --- Sidebar filters ---
 with st.sidebar:
     st.header("Filters")
@@ -45,16 +51,23 @@ with st.sidebar:
     communities = st.multiselect("Community Name", sorted(df['Community Name'].dropna().unique()), key="sales_communities") or sorted(df['Community Name'].dropna().unique())
 
 # --- Filter data by hub/community ---
-df = df[df['Hub'].isin(hubs) & df['Community Name'].isin(communities)]
+group_spec = make_filter_spec({'Hub': hubs, 'Community Name': communities})
+coe_spec = group_spec.with_filters(date_ranges={'EST_COE_DATE': (est_coe_start, est_coe_end)})
+coe_df = apply_filter_spec(df, coe_spec)
+coe_timeline = take_timeline(get_session_status_timeline(), select_rows(coe_spec))
+group_df = apply_filter_spec(df, group_spec)
 snapshot_map = {w: pd.to_datetime(snapshot_date) - pd.Timedelta(days=i*7) for i, w in enumerate(['Snapshot', 'LW', 'L2W', 'L3W'])}
 group_col = 'Hub' if agg_level == 'Hub' else 'Community Name'
 
-# --- Build snapshot datasets ---
+# --- Build snapshot datasets (all selected weeks in one pass) ---
 results = []
-all_groups = df[(df['EST_COE_DATE'] >= est_coe_start) & (df['EST_COE_DATE'] <= est_coe_end)][group_col].dropna().unique()
+all_groups = coe_df[group_col].dropna().unique()
+snapshots_df = compute_unsold_inventory_snapshots(
+    coe_df, group_col, [snapshot_map[label] for label in selected_weeks], est_coe_start, est_coe_end, coe_timeline
+)
 for label in selected_weeks:
-    snap_date = snapshot_map.get(label)
-    agg_df = compute_snapshot_unsold_inventory(df, group_col, snap_date, est_coe_start, est_coe_end, label)
+    agg_df = snapshots_df[(snapshots_df['Snapshot_Date'] == snapshot_map[label]) & (snapshots_df['Unsold'] > 0)]
+    agg_df = agg_df.drop(columns='Snapshot_Date')
     if agg_df.empty:
         continue
     filled_df = pd.DataFrame({group_col: all_groups})
@@ -63,7 +76,7 @@ for label in selected_weeks:
     merged['Unsold'] = merged['Unsold'].fillna(0)
     merged['Avg_Age'] = merged['Avg_Age'].fillna(0)
     if group_col == 'Community Name':
-        merged = merged.merge(df[['Community Name', 'Hub']].drop_duplicates(), on='Community Name', how='left')
+        merged = merged.merge(group_df[['Community Name', 'Hub']].drop_duplicates(), on='Community Name', how='left')
     results.append(merged)
 
 if not results:
@@ -135,10 +148,9 @@ st.plotly_chart(fig, use_container_width=True)
 
 # --- Community Detail Table ---
 snapshot_only = viz_df[viz_df['Week'] == 'Snapshot'][[group_col, 'Unsold']]
-community_snapshot = df[(df['EST_COE_DATE'] >= est_coe_start) & (df['EST_COE_DATE'] <= est_coe_end)]
-sold_counts = community_snapshot[(community_snapshot['SALE_DATE'].notna()) &
-                                  (community_snapshot['SALE_DATE'] >= snapshot_map['LW']) &
-                                  (community_snapshot['SALE_DATE'] < snapshot_map['Snapshot'])].groupby(group_col).size().reset_index(name='Sold')
+community_snapshot = coe_df
+lw_sold_spec = coe_spec.with_filters(date_ranges={'SALE_DATE': (snapshot_map['LW'], snapshot_map['Snapshot'], 'left')})
+sold_counts = apply_filter_spec(df, lw_sold_spec).groupby(group_col, observed=True).size().reset_index(name='Sold')
 
 if group_col == 'Community Name':
     table_df = community_snapshot[['Hub', 'Community Name']].drop_duplicates()
@@ -162,6 +174,25 @@ if not table_df.empty:
     st.subheader("Community Detail Table")
     st.dataframe(table_df, use_container_width=True, hide_index=True)
 
+# --- Weekly Unsold Inventory Trajectory (last 52 snapshots) ---
+trajectory_dates = [pd.to_datetime(snapshot_date) - pd.Timedelta(weeks=i) for i in range(51, -1, -1)]
+trajectory_df = compute_unsold_inventory_snapshots(coe_df, group_col, trajectory_dates, est_coe_start, est_coe_end, coe_timeline)
+trajectory = trajectory_df.groupby('Snapshot_Date')['Unsold'].sum()
+
+fig_trajectory = go.Figure(go.Scatter(
+    x=trajectory.index, y=trajectory.values, mode='lines+markers',
+    line=dict(color='steelblue', width=2),
+    hovertemplate="Snapshot: %{x|%b %d, %Y}<br>Unsold: %{y}<extra></extra>"
+))
+fig_trajectory.update_layout(
+    title=dict(text="<b>Unsold Inventory Trajectory (52 Weekly Snapshots)</b>", font=dict(size=22), x=0.0),
+    xaxis=dict(title="<b>Snapshot Date</b>", showgrid=True, gridcolor='lightgrey'),
+    yaxis=dict(title="<b>Unsold Homes</b>", showgrid=True, gridcolor='lightgrey', rangemode='tozero'),
+    template='plotly_white', height=420,
+    margin=dict(t=60, b=60, l=80, r=40)
+)
+st.plotly_chart(fig_trajectory, use_container_width=True)
+
 
 
 
@@ -1,13 +1,19 @@
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
 import datetime
 
+from scripts.dataset_registry import get_session_dataset
+from scripts.filters import apply_core_filters
+from scripts.sales_cube import get_session_sales_cube, query_sales_cube
+from scripts.drop_folder import start_drop_folder_watcher
 
 # --- Streamlit page config ---
 st.set_page_config(page_title="Sales Trend Report", layout="wide")
 st.title("Sales Trend Report")
 
+# --- Scheduled MATT exports are ingested in the background from the first page run ---
+start_drop_folder_watcher()
+
 # --- Custom styling ---
 st.markdown("""
 <style>
@@ -18,56 +24,28 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Ensure data is available ---
-if 'matt_processed' not in st.session_state:
+df = get_session_dataset()
+if df is None:
     st.warning("Please upload a valid MATT report on the MATT Upload page.")
     st.stop()
 
-df = st.session_state['matt_processed'].copy()
-
 # --- Sidebar filters ---
-st.sidebar.header("Filters")
-
-div_selection = st.sidebar.multiselect(
-    "Division",
-    options=df['DIV_CODE_DESC'].dropna().unique(),
-    default=["HB Dallas-Fort Worth"],
-    key="trend_div_selection"
-)
-
-sale_date_range = st.sidebar.date_input(
-    "Sale Date Range",
-    value=(datetime.date(2024, 9, 1), datetime.date.today() - datetime.timedelta(days=1)),
-    key="trend_sale_date_range"
+filter_spec = apply_core_filters(
+    df, "trend", datetime.date(2024, 9, 1), datetime.date.today() - datetime.timedelta(days=1), realtor=False
 )
 
-investor_filter = st.sidebar.selectbox(
-    "Investor Sale",
-    options=["All", "Retail", "Investor"],
-    index=["All", "Retail", "Investor"].index("Retail"),
-    key="trend_investor_filter"
-)
-
-# --- Validate and apply filters ---
-if isinstance(sale_date_range, tuple) and len(sale_date_range) == 2:
-    start_date = pd.to_datetime(sale_date_range[0])
-    end_date = pd.to_datetime(sale_date_range[1])
-else:
-    st.error("Invalid date range selection.")
-    st.stop()
-
-mask = df['DIV_CODE_DESC'].isin(div_selection)
-mask &= df['SALE_DATE'].between(start_date, end_date)
-if investor_filter != "All":
-    mask &= df['Investor Sale'] == investor_filter
-
-filtered_df = df[mask].dropna(subset=['SALE_DATE'])
+# --- Roll the pre-aggregated sales cube up to daily sales by Realtor/Direct ---
+sale_start, sale_end = filter_spec.date_range('SALE_DATE')
+daily_channel_sales = query_sales_cube(
+    get_session_sales_cube(), ['SALE_DATE', 'Realtor/Direct'], dict(filter_spec.filters), sale_start, sale_end
+)['Sales']
 
-if filtered_df.empty:
+if daily_channel_sales.empty:
     st.warning("No data available for the selected filters.")
     st.stop()
 
 # --- Daily Sales Trend Chart ---
-daily_sales = filtered_df.groupby('SALE_DATE').size()
+daily_sales = daily_channel_sales.groupby(level='SALE_DATE').sum()
 daily_sales_ma14 = daily_sales.rolling(window=14).mean()
 daily_sales_ma30 = daily_sales.rolling(window=30).mean()
 
@@ -100,7 +78,8 @@ fig_avg_daily.update_layout(
 st.plotly_chart(fig_avg_daily, use_container_width=True)
 
 # --- Realtor Attachment Rate Chart ---
-daily_summary = filtered_df.groupby(['SALE_DATE', 'Realtor/Direct']).size().unstack(fill_value=0)
+daily_summary = daily_channel_sales.unstack(fill_value=0)
+daily_summary.columns = daily_summary.columns.astype(str)
 daily_summary['Total Sales'] = daily_summary.sum(axis=1)
 daily_summary['Realtor %'] = daily_summary.get('Realtor', 0) / daily_summary['Total Sales']
 daily_summary['14d_MA_RAR'] = daily_summary['Realtor %'].rolling(window=14).mean()
@@ -126,7 +105,8 @@ fig_rar.update_layout(
 st.plotly_chart(fig_rar, use_container_width=True)
 
 # --- Direct vs. Realtor Volume Chart ---
-volume_df = filtered_df.groupby(['SALE_DATE', 'Realtor/Direct']).size().unstack(fill_value=0)
+volume_df = daily_channel_sales.unstack(fill_value=0)
+volume_df.columns = volume_df.columns.astype(str)
 volume_df['Direct MA'] = volume_df.get('Direct', 0).rolling(window=14).mean()
 volume_df['Realtor MA'] = volume_df.get('Realtor', 0).rolling(window=14).mean()
 
@@ -0,0 +1,66 @@
+import os
+import pandas as pd
+
+from config import ENABLE_ARROW_SNAPSHOTS
+from scripts.matt_cache import CACHE_PATH
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # Snapshots are optional; workers fall back to the Parquet cache
+    feather = None
+
+
+def _snapshot_file(dataset_id: str) -> str:
+    return os.path.join(CACHE_PATH, f"{dataset_id}.arrow")
+
+
+# --- Write Once ---
+def write_arrow_snapshot(dataset_id: str, df: pd.DataFrame) -> bool:
+    """
+    Writes the processed frame as an uncompressed Arrow IPC (Feather v2) file so
+    other worker processes can memory-map it. Returns False if snapshots are
+    off, pyarrow is missing or the frame cannot be written.
+    """
+    if not ENABLE_ARROW_SNAPSHOTS or feather is None:
+        return False
+
+    os.makedirs(CACHE_PATH, exist_ok=True)
+    path = _snapshot_file(dataset_id)
+    if not os.path.exists(path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            feather.write_feather(df, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+        except (ValueError, TypeError, OSError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+    return True
+
+
+# --- Memory-Mapped Read ---
+def open_arrow_snapshot(dataset_id: str) -> pd.DataFrame | None:
+    """
+    Memory-maps a published snapshot read-only. Columns Arrow can hand over
+    without conversion (numeric without nulls, Arrow-backed strings) stay backed
+    by the OS page cache, so every worker shares one physical copy.
+    """
+    path = _snapshot_file(dataset_id)
+    if feather is None or not os.path.exists(path):
+        return None
+
+    try:
+        table = feather.read_table(path, memory_map=True)
+        df = table.to_pandas(split_blocks=True)
+        # Touch the file so eviction treats it as recently used
+        os.utime(path)
+    except (ValueError, OSError):
+        return None
+    return df
+
+
+# --- Exports ---
+__all__ = [
+    "write_arrow_snapshot",
+    "open_arrow_snapshot"
+]
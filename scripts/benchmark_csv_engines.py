@@ -0,0 +1,71 @@
+import argparse
+import os
+import tempfile
+import time
+
+from scripts.dimensions import BASE_DIR
+from scripts.matt_schema import read_matt_csv
+from scripts.process_matt import process_matt_data
+
+SAMPLE_PATH = os.path.join(BASE_DIR, 'data', 'Homesite Detail Data (MATT).csv')
+ENGINES = ["pandas", "pyarrow"]
+
+
+# --- Synthetic Exports ---
+def write_scaled_export(scale: int, path: str) -> None:
+    """
+    Writes the sample export with its data rows repeated scale times,
+    approximating a multi-division MATT export.
+    """
+    with open(SAMPLE_PATH, 'rb') as f:
+        header = f.readline()
+        body = f.read()
+    if not body.endswith(b"\n"):
+        body += b"\n"
+    with open(path, 'wb') as out:
+        out.write(header)
+        for _ in range(scale):
+            out.write(body)
+
+
+def time_engine(path: str, engine: str, repeats: int) -> tuple[float, float, int]:
+    """
+    Returns the best read time, best read + process time and row count.
+    """
+    best_read, best_total, rows = float("inf"), float("inf"), 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        df = read_matt_csv(path, engine=engine)
+        read_done = time.perf_counter()
+        process_matt_data(df)
+        end = time.perf_counter()
+        best_read = min(best_read, read_done - start)
+        best_total = min(best_total, end - start)
+        rows = len(df)
+    return best_read, best_total, rows
+
+
+# --- Benchmark Runner ---
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare MATT CSV ingest engines.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 4, 8],
+                        help="Row multipliers for synthetic exports (1 = sample file).")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'Rows':>10} {'Engine':>8} {'Read (s)':>10} {'Read+Process (s)':>18}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in args.scales:
+            if scale == 1:
+                path = SAMPLE_PATH
+            else:
+                path = os.path.join(tmp_dir, f"matt_x{scale}.csv")
+                write_scaled_export(scale, path)
+
+            for engine in ENGINES:
+                read_s, total_s, rows = time_engine(path, engine, args.repeats)
+                print(f"{rows:>10,} {engine:>8} {read_s:>10.3f} {total_s:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
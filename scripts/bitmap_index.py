@@ -0,0 +1,151 @@
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+from scripts.dataset_registry import get_dataset_index, get_session_index
+
+# Sidebar filter dimensions answered from bitmaps instead of isin() / == scans
+FILTER_DIMENSIONS = (
+    'DIV_CODE_DESC', 'Investor Sale', 'Realtor/Direct', 'HS_TYPE_LABEL',
+    'Hub', 'Community Name', 'Collection', 'Plan Name'
+)
+
+
+# --- Bitmap Index ---
+class BitmapIndex(NamedTuple):
+    bitmaps: dict    # value -> packed bitmap (np.packbits of the row mask)
+    size: int        # row count of the indexed frame
+
+
+def build_bitmap_index(values: pd.Series) -> BitmapIndex:
+    """
+    One packed bitmap (1 bit per row) per distinct non-missing value of a
+    column. Categorical columns reuse their codes; others are factorized.
+    Rows are grouped by value with one stable sort, so each bitmap is filled
+    from its own rows only rather than from a full-column comparison.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, categories = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, categories = pd.factorize(values)
+
+    rows = np.argsort(codes, kind='stable')
+    rows = rows[codes[rows] >= 0]
+    row_codes = codes[rows]
+
+    # One byte per (value, byte position): its rows set distinct bits, so their sum is the OR
+    byte_positions = rows >> 3
+    bits = (0x80 >> (rows & 7)).astype(np.uint8)
+    new_byte = np.ones(len(rows), dtype=bool)
+    new_byte[1:] = (row_codes[1:] != row_codes[:-1]) | (byte_positions[1:] != byte_positions[:-1])
+    starts = np.flatnonzero(new_byte)
+    byte_codes, byte_positions = row_codes[starts], byte_positions[starts]
+    byte_values = np.add.reduceat(bits, starts)
+
+    bitmaps = {}
+    bounds = np.searchsorted(byte_codes, np.arange(len(categories) + 1))
+    for code, value in enumerate(categories):
+        start, end = bounds[code], bounds[code + 1]
+        if start < end:
+            bitmap = np.zeros((len(values) + 7) // 8, dtype=np.uint8)
+            bitmap[byte_positions[start:end]] = byte_values[start:end]
+            bitmaps[value] = bitmap
+    return BitmapIndex(bitmaps, len(values))
+
+
+# --- Bitwise Combination ---
+def bitmap_any(index: BitmapIndex, values) -> np.ndarray:
+    """
+    OR of the bitmaps of the selected values (rows matching none of them are 0),
+    like Series.isin(values).
+    """
+    combined = np.zeros((index.size + 7) // 8, dtype=np.uint8)
+    for value in values:
+        bitmap = index.bitmaps.get(value)
+        if bitmap is not None:
+            combined |= bitmap
+    return combined
+
+
+def pack_mask(mask) -> np.ndarray:
+    """
+    Packs a boolean row mask (e.g. a date range mask) so it can be ANDed with bitmaps.
+    """
+    return np.packbits(np.asarray(mask, dtype=bool))
+
+
+def bitmap_to_mask(bitmap: np.ndarray, size: int) -> np.ndarray:
+    return np.unpackbits(bitmap, count=size).astype(bool)
+
+
+def bitmap_to_positions(bitmap: np.ndarray, size: int) -> np.ndarray:
+    return np.flatnonzero(bitmap_to_mask(bitmap, size))
+
+
+# --- Session Filter Engine ---
+def _bitmap_builder(column: str):
+    return lambda df: build_bitmap_index(df[column])
+
+
+def build_filter_indexes(dataset_id: str) -> None:
+    """
+    Builds the bitmaps of every sidebar filter dimension at ingest, so the
+    first rerun of each page finds them ready.
+    """
+    for column in FILTER_DIMENSIONS:
+        get_dataset_index(dataset_id, f"bitmap:{column}", _bitmap_builder(column))
+
+
+def get_session_bitmap_index(column: str) -> BitmapIndex | None:
+    """
+    Bitmap index of a column of this session's dataset, built once per dataset
+    and reused by every page and session.
+    """
+    return get_session_index(f"bitmap:{column}", _bitmap_builder(column))
+
+
+def _select_bitmap(filters: dict, mask=None) -> tuple[np.ndarray, int]:
+    bitmap, size = None, None
+    for column, values in filters.items():
+        index = get_session_bitmap_index(column)
+        selected = bitmap_any(index, values)
+        bitmap = selected if bitmap is None else bitmap & selected
+        size = index.size
+    if mask is not None:
+        packed = pack_mask(mask)
+        bitmap = packed if bitmap is None else bitmap & packed
+        size = len(mask)
+    if bitmap is None:
+        raise ValueError("At least one filter or mask is required")
+    return bitmap, size
+
+
+def filter_mask(filters: dict, mask=None) -> np.ndarray:
+    """
+    Boolean row mask of this session's dataset for {column: selected values}
+    filters, optionally ANDed with another row mask.
+    """
+    return bitmap_to_mask(*_select_bitmap(filters, mask))
+
+
+def filter_positions(filters: dict, mask=None) -> np.ndarray:
+    """
+    Row positions (for df.iloc) selected by filter_mask(filters, mask).
+    """
+    return bitmap_to_positions(*_select_bitmap(filters, mask))
+
+
+# --- Exports ---
+__all__ = [
+    "FILTER_DIMENSIONS",
+    "BitmapIndex",
+    "build_bitmap_index",
+    "bitmap_any",
+    "pack_mask",
+    "bitmap_to_mask",
+    "bitmap_to_positions",
+    "build_filter_indexes",
+    "get_session_bitmap_index",
+    "filter_mask",
+    "filter_positions"
+]
@@ -0,0 +1,129 @@
+import threading
+from typing import Callable
+from collections import OrderedDict
+import pandas as pd
+import streamlit as st
+
+from config import REGISTRY_MAX_DATASETS
+from scripts.matt_cache import load_cached_matt
+from scripts.arrow_snapshot import open_arrow_snapshot, write_arrow_snapshot
+
+# Copy-on-Write makes every view handed to a page a lazy copy: a page that
+# assigns a column gets its own copy instead of mutating the shared frame.
+# (Always on from pandas 3.0, where the option is deprecated.)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+SESSION_KEY = 'matt_dataset_id'
+
+# --- Process-Wide Dataset Registry ---
+# One processed frame per dataset ID (the content hash from scripts.matt_cache),
+# shared read-only by every session in this server process.
+_datasets: OrderedDict[str, pd.DataFrame] = OrderedDict()
+# Derived lookup structures (e.g. sorted date indexes) built once per dataset
+_indexes: dict[str, dict[str, object]] = {}
+_lock = threading.Lock()
+
+
+def publish_dataset(dataset_id: str, df: pd.DataFrame) -> str:
+    """
+    Registers a processed frame under dataset_id, evicting the least recently
+    used datasets beyond REGISTRY_MAX_DATASETS.
+    """
+    with _lock:
+        _datasets[dataset_id] = df
+        _datasets.move_to_end(dataset_id)
+        while len(_datasets) > REGISTRY_MAX_DATASETS:
+            evicted_id, _ = _datasets.popitem(last=False)
+            _indexes.pop(evicted_id, None)
+    return dataset_id
+
+
+def get_dataset(dataset_id: str) -> pd.DataFrame | None:
+    """
+    Returns a zero-copy view of a registered dataset. Datasets not in this
+    process's memory are memory-mapped from the shared Arrow snapshot, or
+    reloaded from the Parquet cache (and snapshotted for other workers).
+    """
+    with _lock:
+        df = _datasets.get(dataset_id)
+        if df is not None:
+            _datasets.move_to_end(dataset_id)
+
+    if df is None:
+        df = open_arrow_snapshot(dataset_id)
+        if df is None:
+            df = load_cached_matt(dataset_id)
+            if df is None:
+                return None
+            write_arrow_snapshot(dataset_id, df)
+        publish_dataset(dataset_id, df)
+
+    return df.copy(deep=False)
+
+
+def registered_dataset_ids() -> set[str]:
+    """
+    IDs of the datasets held in this process (their cache files may be memory-mapped).
+    """
+    with _lock:
+        return set(_datasets)
+
+
+def get_dataset_index(dataset_id: str, name: str, builder: Callable[[pd.DataFrame], object]):
+    """
+    Returns the index called name for a dataset, building it with builder(df)
+    on first use. Indexes hold row positions into the registered frame and are
+    dropped when the dataset is evicted.
+    """
+    with _lock:
+        index = _indexes.get(dataset_id, {}).get(name)
+    if index is not None:
+        return index
+
+    df = get_dataset(dataset_id)
+    if df is None:
+        return None
+    index = builder(df)
+    with _lock:
+        if dataset_id in _datasets:
+            _indexes.setdefault(dataset_id, {})[name] = index
+    return index
+
+
+# --- Session Helpers ---
+def set_session_dataset(dataset_id: str) -> None:
+    st.session_state[SESSION_KEY] = dataset_id
+
+
+def get_session_dataset_id() -> str | None:
+    return st.session_state.get(SESSION_KEY)
+
+
+def get_session_dataset() -> pd.DataFrame | None:
+    """
+    The dataset referenced by this session, or None if nothing has been loaded.
+    """
+    dataset_id = get_session_dataset_id()
+    return get_dataset(dataset_id) if dataset_id else None
+
+
+def get_session_index(name: str, builder: Callable[[pd.DataFrame], object]):
+    """
+    The named index of this session's dataset (see get_dataset_index).
+    """
+    dataset_id = get_session_dataset_id()
+    return get_dataset_index(dataset_id, name, builder) if dataset_id else None
+
+
+# --- Exports ---
+__all__ = [
+    "publish_dataset",
+    "get_dataset",
+    "registered_dataset_ids",
+    "get_dataset_index",
+    "set_session_dataset",
+    "get_session_dataset_id",
+    "get_session_dataset",
+    "get_session_index"
+]
@@ -0,0 +1,83 @@
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+from scripts.dataset_registry import get_session_index
+
+
+# --- Sorted Date Index ---
+class SortedDateIndex(NamedTuple):
+    values: np.ndarray     # non-missing dates, ascending (datetime64[ns])
+    positions: np.ndarray  # row position of each value in the indexed frame
+    size: int              # row count of the indexed frame
+
+
+def build_date_index(dates: pd.Series) -> SortedDateIndex:
+    """
+    Sorts a date column once, keeping each date's row position. Missing dates
+    are left out, so they never match a range (like Series.between).
+    """
+    values = dates.to_numpy(dtype='datetime64[ns]')
+    positions = np.flatnonzero(~np.isnat(values))
+    order = np.argsort(values[positions], kind='stable')
+    positions = positions[order]
+    return SortedDateIndex(values[positions], positions, len(values))
+
+
+def _bound(value) -> np.datetime64:
+    return pd.Timestamp(value).to_datetime64().astype('datetime64[ns]')
+
+
+# --- Range Queries ---
+def date_range_slice(index: SortedDateIndex, start=None, end=None, inclusive: str = 'both') -> slice:
+    """
+    Binary-searches the index for dates between start and end (either may be None
+    for an open bound). inclusive is 'both', 'left', 'right' or 'neither', as in
+    Series.between.
+    """
+    lo = 0
+    hi = len(index.values)
+    if start is not None:
+        side = 'left' if inclusive in ('both', 'left') else 'right'
+        lo = np.searchsorted(index.values, _bound(start), side=side)
+    if end is not None:
+        side = 'right' if inclusive in ('both', 'right') else 'left'
+        hi = np.searchsorted(index.values, _bound(end), side=side)
+    return slice(lo, max(lo, hi))
+
+
+def date_range_positions(index: SortedDateIndex, start=None, end=None, inclusive: str = 'both') -> np.ndarray:
+    """
+    Row positions with a date in range, in row order (for df.iloc).
+    """
+    return np.sort(index.positions[date_range_slice(index, start, end, inclusive)])
+
+
+def date_range_mask(index: SortedDateIndex, start=None, end=None, inclusive: str = 'both') -> np.ndarray:
+    """
+    Boolean row mask equivalent to dates.between(start, end, inclusive), for
+    combining with other filters. Only the k matching rows are touched.
+    """
+    mask = np.zeros(index.size, dtype=bool)
+    mask[index.positions[date_range_slice(index, start, end, inclusive)]] = True
+    return mask
+
+
+# --- Session Dataset Indexes ---
+def get_session_date_index(column: str) -> SortedDateIndex | None:
+    """
+    Sorted index of a date column of this session's dataset, built once per
+    dataset and shared by every page and session.
+    """
+    return get_session_index(f"date:{column}", lambda df: build_date_index(df[column]))
+
+
+# --- Exports ---
+__all__ = [
+    "SortedDateIndex",
+    "build_date_index",
+    "date_range_slice",
+    "date_range_positions",
+    "date_range_mask",
+    "get_session_date_index"
+]
@@ -0,0 +1,167 @@
+import hashlib
+from typing import Callable, NamedTuple
+import numpy as np
+import pandas as pd
+from pandas.util import hash_array
+
+from config import ENABLE_DELTA_INGEST
+from scripts.dimensions import REFERENCE_PATHS
+from scripts.matt_schema import AS_OF_COLUMN, DATE_FORMATS, HOMESITE_KEY, parse_as_of_date
+from scripts.process_matt import (
+    PROCESSING_VERSION, CATEGORICAL_COLUMNS, CATEGORY_ORDERS, process_matt_data, to_ordered_category
+)
+from scripts.snapshot_store import open_matt_snapshot
+from scripts.dataset_registry import get_dataset
+
+# Hash of each raw MATT row, kept on the processed frame for the next export's diff
+ROW_HASH_COLUMN = 'Row_Hash'
+# Share of process_matt_delta progress spent hashing rows (the rest is processing)
+HASH_SHARE = 0.2
+
+
+# --- Row Hashes ---
+def processing_hash_key() -> str:
+    """
+    16-character hash key derived from the processing version and reference
+    tables, so a change to either marks every row as changed.
+    """
+    digest = hashlib.sha256(PROCESSING_VERSION.encode())
+    for path in REFERENCE_PATHS:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def hash_matt_rows(raw_df: pd.DataFrame, hash_key: str | None = None) -> np.ndarray:
+    """
+    A uint64 hash of every raw MATT row, leaving out the AS OF stamp (it
+    changes on every row of every export). Each distinct value of a column is
+    hashed once and broadcast back to the rows, then mixed in column by column.
+    """
+    hash_key = hash_key or processing_hash_key()
+    row_hashes = np.zeros(len(raw_df), dtype=np.uint64)
+    missing = np.uint64(0x9E3779B97F4A7C15)
+    with np.errstate(over='ignore'):
+        for col in raw_df.columns.drop(AS_OF_COLUMN, errors='ignore'):
+            codes, uniques = pd.factorize(raw_df[col])
+            value_hashes = hash_array(np.asarray(uniques, dtype=object), hash_key=hash_key, categorize=False)
+            value_hashes = np.append(value_hashes, missing)  # code -1 (missing) takes the last slot
+            row_hashes = row_hashes * np.uint64(1000003) ^ value_hashes[codes]
+    return row_hashes
+
+
+# --- Delta Processing ---
+def _date_parse_failures(raw_df: pd.DataFrame, processed_df: pd.DataFrame) -> dict[str, int]:
+    failures = {}
+    for col in DATE_FORMATS:
+        if col in raw_df.columns:
+            # Only rows with text but no date can be failures; blank text is not one
+            candidates = raw_df[col].notna().to_numpy() & processed_df[col].isna().to_numpy()
+            text = raw_df[col].to_numpy()[candidates]
+            failures[col] = int((pd.Series(text, dtype=str).str.strip() != '').sum())
+    return failures
+
+
+class DeltaBaseline(NamedTuple):
+    previous_df: pd.DataFrame
+    keys: pd.Index        # homesite key of each previous row
+    hashes: np.ndarray    # raw row hash of each previous row
+
+
+def delta_baseline(previous_df: pd.DataFrame | None) -> DeltaBaseline | None:
+    """
+    The homesite index and row hashes of a previous processed export, built
+    once and shared by every chunk of an ingest. None if there is no previous
+    export, it has no row hashes or a homesite repeats.
+    """
+    if previous_df is None or ROW_HASH_COLUMN not in previous_df.columns:
+        return None
+    keys = pd.MultiIndex.from_frame(previous_df[HOMESITE_KEY])
+    if not keys.is_unique:
+        return None
+    return DeltaBaseline(previous_df, keys, previous_df[ROW_HASH_COLUMN].to_numpy())
+
+
+def process_matt_delta(
+    raw_df: pd.DataFrame, previous_df: pd.DataFrame | None = None, baseline: DeltaBaseline | None = None,
+    progress: Callable[[str, float], None] | None = None
+) -> pd.DataFrame:
+    """
+    Processes a raw MATT export, reusing rows of the previous processed export
+    whose homesite (COMMUNITY + HOMESITE) and raw row hash are unchanged; only
+    new and changed homesites go through process_matt_data. Pass baseline
+    (see delta_baseline) instead of previous_df when processing many chunks
+    against one export. Falls back to a full run without a usable previous
+    export. The number of reprocessed rows is kept in attrs['reprocessed_rows'].
+    progress(step, fraction) is called as hashing and each processing step start.
+    """
+    progress = progress or (lambda step, fraction: None)
+    progress('Hashing rows', 0.0)
+    row_hashes = hash_matt_rows(raw_df)
+
+    def processing_progress(step: str, fraction: float) -> None:
+        progress(step, HASH_SHARE + (1 - HASH_SHARE) * fraction)
+
+    keys = pd.MultiIndex.from_frame(raw_df[HOMESITE_KEY])
+    baseline = baseline if baseline is not None else delta_baseline(previous_df)
+    if baseline is None or not keys.is_unique:
+        processed_df = process_matt_data(raw_df, processing_progress)
+        processed_df[ROW_HASH_COLUMN] = row_hashes
+        processed_df.attrs['reprocessed_rows'] = len(raw_df)
+        return processed_df
+
+    # Match each homesite to its previous row; it is unchanged only if the raw row hashes agree
+    previous_positions = baseline.keys.get_indexer(keys)
+    unchanged = previous_positions >= 0
+    unchanged[unchanged] = baseline.hashes[previous_positions[unchanged]] == row_hashes[unchanged]
+    unchanged_rows, changed_rows = np.flatnonzero(unchanged), np.flatnonzero(~unchanged)
+
+    # Only the matched previous rows are copied; one take puts them and the reprocessed rows in export order
+    parts = [baseline.previous_df.take(previous_positions[unchanged_rows]).drop(columns=ROW_HASH_COLUMN)]
+    source_rows = np.empty(len(raw_df), dtype=np.int64)
+    source_rows[unchanged_rows] = np.arange(len(unchanged_rows))
+    if len(changed_rows):
+        parts.append(process_matt_data(raw_df.iloc[changed_rows], processing_progress))
+        source_rows[changed_rows] = len(unchanged_rows) + np.arange(len(changed_rows))
+    processed_df = pd.concat(parts, ignore_index=True).iloc[source_rows].reset_index(drop=True)
+
+    # Category sets depend on the values present, so re-encode across both parts
+    for col in CATEGORICAL_COLUMNS:
+        processed_df[col] = to_ordered_category(processed_df[col], CATEGORY_ORDERS.get(col))
+    if AS_OF_COLUMN in raw_df.columns:
+        processed_df[AS_OF_COLUMN] = raw_df[AS_OF_COLUMN].array  # reused rows carry the previous stamp
+    processed_df[ROW_HASH_COLUMN] = row_hashes
+    processed_df.attrs['date_parse_failures'] = _date_parse_failures(raw_df, processed_df)
+    processed_df.attrs['reprocessed_rows'] = len(changed_rows)
+    return processed_df
+
+
+def previous_matt_export(as_of) -> pd.DataFrame | None:
+    """
+    The stored processed export in effect on as_of (the delta ingest baseline),
+    or None if delta ingest is off or nothing is stored.
+    """
+    if not ENABLE_DELTA_INGEST or as_of is None:
+        return None
+    previous_id = open_matt_snapshot(as_of)
+    return get_dataset(previous_id) if previous_id is not None else None
+
+
+def ingest_matt_frame(raw_df: pd.DataFrame, progress: Callable[[str, float], None] | None = None) -> pd.DataFrame:
+    """
+    Processes a raw MATT export against the stored export in effect on its
+    AS OF date (see scripts.snapshot_store), if delta ingest is enabled.
+    """
+    return process_matt_delta(raw_df, previous_matt_export(parse_as_of_date(raw_df)), progress=progress)
+
+
+# --- Exports ---
+__all__ = [
+    "ROW_HASH_COLUMN",
+    "hash_matt_rows",
+    "DeltaBaseline",
+    "delta_baseline",
+    "process_matt_delta",
+    "previous_matt_export",
+    "ingest_matt_frame"
+]
@@ -0,0 +1,136 @@
+import os
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+
+# --- Reference Tables ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HUB_PATH = os.path.join(BASE_DIR, 'data', 'Hub.csv')
+PLAN_PATH = os.path.join(BASE_DIR, 'data', 'Plan.csv')
+INVESTOR_PATH = os.path.join(BASE_DIR, 'data', 'Investor_NHC.csv')
+
+# Every table whose contents affect process_matt_data output
+REFERENCE_PATHS = (HUB_PATH, PLAN_PATH, INVESTOR_PATH)
+
+COMMUNITY_KEY = 'Community Number'
+PLAN_KEY = 'Plan Code'
+
+# Fact table key columns that reference each dimension
+FACT_KEYS = {
+    COMMUNITY_KEY: 'Comm_#',
+    PLAN_KEY: 'Plan_Key'
+}
+
+
+# --- Dimension Loading ---
+def _read_dimension(path: str, key: str, key_dtype) -> pd.DataFrame:
+    dim = pd.read_csv(path, dtype={key: key_dtype})
+    for col in dim.columns:
+        if not pd.api.types.is_numeric_dtype(dim[col]):
+            dim[col] = dim[col].str.strip()
+    return dim
+
+
+def find_key_conflicts(dim: pd.DataFrame, key: str) -> list:
+    """
+    Returns keys that appear on more than one row with different attributes.
+    """
+    distinct = dim.drop_duplicates()
+    return sorted(distinct.loc[distinct[key].duplicated(), key].unique().tolist())
+
+
+def _unique_dimension(dim: pd.DataFrame, key: str) -> pd.DataFrame:
+    # First row wins for duplicated keys, so lookups can never multiply fact rows
+    return dim.drop_duplicates(subset=key, keep='first').set_index(key)
+
+
+def load_community_dim() -> pd.DataFrame:
+    """
+    Hub.csv indexed by unique Community Number.
+    """
+    return _unique_dimension(_read_dimension(HUB_PATH, COMMUNITY_KEY, 'int64'), COMMUNITY_KEY)
+
+
+def load_plan_dim() -> pd.DataFrame:
+    """
+    Plan.csv indexed by unique Plan Code (text, stripped). Row position is the Plan_Key.
+    """
+    return _unique_dimension(_read_dimension(PLAN_PATH, PLAN_KEY, str), PLAN_KEY)
+
+
+def dimension_key_conflicts() -> dict[str, list]:
+    """
+    Reports duplicated keys with conflicting attributes in each reference table.
+    """
+    return {
+        'Hub.csv': find_key_conflicts(_read_dimension(HUB_PATH, COMMUNITY_KEY, 'int64'), COMMUNITY_KEY),
+        'Plan.csv': find_key_conflicts(_read_dimension(PLAN_PATH, PLAN_KEY, str), PLAN_KEY)
+    }
+
+
+# --- Investor NHC List ---
+def normalize_nhc_names(names: pd.Series) -> pd.Series:
+    return names.str.strip().str.upper()
+
+
+def load_investor_names() -> frozenset:
+    """
+    Normalized NHC names whose sales count as investor sales (Investor_NHC.csv).
+    Re-read only when the file changes.
+    """
+    return _read_investor_names(os.path.getmtime(INVESTOR_PATH))
+
+
+@lru_cache(maxsize=1)
+def _read_investor_names(mtime: float) -> frozenset:
+    names = pd.read_csv(INVESTOR_PATH, dtype=str)['NHC Name'].dropna()
+    return frozenset(normalize_nhc_names(names))
+
+
+# --- Key Lookups ---
+def dimension_attribute(values: pd.Series, positions: np.ndarray) -> pd.Categorical:
+    """
+    Broadcasts a dimension attribute to fact rows as a categorical, given each
+    row's position in the dimension (-1 for no match).
+    """
+    categories = sorted(values.dropna().unique())
+    dim_codes = pd.Categorical(values, categories=categories).codes
+    positions = np.asarray(positions)
+    row_codes = np.where(positions >= 0, dim_codes[positions], -1)
+    return pd.Categorical.from_codes(row_codes, categories=categories)
+
+
+def join_dimension_attributes(fact_df: pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """
+    Returns fact_df with the requested Hub.csv / Plan.csv attributes attached
+    through the Comm_# and Plan_Key columns.
+    """
+    result = fact_df.copy(deep=False)
+    community_dim = load_community_dim()
+    plan_dim = load_plan_dim()
+    comm_pos = community_dim.index.get_indexer(fact_df['Comm_#'])
+    plan_pos = fact_df['Plan_Key'].to_numpy()
+
+    for col in columns:
+        if col in community_dim.columns:
+            result[col] = dimension_attribute(community_dim[col], comm_pos)
+        elif col in plan_dim.columns:
+            result[col] = dimension_attribute(plan_dim[col], plan_pos)
+        else:
+            raise KeyError(f"'{col}' is not a Hub.csv or Plan.csv attribute")
+    return result
+
+
+# --- Exports ---
+__all__ = [
+    "HUB_PATH",
+    "PLAN_PATH",
+    "INVESTOR_PATH",
+    "REFERENCE_PATHS",
+    "load_investor_names",
+    "load_community_dim",
+    "load_plan_dim",
+    "dimension_key_conflicts",
+    "dimension_attribute",
+    "join_dimension_attributes"
+]
@@ -0,0 +1,180 @@
+import argparse
+import os
+import threading
+import time
+from typing import NamedTuple
+import pandas as pd
+
+from config import ENABLE_DROP_FOLDER, DROP_FOLDER_DIR, DROP_FOLDER_POLL_SECONDS
+from scripts.dimensions import BASE_DIR
+from scripts.matt_schema import missing_required_columns, read_matt_as_of, read_matt_header
+from scripts.snapshot_store import is_retained, list_snapshot_dates, open_matt_snapshot
+from scripts.ingest_jobs import ingest_matt_bytes
+
+DROP_FOLDER_PATH = os.path.join(BASE_DIR, DROP_FOLDER_DIR)
+
+
+class DroppedExport(NamedTuple):
+    path: str | None  # None for an export found in the history store
+    as_of: pd.Timestamp
+    dataset_id: str
+    from_cache: bool
+
+
+# Process-wide watcher state: files already looked at, the newest ingested export and per-file errors
+_seen: dict[str, tuple[int, int]] = {}
+_latest: DroppedExport | None = None
+_errors: dict[str, str] = {}
+_scan_lock = threading.Lock()
+_watcher_lock = threading.Lock()
+_watcher: threading.Thread | None = None
+
+
+# --- Folder Scan ---
+def find_new_exports(folder: str = DROP_FOLDER_PATH, settle_seconds: float = DROP_FOLDER_POLL_SECONDS) -> list[tuple[str, pd.Timestamp]]:
+    """
+    CSV files in folder that are MATT exports (by header) with an AS OF date
+    not yet in the history store (and not past its retention), oldest AS OF
+    first. Only the header and first row are read. Files modified in the
+    last settle_seconds may still be being written and are left for a later
+    scan; other files are looked at once until their size or modification
+    time changes.
+    """
+    stored_dates = set(list_snapshot_dates())
+    now = time.time()
+    found = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if not name.lower().endswith('.csv') or not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if _seen.get(path) == signature or now - stat.st_mtime < settle_seconds:
+            continue
+        _seen[path] = signature
+        _errors.pop(path, None)
+
+        try:
+            if missing_required_columns(read_matt_header(path)):
+                continue  # reference tables and other CSVs
+            as_of = read_matt_as_of(path)
+        except (OSError, ValueError, StopIteration) as e:
+            _errors[path] = f"Could not read the header: {e}"
+            continue
+        if as_of is None:
+            _errors[path] = "No AS OF stamp on the first row."
+        elif as_of not in stored_dates and is_retained(as_of):
+            found.append((path, as_of))
+    return sorted(found, key=lambda item: item[1])
+
+
+def ingest_drop_folder(folder: str = DROP_FOLDER_PATH, settle_seconds: float = DROP_FOLDER_POLL_SECONDS) -> list[DroppedExport]:
+    """
+    Ingests every new MATT export in folder (see find_new_exports) through
+    the upload pipeline, which stores and publishes it. Failures are kept
+    per file (see drop_folder_errors) rather than raised.
+    """
+    global _latest
+    with _scan_lock:
+        try:
+            new_exports = find_new_exports(folder, settle_seconds)
+        except OSError as e:
+            _errors[folder] = f"Could not list the folder: {e}"
+            return []
+        _errors.pop(folder, None)
+
+        ingested = []
+        for path, as_of in new_exports:
+            try:
+                with open(path, 'rb') as f:
+                    dataset_id, from_cache = ingest_matt_bytes(f.read())
+            except Exception as e:
+                _errors[path] = f"Ingest failed: {e}"
+                continue
+            _errors.pop(path, None)
+            ingested.append(DroppedExport(path, as_of, dataset_id, from_cache))
+            if _latest is None or as_of >= _latest.as_of:
+                _latest = ingested[-1]
+        return ingested
+
+
+# --- Background Watcher ---
+def _watch(folder: str, poll_seconds: float) -> None:
+    while True:
+        ingest_drop_folder(folder, poll_seconds)
+        latest_dropped_export()  # loads exports stored by other processes before a session asks for them
+        time.sleep(poll_seconds)
+
+
+def start_drop_folder_watcher(folder: str = DROP_FOLDER_PATH, poll_seconds: float = DROP_FOLDER_POLL_SECONDS) -> None:
+    """
+    Starts polling folder on a daemon thread, once per process and only if
+    ENABLE_DROP_FOLDER is set; later calls do nothing. Every page calls it,
+    so the watcher starts with the first script run whichever page it is.
+    """
+    global _watcher
+    if not ENABLE_DROP_FOLDER:
+        return
+    with _watcher_lock:
+        if _watcher is not None:
+            return
+        _watcher = threading.Thread(target=_watch, args=(folder, poll_seconds), name="matt-drop-folder", daemon=True)
+        _watcher.start()
+
+
+def latest_dropped_export() -> DroppedExport | None:
+    """
+    The export with the latest AS OF date: the newest one this process
+    ingested from the drop folder, or a newer one in the history store (stored
+    by the standalone daemon, or by this app before a restart), which is then
+    published to the registry.
+    """
+    global _latest
+    stored_dates = list_snapshot_dates()
+    if stored_dates and (_latest is None or stored_dates[-1] > _latest.as_of):
+        dataset_id = open_matt_snapshot(stored_dates[-1])
+        if dataset_id is not None:
+            _latest = DroppedExport(None, stored_dates[-1], dataset_id, True)
+    return _latest
+
+
+def drop_folder_errors() -> dict[str, str]:
+    return dict(_errors)
+
+
+# --- Standalone Daemon ---
+# python -m scripts.drop_folder warms the Parquet cache, Arrow snapshots and history store for the app
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest MATT exports dropped into a folder.")
+    parser.add_argument("--folder", default=DROP_FOLDER_PATH)
+    parser.add_argument("--poll", type=float, default=DROP_FOLDER_POLL_SECONDS, help="Seconds between scans.")
+    parser.add_argument("--once", action="store_true", help="Scan once and exit (for a scheduled task).")
+    args = parser.parse_args()
+
+    reported = {}
+    while True:
+        for export in ingest_drop_folder(args.folder, 0 if args.once else args.poll):
+            print(f"{export.as_of:%m/%d/%Y} {os.path.basename(export.path)} -> {export.dataset_id}"
+                  + (" (from cache)" if export.from_cache else ""))
+        for path, error in drop_folder_errors().items():
+            if reported.get(path) != error:
+                print(f"{os.path.basename(path)}: {error}")
+        reported = drop_folder_errors()
+        if args.once:
+            return
+        time.sleep(args.poll)
+
+
+# --- Exports ---
+__all__ = [
+    "DroppedExport",
+    "find_new_exports",
+    "ingest_drop_folder",
+    "start_drop_folder_watcher",
+    "latest_dropped_export",
+    "drop_folder_errors"
+]
+
+
+if __name__ == "__main__":
+    main()
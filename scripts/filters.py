@@ -1,51 +1,175 @@
-import streamlit as st
 import datetime
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import FILTER_CACHE_MAX_MB
+from scripts.dataset_registry import get_session_dataset_id, get_session_dataset
+from scripts.date_index import get_session_date_index, date_range_mask
+from scripts.bitmap_index import filter_positions
+
+FILTER_CACHE_MAX_BYTES = FILTER_CACHE_MAX_MB * 1024 * 1024
+
+
+# --- Filter Specification ---
+class FilterSpec(NamedTuple):
+    filters: tuple = ()      # ((column, (value, ...)), ...), sorted by column
+    date_ranges: tuple = ()  # ((column, start, end, inclusive), ...), sorted by column
+
+    def with_filters(self, filters: dict | None = None, date_ranges: dict | None = None) -> 'FilterSpec':
+        """
+        A new spec with extra {column: values} filters and/or {column: (start, end[, inclusive])} ranges.
+        """
+        merged_filters = dict(self.filters)
+        merged_ranges = {column: bounds for column, *bounds in self.date_ranges}
+        merged_filters.update(filters or {})
+        merged_ranges.update(date_ranges or {})
+        return make_filter_spec(merged_filters, merged_ranges)
+
+    def date_range(self, column: str) -> tuple:
+        """
+        The (start, end) timestamps of a date range filter, or (None, None).
+        """
+        for range_column, start, end, _ in self.date_ranges:
+            if range_column == column:
+                return start, end
+        return None, None
+
+
+def make_filter_spec(filters: dict | None = None, date_ranges: dict | None = None) -> FilterSpec:
+    """
+    Builds a canonical (hashable, order-independent) FilterSpec. filters maps a
+    column to its selected values; date_ranges maps a date column to
+    (start, end) or (start, end, inclusive) as in Series.between.
+    """
+    # Values are sorted by repr so mixed types and missing values still give one canonical order
+    spec_filters = tuple(
+        (column, tuple(sorted(values, key=repr)))
+        for column, values in sorted((filters or {}).items())
+    )
+    spec_ranges = []
+    for column, bounds in sorted((date_ranges or {}).items()):
+        start, end, inclusive = (tuple(bounds) + ('both',))[:3]
+        spec_ranges.append((
+            column,
+            None if start is None else pd.Timestamp(start),
+            None if end is None else pd.Timestamp(end),
+            inclusive
+        ))
+    return FilterSpec(spec_filters, tuple(spec_ranges))
+
 
-def apply_core_filters(df):
+# --- Memoized Row Selections ---
+# (dataset ID, FilterSpec) -> row positions, shared by every page and session
+_selections: OrderedDict[tuple, np.ndarray] = OrderedDict()
+_selection_bytes = 0
+_lock = threading.Lock()
+
+
+def _compute_positions(spec: FilterSpec) -> np.ndarray:
+    mask = None
+    for column, start, end, inclusive in spec.date_ranges:
+        column_mask = date_range_mask(get_session_date_index(column), start, end, inclusive)
+        mask = column_mask if mask is None else mask & column_mask
+    if spec.filters or mask is not None:
+        return filter_positions(dict(spec.filters), mask)
+    return np.arange(len(get_session_dataset()))
+
+
+def select_rows(spec: FilterSpec) -> np.ndarray:
+    """
+    Row positions of this session's dataset selected by spec. Results are kept
+    in a process-wide LRU cache bounded by FILTER_CACHE_MAX_MB.
+    """
+    global _selection_bytes
+    cache_key = (get_session_dataset_id(), spec)
+    with _lock:
+        positions = _selections.get(cache_key)
+        if positions is not None:
+            _selections.move_to_end(cache_key)
+            return positions
+
+    positions = _compute_positions(spec)
+    positions.flags.writeable = False
+    with _lock:
+        if cache_key not in _selections:
+            _selections[cache_key] = positions
+            _selection_bytes += positions.nbytes
+        while _selection_bytes > FILTER_CACHE_MAX_BYTES and len(_selections) > 1:
+            _, evicted = _selections.popitem(last=False)
+            _selection_bytes -= evicted.nbytes
+    return positions
+
+
+def apply_filter_spec(df: pd.DataFrame, spec: FilterSpec) -> pd.DataFrame:
+    """
+    The rows of this session's dataset (df) selected by spec.
+    """
+    return df.iloc[select_rows(spec)]
+
+
+# --- Shared Sidebar Filters ---
+def apply_core_filters(df: pd.DataFrame, page_key: str, default_start: datetime.date,
+                       default_end: datetime.date, realtor: bool = True) -> FilterSpec:
+    """
+    Renders the Division, Sale Date Range, Investor Sale and (optionally)
+    Realtor/Direct sidebar filters under widget keys prefixed with page_key,
+    and returns the selection as a FilterSpec.
+    """
     st.sidebar.header("Filters")
 
     # Division
-    st.session_state.setdefault("div_selection", ["HB Dallas-Fort Worth"])
-    st.sidebar.multiselect(
+    div_selection = st.sidebar.multiselect(
         "Division",
         options=df['DIV_CODE_DESC'].dropna().unique(),
-        default=st.session_state["div_selection"],
-        key="div_selection"
+        default=["HB Dallas-Fort Worth"],
+        key=f"{page_key}_div_selection"
     )
 
     # Sale Date Range
-    st.session_state.setdefault("sale_date_range", (
-        datetime.date(2024, 9, 1),
-        datetime.date.today() - datetime.timedelta(days=1)
-    ))
-    st.sidebar.date_input(
+    sale_date_range = st.sidebar.date_input(
         "Sale Date Range",
-        value=st.session_state["sale_date_range"],
-        key="sale_date_range"
+        value=(default_start, default_end),
+        key=f"{page_key}_sale_date_range"
     )
+    if not (isinstance(sale_date_range, tuple) and len(sale_date_range) == 2):
+        st.error("Invalid date range selection.")
+        st.stop()
 
     # Investor Sale
-    st.session_state.setdefault("investor_filter", "Retail")
-    st.sidebar.selectbox(
+    investor_filter = st.sidebar.selectbox(
         "Investor Sale",
         options=["All", "Retail", "Investor"],
-        index=["All", "Retail", "Investor"].index(st.session_state["investor_filter"]),
-        key="investor_filter"
+        index=["All", "Retail", "Investor"].index("Retail"),
+        key=f"{page_key}_investor_filter"
     )
 
     # Realtor/Direct
-    st.session_state.setdefault("cobroke_filter", "All")
-    st.sidebar.selectbox(
-        "Realtor/Direct",
-        options=["All", "Realtor", "Direct"],
-        index=["All", "Realtor", "Direct"].index(st.session_state["cobroke_filter"]),
-        key="cobroke_filter"
-    )
+    cobroke_filter = "All"
+    if realtor:
+        cobroke_filter = st.sidebar.selectbox(
+            "Realtor/Direct",
+            options=["All", "Realtor", "Direct"],
+            index=["All", "Realtor", "Direct"].index("All"),
+            key=f"{page_key}_cobroke_filter"
+        )
+
+    filters = {'DIV_CODE_DESC': div_selection}
+    if investor_filter != "All":
+        filters['Investor Sale'] = [investor_filter]
+    if cobroke_filter != "All":
+        filters['Realtor/Direct'] = [cobroke_filter]
+    return make_filter_spec(filters, {'SALE_DATE': sale_date_range})
 
-    # Return parsed values if needed by the page
-    div_selection = st.session_state["div_selection"]
-    investor_filter = st.session_state["investor_filter"]
-    cobroke_filter = st.session_state["cobroke_filter"]
-    start_date, end_date = st.session_state["sale_date_range"]
 
-    return div_selection, investor_filter, cobroke_filter, start_date, end_date
\ No newline at end of file
+# --- Exports ---
+__all__ = [
+    "FilterSpec",
+    "make_filter_spec",
+    "select_rows",
+    "apply_filter_spec",
+    "apply_core_filters"
+]
@@ -0,0 +1,129 @@
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+from scripts.dataset_registry import get_dataset_index, get_session_index
+
+# Sidebar cascade, top to bottom
+HIERARCHY_LEVELS = ('Hub', 'Community Name', 'Collection', 'Plan Name')
+HIERARCHY_DATE_COLUMNS = ('SALE_DATE', 'EST_COE_DATE')
+HIERARCHY_INDEX_NAME = "hierarchy"
+
+
+# --- Hierarchy Nodes ---
+class HierarchyNode(NamedTuple):
+    children: dict     # child label (None if missing) -> HierarchyNode; empty for plans
+    date_ranges: dict  # date column -> (first, last) over the node's rows, or None if no dates
+    dates: dict        # date column -> sorted dates (plan-level nodes only)
+
+
+def _date_range(dates: np.ndarray):
+    return (dates[0], dates[-1]) if len(dates) else None
+
+
+def _merge_ranges(ranges: list):
+    ranges = [r for r in ranges if r is not None]
+    if not ranges:
+        return None
+    return min(r[0] for r in ranges), max(r[1] for r in ranges)
+
+
+def _build_node(tree: dict, depth: int) -> HierarchyNode:
+    if depth == len(HIERARCHY_LEVELS):
+        # tree holds the sorted dates of one Hub/Community/Collection/Plan combination
+        return HierarchyNode({}, {col: _date_range(tree[col]) for col in tree}, tree)
+    children = {label: _build_node(subtree, depth + 1) for label, subtree in tree.items()}
+    date_ranges = {
+        col: _merge_ranges([child.date_ranges[col] for child in children.values()])
+        for col in HIERARCHY_DATE_COLUMNS
+    }
+    return HierarchyNode(children, date_ranges, {})
+
+
+def build_hierarchy_index(df: pd.DataFrame) -> HierarchyNode:
+    """
+    Nests Hub -> Community -> Collection -> Plan labels found in the data, with
+    the first/last SALE_DATE and EST_COE_DATE under every node.
+    """
+    date_values = {col: df[col].to_numpy(dtype='datetime64[ns]') for col in HIERARCHY_DATE_COLUMNS}
+    groups = df.groupby(list(HIERARCHY_LEVELS), observed=True, dropna=False, sort=False).indices
+
+    tree = {}
+    for key, positions in groups.items():
+        branch = tree
+        labels = [None if pd.isna(label) else label for label in key]
+        for label in labels[:-1]:
+            branch = branch.setdefault(label, {})
+        leaf = {}
+        for col, values in date_values.items():
+            dates = values[positions]
+            leaf[col] = np.sort(dates[~np.isnat(dates)])
+        branch[labels[-1]] = leaf
+    return _build_node(tree, 0)
+
+
+# --- Cascading Options ---
+def _bound(value) -> np.datetime64:
+    return pd.Timestamp(value).to_datetime64().astype('datetime64[ns]')
+
+
+def _has_dates_in_range(node: HierarchyNode, column: str, start: np.datetime64, end: np.datetime64) -> bool:
+    date_range = node.date_ranges.get(column)
+    if date_range is None or date_range[1] < start or date_range[0] > end:
+        return False
+    if start <= date_range[0] and date_range[1] <= end:
+        return True
+    if not node.children:
+        dates = node.dates[column]
+        return np.searchsorted(dates, end, side='right') > np.searchsorted(dates, start, side='left')
+    return any(_has_dates_in_range(child, column, start, end) for child in node.children.values())
+
+
+def hierarchy_options(root: HierarchyNode, selections: list, date_column: str | None = None,
+                      start=None, end=None) -> list:
+    """
+    Sorted labels one level below the given selections, e.g. [] lists hubs and
+    [hubs, communities] lists collections. With date_column, only labels with a
+    date between start and end (inclusive) are listed.
+    """
+    nodes = [root]
+    for values in selections:
+        nodes = [node.children[label] for node in nodes for label in set(values) if label in node.children]
+
+    if date_column is not None:
+        start, end = _bound(start), _bound(end)
+
+    labels = set()
+    for node in nodes:
+        for label, child in node.children.items():
+            if label is None or label in labels:
+                continue
+            if date_column is None or _has_dates_in_range(child, date_column, start, end):
+                labels.add(label)
+    return sorted(labels)
+
+
+# --- Session Dataset Hierarchy ---
+def build_dataset_hierarchy(dataset_id: str) -> None:
+    """
+    Builds the hierarchy index of a dataset at ingest.
+    """
+    get_dataset_index(dataset_id, HIERARCHY_INDEX_NAME, build_hierarchy_index)
+
+
+def get_session_hierarchy() -> HierarchyNode | None:
+    """
+    Hierarchy index of this session's dataset, shared by every page and session.
+    """
+    return get_session_index(HIERARCHY_INDEX_NAME, build_hierarchy_index)
+
+
+# --- Exports ---
+__all__ = [
+    "HIERARCHY_LEVELS",
+    "HierarchyNode",
+    "build_hierarchy_index",
+    "hierarchy_options",
+    "build_dataset_hierarchy",
+    "get_session_hierarchy"
+]
@@ -0,0 +1,145 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable
+
+from scripts.matt_compression import open_matt_source
+from scripts.stream_ingest import ingest_matt_source
+from scripts.matt_cache import compute_cache_key, store_cached_matt
+from scripts.dataset_registry import get_dataset, publish_dataset, registered_dataset_ids
+from scripts.arrow_snapshot import write_arrow_snapshot
+from scripts.snapshot_store import store_matt_snapshot
+from scripts.bitmap_index import build_filter_indexes
+from scripts.hierarchy_index import build_dataset_hierarchy
+from scripts.sales_cube import build_dataset_sales_cube
+from scripts.status_timeline import build_dataset_status_timeline
+
+# Share of overall progress at which the storing stages start (reading and processing come first)
+SAVING_START = 0.8
+INDEXING_START = 0.9
+# Stages that store or publish the dataset; a job can no longer be cancelled once it reaches one
+COMMIT_STAGES = ('Saving', 'Building indexes')
+MAX_FINISHED_JOBS = 20
+
+# One ingest at a time per process: concurrent ones would share temporary file names and stack peak memory
+_ingest_lock = threading.Lock()
+
+
+class IngestCancelled(Exception):
+    pass
+
+
+# --- Ingest Pipeline ---
+def ingest_matt_bytes(raw_bytes: bytes, report: Callable[[str, float], None] | None = None) -> tuple[str, bool]:
+    """
+    Processes a raw MATT export (plain or compressed CSV), stores it (Parquet
+    cache, history store, Arrow snapshot), publishes it to the registry and
+    builds its indexes. report(stage, progress) is called as each reading,
+    processing and storing step starts; it may raise to cancel the ingest
+    until a COMMIT_STAGES stage is reported. Ingests run one at a time per
+    process. Returns the dataset ID and whether it was already available.
+    """
+    report = report or (lambda stage, progress: None)
+    dataset_id = compute_cache_key(raw_bytes)
+    with _ingest_lock:
+        if get_dataset(dataset_id) is not None:
+            return dataset_id, True
+
+        source, size = open_matt_source(raw_bytes)
+        processed_df = ingest_matt_source(source, size, lambda step, fraction: report(step, SAVING_START * fraction))
+
+        # Reporting the first commit stage is the last chance to cancel; nothing is stored before it
+        report('Saving', SAVING_START)
+        store_cached_matt(dataset_id, processed_df, registered_dataset_ids())
+        store_matt_snapshot(dataset_id, processed_df)
+        write_arrow_snapshot(dataset_id, processed_df)
+        publish_dataset(dataset_id, processed_df)
+
+        report('Building indexes', INDEXING_START)
+        build_filter_indexes(dataset_id)
+        build_dataset_hierarchy(dataset_id)
+        build_dataset_sales_cube(dataset_id)
+        build_dataset_status_timeline(dataset_id)
+        report('Building indexes', 1.0)
+        return dataset_id, False
+
+
+# --- Background Jobs ---
+class IngestJob:
+    """
+    State of one background ingest, written by its worker thread and read by
+    the upload page on every rerun.
+    """
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = 'running'  # running, done, failed or cancelled
+        self.stage = 'Queued'
+        self.progress = 0.0
+        self.dataset_id = None
+        self.from_cache = False
+        self.error = None
+        self.committed = False  # storing has started; cancel no longer applies
+        self.cancel_event = threading.Event()
+
+    def report(self, stage: str, progress: float) -> None:
+        if not self.committed and self.cancel_event.is_set():
+            raise IngestCancelled()
+        self.committed = self.committed or stage in COMMIT_STAGES
+        self.stage, self.progress = stage, progress
+
+
+# Process-wide, so a job outlives the script run (and session) that started it
+_jobs: OrderedDict[str, IngestJob] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _run_job(job: IngestJob, raw_bytes: bytes) -> None:
+    try:
+        job.dataset_id, job.from_cache = ingest_matt_bytes(raw_bytes, job.report)
+        job.status = 'done'
+    except IngestCancelled:
+        job.status = 'cancelled'
+    except Exception as e:
+        job.error = e
+        job.status = 'failed'
+
+
+def start_ingest_job(raw_bytes: bytes) -> str:
+    """
+    Starts ingesting a raw MATT export on a background thread and returns the job ID.
+    """
+    job = IngestJob(uuid.uuid4().hex)
+    with _lock:
+        _jobs[job.job_id] = job
+        finished = [job_id for job_id, other in _jobs.items() if other.status != 'running']
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[job_id]
+
+    threading.Thread(target=_run_job, args=(job, raw_bytes), name=f"matt-ingest-{job.job_id}", daemon=True).start()
+    return job.job_id
+
+
+def get_ingest_job(job_id: str | None) -> IngestJob | None:
+    with _lock:
+        return _jobs.get(job_id) if job_id else None
+
+
+def cancel_ingest_job(job_id: str) -> None:
+    """
+    Asks a running job to stop; it does so at its next progress report, unless
+    it has started storing the dataset.
+    """
+    job = get_ingest_job(job_id)
+    if job is not None:
+        job.cancel_event.set()
+
+
+# --- Exports ---
+__all__ = [
+    "IngestCancelled",
+    "ingest_matt_bytes",
+    "IngestJob",
+    "start_ingest_job",
+    "get_ingest_job",
+    "cancel_ingest_job"
+]
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import pandas as pd
+
+from config import ENABLE_CACHE, CACHE_DIR, CACHE_MAX_MB
+from scripts.dimensions import BASE_DIR, REFERENCE_PATHS
+from scripts.process_matt import PROCESSING_VERSION
+
+# --- Cache Location ---
+CACHE_PATH = os.path.join(BASE_DIR, CACHE_DIR)
+CACHE_MAX_BYTES = CACHE_MAX_MB * 1024 * 1024
+
+
+# --- Cache Key ---
+def compute_cache_key(raw_bytes: bytes) -> str:
+    """
+    Hashes the uploaded MATT bytes together with the reference tables
+    (Hub, Plan, Investor NHC) and the processing version, so any change to
+    one of them yields a new key.
+    """
+    digest = hashlib.sha256()
+    digest.update(PROCESSING_VERSION.encode())
+    digest.update(raw_bytes)
+    for path in REFERENCE_PATHS:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _cache_file(key: str) -> str:
+    return os.path.join(CACHE_PATH, f"{key}.parquet")
+
+
+# --- Load / Store ---
+def load_cached_matt(key: str) -> pd.DataFrame | None:
+    """
+    Returns the processed MATT frame stored under key, or None on a cache miss.
+    """
+    path = _cache_file(key)
+    if not ENABLE_CACHE or not os.path.exists(path):
+        return None
+
+    try:
+        df = pd.read_parquet(path)
+    except (ImportError, ValueError, OSError):
+        return None
+
+    # Touch the file so eviction treats it as recently used
+    os.utime(path)
+    return df
+
+
+def store_cached_matt(key: str, df: pd.DataFrame, in_use: set[str] = frozenset()) -> bool:
+    """
+    Writes the processed MATT frame to the cache and evicts old entries
+    (never the files of the in_use dataset IDs). Returns False if the frame could not be cached (e.g. pyarrow missing).
+    """
+    if not ENABLE_CACHE:
+        return False
+
+    os.makedirs(CACHE_PATH, exist_ok=True)
+    path = _cache_file(key)
+    tmp_path = path + ".tmp"
+    try:
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except (ImportError, ValueError, TypeError, OSError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+    evict_cache(in_use=in_use)
+    return True
+
+
+# --- Size-Bounded Eviction ---
+def evict_cache(max_bytes: int = CACHE_MAX_BYTES, in_use: set[str] = frozenset()) -> None:
+    """
+    Removes least recently used cache files (Parquet results and Arrow snapshots)
+    until the cache fits in max_bytes. Files of the in_use dataset IDs (e.g.
+    the registered datasets, whose snapshots may be memory-mapped) count
+    toward the total but are never removed.
+    """
+    if not os.path.isdir(CACHE_PATH):
+        return
+
+    entries, total = [], 0
+    for name in os.listdir(CACHE_PATH):
+        if not name.endswith((".parquet", ".arrow")):
+            continue
+        path = os.path.join(CACHE_PATH, name)
+        stat = os.stat(path)
+        total += stat.st_size
+        if os.path.splitext(name)[0] not in in_use:
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+
+# --- Exports ---
+__all__ = [
+    "compute_cache_key",
+    "load_cached_matt",
+    "store_cached_matt",
+    "evict_cache"
+]
@@ -0,0 +1,94 @@
+import gzip
+import io
+import zipfile
+
+try:
+    import pyarrow as pa
+except ImportError:  # .zst exports are decompressed by pyarrow; gzip and zip are always available
+    pa = None
+
+# --- Compressed Formats ---
+# Formats are told apart by their leading bytes, so file names do not matter
+GZIP_MAGIC = b'\x1f\x8b'
+ZIP_MAGIC = b'PK\x03\x04'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# File types accepted by the upload page
+ZSTD_AVAILABLE = pa is not None and pa.Codec.is_available('zstd')
+UPLOAD_TYPES = ["csv", "gz", "zip"] + (["zst"] if ZSTD_AVAILABLE else [])
+
+# Frame header field sizes by flag value (see RFC 8878, section 3.1.1.1)
+ZSTD_DICT_ID_SIZES = (0, 1, 2, 4)
+ZSTD_CONTENT_SIZE_SIZES = (0, 2, 4, 8)
+
+
+def _zip_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    members = [
+        info for info in archive.infolist()
+        if not info.is_dir() and not info.filename.startswith('__MACOSX/')
+    ]
+    csv_members = [info for info in members if info.filename.lower().endswith('.csv')] or members
+    if len(csv_members) != 1:
+        raise ValueError("The zip file must contain exactly one MATT CSV file.")
+    return csv_members[0]
+
+
+class _CountingReader(io.RawIOBase):
+    # Arrow's decompressing streams cannot report their position; this one counts the bytes read
+    def __init__(self, stream):
+        self._stream = stream
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = self._stream.readinto(buffer)
+        self._position += count
+        return count
+
+    def tell(self) -> int:
+        return self._position
+
+
+def _zstd_content_size(raw_bytes: bytes) -> int | None:
+    # Decompressed size recorded in the first frame header, if the compressor wrote it
+    descriptor = raw_bytes[4]
+    single_segment = descriptor >> 5 & 1
+    size_bytes = ZSTD_CONTENT_SIZE_SIZES[descriptor >> 6] or single_segment
+    if not size_bytes:
+        return None
+    start = 5 + (not single_segment) + ZSTD_DICT_ID_SIZES[descriptor & 3]
+    size = int.from_bytes(raw_bytes[start:start + size_bytes], 'little')
+    return size + 256 if size_bytes == 2 else size
+
+
+def open_matt_source(raw_bytes: bytes) -> tuple[io.BufferedIOBase, int | None]:
+    """
+    A binary stream of the CSV in raw_bytes, which may be plain or compressed
+    with gzip, zip or zstd, and its decompressed size (None if the file does
+    not record it). Compressed data is decompressed as the stream is read.
+    """
+    if raw_bytes.startswith(GZIP_MAGIC):
+        # The trailer holds the decompressed size modulo 4 GB
+        return gzip.GzipFile(fileobj=io.BytesIO(raw_bytes)), int.from_bytes(raw_bytes[-4:], 'little')
+
+    if raw_bytes.startswith(ZIP_MAGIC):
+        archive = zipfile.ZipFile(io.BytesIO(raw_bytes))
+        member = _zip_member(archive)
+        return archive.open(member), member.file_size
+
+    if raw_bytes.startswith(ZSTD_MAGIC):
+        if not ZSTD_AVAILABLE:
+            raise ValueError("Reading .zst files requires pyarrow built with zstd support.")
+        stream = pa.CompressedInputStream(pa.BufferReader(raw_bytes), 'zstd')
+        return io.BufferedReader(_CountingReader(stream)), _zstd_content_size(raw_bytes)
+
+    return io.BytesIO(raw_bytes), len(raw_bytes)
+
+
+# --- Exports ---
+__all__ = [
+    "UPLOAD_TYPES",
+    "open_matt_source"
+]
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+from scripts.matt_schema import HOMESITE_KEY
+from scripts.delta_ingest import ROW_HASH_COLUMN
+
+# Columns identifying a homesite in every change set
+DIFF_ID_COLUMNS = ['DIV_CODE_DESC', 'Hub', 'Community Name', *HOMESITE_KEY, 'Plan Name']
+# Prices compared between exports
+DIFF_PRICE_COLUMNS = ['BASE_PRICE', 'Net_Sales_Price']
+
+CHANGE_CATEGORIES = [
+    'New Sales', 'Cancellations', 'COE Slips', 'Price Changes',
+    'Status Changes', 'New Homesites', 'Removed Homesites'
+]
+
+
+# --- Keyed Match ---
+def match_homesites(old_df: pd.DataFrame, new_df: pd.DataFrame) -> np.ndarray:
+    """
+    Position of each new_df homesite (COMMUNITY + HOMESITE) in old_df, or -1
+    if it is new. Keys are matched through a hash table on the old export.
+    """
+    old_keys = pd.MultiIndex.from_frame(old_df[HOMESITE_KEY])
+    new_keys = pd.MultiIndex.from_frame(new_df[HOMESITE_KEY])
+    keep = ~old_keys.duplicated(keep='last')  # a repeated homesite matches its last row
+    found = old_keys[keep].get_indexer(new_keys)
+    return np.where(found >= 0, np.flatnonzero(keep)[np.maximum(found, 0)], -1)
+
+
+def _changed(old: pd.Series, new: pd.Series) -> np.ndarray:
+    # Missing on both sides counts as equal; categoricals compare by label
+    old = old.astype(object) if isinstance(old.dtype, pd.CategoricalDtype) else old
+    new = new.astype(object) if isinstance(new.dtype, pd.CategoricalDtype) else new
+    old, new = old.reset_index(drop=True), new.reset_index(drop=True)
+    both_missing = (old.isna() & new.isna()).to_numpy()
+    equal = (old == new).fillna(False).to_numpy(dtype=bool)
+    return ~(equal | both_missing)
+
+
+# --- Change Sets ---
+def compare_matt_exports(old_df: pd.DataFrame, new_df: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Compares two processed MATT exports homesite by homesite and returns one
+    DataFrame per CHANGE_CATEGORIES entry. Rows whose raw row hash is equal in
+    both exports are skipped before any column is compared.
+    """
+    old_positions = match_homesites(old_df, new_df)
+    matched = np.flatnonzero(old_positions >= 0)
+    if ROW_HASH_COLUMN in old_df.columns and ROW_HASH_COLUMN in new_df.columns:
+        old_hashes = old_df[ROW_HASH_COLUMN].to_numpy()[old_positions[matched]]
+        matched = matched[old_hashes != new_df[ROW_HASH_COLUMN].to_numpy()[matched]]
+
+    old_rows = old_df.iloc[old_positions[matched]].reset_index(drop=True)
+    new_rows = new_df.iloc[matched].reset_index(drop=True)
+    ids = new_rows[DIFF_ID_COLUMNS]
+
+    def change_set(mask: np.ndarray, columns: dict) -> pd.DataFrame:
+        changes = ids[mask].copy()
+        for name, values in columns.items():
+            changes[name] = values[mask]
+        return changes.reset_index(drop=True)
+
+    old_sale, new_sale = old_rows['SALE_DATE'], new_rows['SALE_DATE']
+    old_cancel, new_cancel = old_rows['SALES_CANCELLATION_DATE'], new_rows['SALES_CANCELLATION_DATE']
+    old_coe, new_coe = old_rows['EST_COE_DATE'], new_rows['EST_COE_DATE']
+    old_status, new_status = old_rows['HS_TYPE_LABEL'].astype(object), new_rows['HS_TYPE_LABEL'].astype(object)
+
+    sale_changed = _changed(old_sale, new_sale)
+    cancel_changed = _changed(old_cancel, new_cancel)
+    new_sales = new_sale.notna().to_numpy() & sale_changed
+    cancellations = (new_cancel.notna().to_numpy() & cancel_changed) | (old_sale.notna() & new_sale.isna()).to_numpy()
+    coe_slips = old_coe.notna().to_numpy() & new_coe.notna().to_numpy() & _changed(old_coe, new_coe)
+    price_changes = np.zeros(len(new_rows), dtype=bool)
+    for col in DIFF_PRICE_COLUMNS:
+        price_changes |= _changed(old_rows[col], new_rows[col])
+
+    change_sets = {
+        'New Sales': change_set(new_sales, {
+            'Previous Sale Date': old_sale, 'Sale Date': new_sale, 'Net Sales Price': new_rows['Net_Sales_Price']
+        }),
+        'Cancellations': change_set(cancellations, {
+            'Previous Sale Date': old_sale, 'Cancellation Date': new_cancel, 'Status': new_status
+        }),
+        'COE Slips': change_set(coe_slips, {
+            'Previous EST COE': old_coe, 'EST COE': new_coe, 'Days Slipped': (new_coe - old_coe).dt.days
+        }),
+        'Price Changes': change_set(price_changes, {
+            'Previous Base Price': old_rows['BASE_PRICE'], 'Base Price': new_rows['BASE_PRICE'],
+            'Previous Net Sales Price': old_rows['Net_Sales_Price'], 'Net Sales Price': new_rows['Net_Sales_Price'],
+            'Net Price Change': new_rows['Net_Sales_Price'] - old_rows['Net_Sales_Price']
+        }),
+        'Status Changes': change_set(_changed(old_status, new_status), {
+            'Previous Status': old_status, 'Status': new_status
+        })
+    }
+
+    # Homesites present in only one export
+    removed = np.ones(len(old_df), dtype=bool)
+    removed[old_positions[old_positions >= 0]] = False
+    change_sets['New Homesites'] = new_df.loc[old_positions < 0, DIFF_ID_COLUMNS + ['HS_TYPE_LABEL']].reset_index(drop=True)
+    change_sets['Removed Homesites'] = old_df.loc[removed, DIFF_ID_COLUMNS + ['HS_TYPE_LABEL']].reset_index(drop=True)
+    return change_sets
+
+
+def status_transitions(status_changes: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count of homesites per (previous status -> status) transition.
+    """
+    return pd.crosstab(
+        status_changes['Previous Status'].fillna('None'), status_changes['Status'].fillna('None')
+    )
+
+
+# --- Exports ---
+__all__ = [
+    "CHANGE_CATEGORIES",
+    "match_homesites",
+    "compare_matt_exports",
+    "status_transitions"
+]
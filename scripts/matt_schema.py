@@ -0,0 +1,444 @@
+from typing import Iterator, NamedTuple
+import csv
+import io
+import itertools
+import re
+from datetime import datetime
+import pandas as pd
+
+from config import CSV_ENGINE, MATT_MAX_AGE_DAYS
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # Arrow engine is optional; the pandas C engine is always available
+    pa = None
+    pa_csv = None
+
+# --- MATT Column Schema ---
+# kind drives the read dtype; used marks columns the app needs (others are skipped at read time)
+class MattColumn(NamedTuple):
+    name: str
+    kind: str
+    used: bool = False
+    date_format: str | None = None
+
+DATE_FORMAT = "%m/%d/%Y"
+TIME_FORMAT = "%H:%M:%S"
+
+MATT_SCHEMA = [
+    MattColumn("Textbox1", "str", True),  # "The MATT AS OF 7/25/2025"
+    MattColumn("Textbox8", "str"),
+    MattColumn("DIV_CODE_DESC", "str", True),
+    MattColumn("PROJECT", "str", True),
+    MattColumn("BUYER_NAME", "str", True),
+    MattColumn("HOMESITE_ADDRESS1", "str"),
+    MattColumn("HOMESITE_CITY1", "str"),
+    MattColumn("HOMESITE_STATE1", "str"),
+    MattColumn("HOMESITE_ZIP_CODE1", "str"),
+    MattColumn("COMMUNITY", "int", True),
+    MattColumn("HOMESITE", "str", True),
+    MattColumn("JOB_TYPE_NUMBER", "int"),
+    MattColumn("PLAN_CODE", "str", True),
+    MattColumn("ELEVATION", "str"),
+    MattColumn("SWING", "str"),
+    MattColumn("ARCHITECTURE_PLAN", "str"),
+    MattColumn("BASE_PRICE", "money", True),
+    MattColumn("BASEPRICE_ADJUSTMENT2", "money", True),
+    MattColumn("HOMESITE_PREMIUM", "money", True),
+    MattColumn("OPTION_REVENUE", "money", True),
+    MattColumn("PRICE_REDUCTION_INCENTIVES", "money", True),
+    MattColumn("OPTION_INCENTIVES", "money", True),
+    MattColumn("LENDER_FEE_INCENTIVES", "money", True),
+    MattColumn("CLOSING_COSTS", "money", True),
+    MattColumn("EST_CL_COSTS", "money", True),
+    MattColumn("OTHER_INCENTIVES", "money", True),
+    MattColumn("Textbox22", "money", True),  # Net sales price
+    MattColumn("TOTAL_SQFT", "float", True),
+    MattColumn("LAND_COST_AMOUNT", "money", True),
+    MattColumn("SITE_DEVELOPMENT2", "money", True),
+    MattColumn("LAND_OPTION_MAINTENANCE", "money", True),
+    MattColumn("DIRECT_COSTS", "money", True),
+    MattColumn("OPTION_COSTS", "money", True),
+    MattColumn("INSURANCE_ALLOCATION", "money", True),
+    MattColumn("PERMITS_AND_FEES", "money", True),
+    MattColumn("WARRANTY", "money", True),
+    MattColumn("CAPD_INTEREST", "money", True),
+    MattColumn("PROPETY_TAX", "money", True),
+    MattColumn("CONTINGENCY1", "money", True),
+    MattColumn("Textbox241", "money", True),
+    MattColumn("TOTAL_COST", "money", True),
+    MattColumn("FIELD_EXPENSE", "money", True),
+    MattColumn("CURR_PROJ_GM_WO_FIELD_AMT", "money", True),
+    MattColumn("CURR_PROJ_GM_WO_FIELD_PCT", "percent", True),
+    MattColumn("CURR_PROJ_GM_POST_FIELD_AMT", "money", True),
+    MattColumn("CURR_PROJ_GM_POST_FIELD_PCT", "percent", True),
+    MattColumn("OPTION_GM_AMT", "money", True),
+    MattColumn("OPTION_GM_PCT", "percent", True),
+    MattColumn("REL_FOR_SALE", "date", True, DATE_FORMAT),
+    MattColumn("SALE_DATE", "date", True, DATE_FORMAT),
+    MattColumn("EST_COE_DATE", "date", True, DATE_FORMAT),
+    MattColumn("CLOSING_DATE", "date", True, DATE_FORMAT),
+    MattColumn("Textbox4", "str", True),  # Homesite status code
+    MattColumn("PRODUCT_TYPE", "str"),
+    MattColumn("ACTUAL_PERMIT_PICKUP_DATE", "date", True, DATE_FORMAT),
+    MattColumn("CONTRACT_START", "date", True, DATE_FORMAT),
+    MattColumn("PLANNED_START_DATE", "date", True, DATE_FORMAT),
+    MattColumn("TRENCH_DATE", "date", True, DATE_FORMAT),
+    MattColumn("EST_DELIVERABLE_DATE", "date", True, DATE_FORMAT),
+    MattColumn("CONSTRUCTION_COMPLETE_DATE", "date", True, DATE_FORMAT),
+    MattColumn("Textbox60", "str"),
+    MattColumn("CONSTRUCTION_MANAGER", "str"),
+    MattColumn("HOME_AUTOMATION_PACKAGE", "str"),
+    MattColumn("AUTOMATION_KIT_RECEIVED_DATE", "date", True, DATE_FORMAT),
+    MattColumn("ACTIVATION_DATE_SCHEDULED", "date", True, DATE_FORMAT),
+    MattColumn("ACTIVATION_DATE_COMPLETED", "date", True, DATE_FORMAT),
+    MattColumn("CAMERA_STANDARD", "str"),
+    MattColumn("AFE", "str"),
+    MattColumn("COBROKE_Y_N", "str", True),
+    MattColumn("COBROKE_AMOUNT", "money", True),
+    MattColumn("BROKER_BNS", "float"),
+    MattColumn("BROKER_NAME", "str"),
+    MattColumn("NHC_NAME", "str", True),
+    MattColumn("NHC_NAME2", "str"),
+    MattColumn("NHC_NAME3", "str"),
+    MattColumn("ESCROW_COMMENTS", "str"),
+    MattColumn("ORG_DELIVERABL", "date", True, DATE_FORMAT),
+    MattColumn("LOAN_TYPE", "str"),
+    MattColumn("LENDER", "str"),
+    MattColumn("PPA_ADJUST_LAND", "money", True),
+    MattColumn("PPA_ADJUST_BACKLOG", "money", True),
+    MattColumn("QA_DATE", "date", True, DATE_FORMAT),
+    MattColumn("RISK_ASSESSMENT", "str"),
+    MattColumn("MORTGAGE_COMPANY_NAME", "str"),
+    MattColumn("PHASE_DESCRIPTION", "str"),
+    MattColumn("INVENTORY", "str"),
+    MattColumn("FLOOR_CARP_ACT", "str"),
+    MattColumn("Leaseback", "str"),
+    MattColumn("Misc2", "str"),
+    MattColumn("Misc3", "str"),
+    MattColumn("WALK_1_DATE_D", "date", True, DATE_FORMAT),
+    MattColumn("WALK_1_DATE_T", "time", False, TIME_FORMAT),
+    MattColumn("WALK_2_DATE_D", "date", True, DATE_FORMAT),
+    MattColumn("WALK_2_DATE_T", "time", False, TIME_FORMAT),
+    MattColumn("NEW_TOTAL_PRICE", "money", True),
+    MattColumn("LONGITUDE", "float"),
+    MattColumn("LATITUDE", "float"),
+    MattColumn("LAND_INTEREST", "money", True),
+    MattColumn("ESCROW_COMPANY", "str"),
+    MattColumn("LAND_SOURCE", "str"),
+    MattColumn("LT_TD_DATE", "date", True, DATE_FORMAT),
+    MattColumn("CIP_COMMON", "money", True),
+    MattColumn("SIGN_OFF", "str"),
+    MattColumn("RELEASE_DATE", "date", True, DATE_FORMAT),
+    MattColumn("LOT_MASTER_STATUS", "str"),
+    MattColumn("SALES_CANCELLATION_DATE", "date", True, DATE_FORMAT),
+    MattColumn("PROFIT_PARTICIPATION", "money", True),
+]
+
+# Export date stamped on every row of Textbox1
+AS_OF_COLUMN = "Textbox1"
+AS_OF_PATTERN = re.compile(r"AS OF\s+(\d{1,2}/\d{1,2}/\d{4})", re.IGNORECASE)
+
+# Columns that identify one homesite within an export
+HOMESITE_KEY = ["COMMUNITY", "HOMESITE"]
+
+# --- Required headers for validation (same names, new positions) ---
+REQUIRED_COLUMNS = {
+    "DIV_CODE_DESC", "PROJECT", "BUYER_NAME", "COMMUNITY",
+    "PLAN_CODE", "SALE_DATE", "NHC_NAME", "SALES_CANCELLATION_DATE"
+}
+
+# Money, percent and date columns are read as text and parsed during processing
+KIND_DTYPES = {
+    'str': str,
+    'money': str,
+    'percent': str,
+    'date': str,
+    'time': str,
+    'float': 'float64',
+    'int': 'Int64'
+}
+
+USED_COLUMNS = {col.name for col in MATT_SCHEMA if col.used} | REQUIRED_COLUMNS
+MATT_DTYPES = {col.name: KIND_DTYPES[col.kind] for col in MATT_SCHEMA}
+MATT_KINDS = {col.name: col.kind for col in MATT_SCHEMA}
+DATE_FORMATS = {col.name: col.date_format for col in MATT_SCHEMA if col.kind == 'date'}
+
+
+def missing_required_columns(columns) -> set[str]:
+    """
+    Returns the required MATT headers absent from columns (ignoring stray whitespace).
+    """
+    return REQUIRED_COLUMNS - {str(col).strip() for col in columns}
+
+
+def parse_as_of_date(df: pd.DataFrame) -> pd.Timestamp | None:
+    """
+    The export date from the "The MATT AS OF m/d/yyyy" stamp, or None if the
+    stamp is missing or unreadable.
+    """
+    if AS_OF_COLUMN not in df.columns:
+        return None
+    stamps = df[AS_OF_COLUMN].dropna()
+    return _parse_as_of_stamp(str(stamps.iloc[0])) if len(stamps) else None
+
+
+def _parse_as_of_stamp(stamp: str) -> pd.Timestamp | None:
+    match = AS_OF_PATTERN.search(stamp)
+    if match is None:
+        return None
+    as_of = pd.to_datetime(match.group(1), format=DATE_FORMAT, errors='coerce')
+    return None if pd.isna(as_of) else as_of
+
+
+# --- Typed, Column-Projected MATT Reader ---
+def read_matt_csv(source, all_columns: bool = False, engine: str = CSV_ENGINE) -> pd.DataFrame:
+    """
+    Reads a raw MATT export using the schema: only used columns are parsed
+    (unless all_columns is set) and each one gets its declared dtype.
+
+    engine="pyarrow" uses the multi-threaded Arrow CSV reader with Arrow-backed
+    strings, falling back to the pandas C engine if pyarrow is missing or
+    cannot parse the file.
+    """
+    if engine == "pyarrow" and pa_csv is not None:
+        start = source.tell() if hasattr(source, 'read') else None
+        try:
+            return _read_matt_csv_arrow(source, all_columns)
+        except pa.ArrowInvalid:
+            if start is not None:
+                source.seek(start)
+
+    usecols = None if all_columns else (lambda col: col.strip() in USED_COLUMNS)
+    df = pd.read_csv(source, usecols=usecols, dtype=MATT_DTYPES)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+def _last_row_end(data: bytes) -> int:
+    # End of the last complete row: a newline with an even number of quotes before it
+    quotes = data.count(b'"')
+    end = data.rfind(b'\n')
+    while end >= 0:
+        if (quotes - data.count(b'"', end)) % 2 == 0:
+            return end + 1
+        end = data.rfind(b'\n', 0, end)
+    return -1
+
+
+def iter_matt_csv(source, chunk_bytes: int) -> Iterator[pd.DataFrame]:
+    """
+    Reads a raw MATT export from a binary stream about chunk_bytes at a time.
+    Blocks are cut at row boundaries (newlines outside quoted fields) and
+    parsed by read_matt_csv with the header repeated, so only one block is
+    held in memory.
+    """
+    header = source.readline()
+    remainder = b''
+    while True:
+        block = source.read(chunk_bytes)
+        data = remainder + block
+        if not block:
+            if data.strip():
+                yield read_matt_csv(io.BytesIO(header + data))
+            return
+        end = _last_row_end(data)
+        if end <= 0:
+            remainder = data
+            continue
+        remainder = data[end:]
+        yield read_matt_csv(io.BytesIO(header + data[:end]))
+
+
+def read_matt_header(source) -> list[str]:
+    """
+    Returns the raw header names of a MATT export. A seekable source is left
+    where it was; a non-seekable one (such as a decompressing stream) is read
+    past the header.
+    """
+    if hasattr(source, 'read'):
+        start = source.tell() if source.seekable() else None
+        first_line = source.readline()
+        if start is not None:
+            source.seek(start)
+    else:
+        with open(source, 'rb') as f:
+            first_line = f.readline()
+    if isinstance(first_line, bytes):
+        first_line = first_line.decode('utf-8-sig')
+    return next(csv.reader(io.StringIO(first_line.lstrip('\ufeff'))))
+
+
+def _read_sample(source, sample_bytes: int) -> bytes:
+    # Up to sample_bytes from the start of source, cut after the last complete row (seekable sources are rewound)
+    if hasattr(source, 'read'):
+        start = source.tell() if source.seekable() else None
+        sample = source.read(sample_bytes)
+        if start is not None:
+            source.seek(start)
+    else:
+        with open(source, 'rb') as f:
+            sample = f.read(sample_bytes)
+    return sample[:max(_last_row_end(sample), 0)]
+
+
+def _sample_rows(sample: bytes, max_rows: int) -> tuple[list[str], list[list[str]]]:
+    rows = list(itertools.islice(csv.reader(io.StringIO(sample.decode('utf-8-sig').lstrip('\ufeff'))), max_rows + 1))
+    return ([col.strip() for col in rows[0]], rows[1:]) if rows else ([], [])
+
+
+def read_matt_as_of(source, sample_bytes: int = 1024 * 1024) -> pd.Timestamp | None:
+    """
+    The AS OF date of a MATT export from its header and first row alone
+    (seekable sources are rewound). None if the stamp is missing or unreadable.
+    """
+    header, rows = _sample_rows(_read_sample(source, sample_bytes), 1)
+    stamp = dict(zip(header, rows[0])).get(AS_OF_COLUMN) if rows else None
+    return _parse_as_of_stamp(stamp) if stamp else None
+
+
+# --- Header-Only Validation ---
+class MattValidation(NamedTuple):
+    columns: list[str]
+    has_bom: bool
+    as_of: pd.Timestamp | None
+    errors: list[str]    # the file cannot be ingested
+    warnings: list[str]  # the file can be ingested, with gaps
+
+
+UTF16_BOMS = (b'\xff\xfe', b'\xfe\xff')
+UTF8_BOM = b'\xef\xbb\xbf'
+INT_PATTERN = re.compile(r'-?\d+')
+
+
+def _readable(text: str, kind: str, date_format: str | None) -> bool:
+    # Whether the reader (numeric kinds) or processing (money, percent, date) can parse a non-blank value
+    if kind == 'int':
+        return INT_PATTERN.fullmatch(text) is not None
+    if kind in ('money', 'percent'):
+        for token in ('$', ',', '(', ')', '%'):
+            text = text.replace(token, '')
+    if kind in ('float', 'money', 'percent'):
+        try:
+            float(text)
+        except ValueError:
+            return False
+    elif kind == 'date':
+        try:
+            datetime.strptime(text, date_format)
+        except ValueError:
+            return False
+    return True
+
+
+def validate_matt_sample(
+    source, max_age_days: int | None = MATT_MAX_AGE_DAYS, sample_rows: int = 100,
+    sample_bytes: int = 1024 * 1024, today: pd.Timestamp | None = None
+) -> MattValidation:
+    """
+    Checks a MATT export from its header and first sample_rows rows only:
+    encoding, required columns, the types of used columns and the AS OF
+    stamp. A seekable source is rewound; a non-seekable one (such as a
+    decompressing stream) is consumed by the sample, so ingest from a fresh
+    one. Files that would fail to parse get errors; values processing would
+    blank out, and exports older than max_age_days, get warnings.
+    """
+    sample = _read_sample(source, sample_bytes)
+    has_bom = sample.startswith(UTF8_BOM)
+    if sample.startswith(UTF16_BOMS):
+        return MattValidation([], False, None, ["The file is UTF-16 encoded. Export the MATT Report as a UTF-8 CSV."], [])
+    try:
+        header, rows = _sample_rows(sample, sample_rows)
+    except (UnicodeDecodeError, csv.Error) as e:
+        return MattValidation([], has_bom, None, [f"The file is not a UTF-8 CSV ({e})."], [])
+
+    errors, warnings = [], []
+    missing_cols = missing_required_columns(header)
+    if missing_cols:
+        errors.append("The file does not appear to be a valid MATT Report. Missing columns: " + ", ".join(sorted(missing_cols)))
+    if not rows:
+        errors.append("The file has no complete data rows.")
+    if errors:
+        return MattValidation(header, has_bom, None, errors, warnings)
+
+    for position, col in enumerate(header):
+        if col not in USED_COLUMNS or col not in MATT_KINDS:
+            continue
+        kind, date_format = MATT_KINDS[col], DATE_FORMATS.get(col)
+        texts = [row[position].strip() for row in rows if position < len(row)]
+        readable = {text: _readable(text, kind, date_format) for text in set(texts) if text}
+        unreadable = sum(1 for text in texts if text and not readable[text])
+        if unreadable and kind in ('int', 'float'):
+            errors.append(f"{col} should be numeric but has {unreadable} unreadable value(s) in the first {len(rows)} rows.")
+        elif unreadable:
+            warnings.append(f"{col} has {unreadable} unreadable value(s) in the first {len(rows)} rows; they will be left blank.")
+
+    stamp = dict(zip(header, rows[0])).get(AS_OF_COLUMN)
+    as_of = _parse_as_of_stamp(stamp) if stamp else None
+    today = (today or pd.Timestamp.today()).normalize()
+    if as_of is None:
+        warnings.append(f"No \"AS OF\" stamp in {AS_OF_COLUMN}; the export will not be kept in the MATT history.")
+    elif as_of > today:
+        errors.append(f"The AS OF date {as_of:%m/%d/%Y} is in the future.")
+    elif max_age_days is not None and (today - as_of).days > max_age_days:
+        warnings.append(
+            f"The MATT is as of {as_of:%m/%d/%Y}, {(today - as_of).days} days ago "
+            f"(more than {max_age_days} days). Check that this is the export you meant to upload."
+        )
+    return MattValidation(header, has_bom, as_of, errors, warnings)
+
+
+# Arrow column types per schema kind (text kinds are parsed during processing)
+ARROW_KIND_TYPES = {
+    'float': 'float64',
+    'int': 'int64'
+}
+
+
+def _read_matt_csv_arrow(source, all_columns: bool) -> pd.DataFrame:
+    header = read_matt_header(source)
+    include = [col for col in header if all_columns or col.strip() in USED_COLUMNS]
+    column_types = {
+        col: pa.type_for_alias(ARROW_KIND_TYPES.get(MATT_KINDS.get(col.strip(), 'str'), 'string'))
+        for col in include
+    }
+
+    table = pa_csv.read_csv(
+        source,
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=include,
+            column_types=column_types,
+            strings_can_be_null=True
+        )
+    )
+    df = table.to_pandas(types_mapper={
+        pa.string(): pd.StringDtype("pyarrow"),
+        pa.int64(): pd.Int64Dtype()
+    }.get)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+# --- Exports ---
+__all__ = [
+    "MattColumn",
+    "MATT_SCHEMA",
+    "REQUIRED_COLUMNS",
+    "USED_COLUMNS",
+    "MATT_DTYPES",
+    "MATT_KINDS",
+    "DATE_FORMATS",
+    "DATE_FORMAT",
+    "AS_OF_COLUMN",
+    "HOMESITE_KEY",
+    "parse_as_of_date",
+    "missing_required_columns",
+    "read_matt_csv",
+    "iter_matt_csv",
+    "read_matt_header",
+    "read_matt_as_of",
+    "MattValidation",
+    "validate_matt_sample"
+]
@@ -1,9 +1,46 @@
 import pandas as pd
 import numpy as np
-import os
 import datetime
+from typing import Callable
 import streamlit as st
 
+from scripts.matt_schema import MATT_KINDS, DATE_FORMATS
+from scripts.dimensions import (
+    HUB_PATH, PLAN_PATH, load_community_dim, load_plan_dim, dimension_attribute,
+    load_investor_names, normalize_nhc_names
+)
+
+# Bump whenever process_matt_data changes its output so cached results are invalidated
+PROCESSING_VERSION = "10"
+
+# --- Homesite Status Labels ---
+STATUS_LABELS = {
+    'B': 'Backlog',
+    'S': 'Unsold',
+    'Z': 'Closed',
+    'M': 'Model'
+}
+
+# --- Fixed Category Orders for Dimension Columns ---
+# Label sets are kept alphabetical so group-by output keeps its sorted order
+DOW_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+CATEGORY_ORDERS = {
+    'DOW_Sale': DOW_ORDER,
+    'Weekday_Group': ['M-F', 'Sat-Sun'],
+    'Investor Sale': ['Investor', 'Retail'],
+    'Realtor/Direct': ['Direct', 'Realtor'],
+    'HS_TYPE_LABEL': sorted(STATUS_LABELS.values())
+}
+
+# Low-cardinality text columns stored as categoricals (alphabetical unless listed above)
+CATEGORICAL_COLUMNS = [
+    'DIV_CODE_DESC', 'HS_TYPE_LABEL', 'Weekday_Group', 'DOW_Sale'
+]
+
+# Dimension attributes carried on the fact table (others are joined on demand via scripts.dimensions)
+COMMUNITY_ATTRIBUTES = ['Community Name', 'Hub']
+PLAN_ATTRIBUTES = ['Plan Name', 'Collection']
+
 # --- Color Map for Homesite Status ---
 color_map = {
     'Model': '#ffb6c1',       # Light Pink
@@ -14,15 +51,25 @@ color_map = {
 }
 
 # --- Main Data Processing Function ---
-def process_matt_data(matt_df: pd.DataFrame) -> pd.DataFrame:
-    # Set up paths to Hub and Plan files
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    hub_path = os.path.join(base_dir, 'data', 'Hub.csv')
-    plan_path = os.path.join(base_dir, 'data', 'Plan.csv')
+# Steps reported to process_matt_data's progress callback, in order
+PROCESSING_STEPS = ['Parsing prices', 'Merging Hub and Plan', 'Parsing dates', 'Labeling sales', 'Encoding categories']
 
-    # Load Hub and Plan data
-    hub_df = pd.read_csv(hub_path)
-    plan_df = pd.read_csv(plan_path)
+
+def process_matt_data(matt_df: pd.DataFrame, progress: Callable[[str, float], None] | None = None) -> pd.DataFrame:
+    # progress(step, fraction) is called as each of PROCESSING_STEPS starts
+    progress = progress or (lambda step, fraction: None)
+
+    # Load Hub and Plan dimensions (unique keys)
+    community_dim = load_community_dim()
+    plan_dim = load_plan_dim()
+
+    progress('Parsing prices', 0 / len(PROCESSING_STEPS))
+    # Parse accounting-format money and percent columns once
+    matt_df = matt_df.copy()
+    for col in matt_df.columns:
+        kind = MATT_KINDS.get(col)
+        if kind in ('money', 'percent'):
+            matt_df[col] = parse_accounting_numbers(matt_df[col], percent=(kind == 'percent'))
 
     # Rename columns
     matt_df = matt_df.rename(columns={
@@ -30,65 +77,123 @@ def process_matt_data(matt_df: pd.DataFrame) -> pd.DataFrame:
         'Textbox22': 'Net_Sales_Price'
     })
 
+    progress('Merging Hub and Plan', 1 / len(PROCESSING_STEPS))
     # Extract community number and normalize plan codes
     matt_df['Comm_#'] = matt_df['COMMUNITY'].astype(str).str[:5].astype(int)
     matt_df['PLAN_CODE'] = matt_df['PLAN_CODE'].astype(str).str.strip().str.replace('.0', '', regex=False)
-    plan_df['Plan Code'] = plan_df['Plan Code'].astype(str).str.strip()
 
-    # Merge Hub and Plan details
-    merged_df = pd.merge(matt_df, hub_df, how='left', left_on='Comm_#', right_on='Community Number')
-    merged_df = pd.merge(merged_df, plan_df, how='left', left_on='PLAN_CODE', right_on='Plan Code')
+    # Map Hub and Plan attributes through integer keys (a key lookup can never multiply rows)
+    comm_pos = community_dim.index.get_indexer(matt_df['Comm_#'])
+    matt_df['Plan_Key'] = plan_dim.index.get_indexer(matt_df['PLAN_CODE']).astype('int32')
+    for col in COMMUNITY_ATTRIBUTES:
+        matt_df[col] = dimension_attribute(community_dim[col], comm_pos)
+    for col in PLAN_ATTRIBUTES:
+        matt_df[col] = dimension_attribute(plan_dim[col], matt_df['Plan_Key'].to_numpy())
 
-    merged_df['Hub'] = merged_df['Hub'].astype(str).str.strip()
-    merged_df['Community Name'] = merged_df['Community Name'].astype(str).str.strip()
-    merged_df['Plan Name'] = merged_df['Plan Name'].astype(str).str.strip()
-
-    # Parse date columns
-    merged_df['SALE_DATE'] = pd.to_datetime(merged_df['SALE_DATE'], errors='coerce')
-    merged_df['EST_COE_DATE'] = pd.to_datetime(merged_df['EST_COE_DATE'], errors='coerce')
+    progress('Parsing dates', 2 / len(PROCESSING_STEPS))
+    # Parse every MATT date column (failures per column are kept in attrs)
+    matt_df.attrs['date_parse_failures'] = parse_matt_dates(matt_df)
 
+    progress('Labeling sales', 3 / len(PROCESSING_STEPS))
     # Add DOW and weekday group
-    merged_df['DOW_Sale'] = merged_df['SALE_DATE'].dt.day_name()
-    merged_df['Weekday_Group'] = np.where(
-        merged_df['DOW_Sale'].isin(['Saturday', 'Sunday']), 'Sat-Sun', 'M-F'
+    matt_df['DOW_Sale'] = matt_df['SALE_DATE'].dt.day_name()
+    matt_df['Weekday_Group'] = np.where(
+        matt_df['DOW_Sale'].isin(['Saturday', 'Sunday']), 'Sat-Sun', 'M-F'
     )
 
-    # Label investor sales based on known NHC names (normalized for casing and spacing)
-    investor_names = {
-        "Chanin, Kristian                   (DFW)",
-        "PEREZ, LARRY",
-        "LAWRENCE PETER                          ",
-        "Perez, Larry                       (DFW)",
-        "Stierwalt, Tanner                  (DFW)",
-        "Krueger, Cole                      (HOU)",
-        "Shackelford, Leah                  (HOU)",
-        "Batchelor, Christina               (HOU)"
-    }
-    investor_names_normalized = {name.strip().upper() for name in investor_names}
-    merged_df['NHC_NAME_CLEAN'] = merged_df['NHC_NAME'].astype(str).str.strip().str.upper()
-    merged_df['Investor Sale'] = merged_df['NHC_NAME_CLEAN'].apply(
-        lambda x: "Investor" if x in investor_names_normalized else "Retail"
-    )
-
-    # Parse and clean sales cancellation dates
-    merged_df['SALES_CANCELLATION_DATE'] = merged_df['SALES_CANCELLATION_DATE'].astype(str).str.strip()
-    merged_df['SALES_CANCELLATION_DATE_PARSED'] = pd.to_datetime(
-        merged_df['SALES_CANCELLATION_DATE'], errors='coerce'
-    )
-
-    # Create Realtor/Direct flag (with stripped whitespace)
-    merged_df['Realtor/Direct'] = merged_df['COBROKE_Y_N'].fillna('').str.strip().apply(map_realtor_direct)
+    # Label investor and realtor sales
+    matt_df = label_sales_channels(matt_df)
 
     # Label homesite type (Backlog, Unsold, etc.)
-    status_map = {
-        'B': 'Backlog',
-        'S': 'Unsold',
-        'Z': 'Closed',
-        'M': 'Model'
-    }
-    merged_df['HS_TYPE_LABEL'] = merged_df['HS_TYPE'].map(status_map).fillna(merged_df['HS_TYPE'])
-
-    return merged_df
+    matt_df['HS_TYPE_LABEL'] = matt_df['HS_TYPE'].map(STATUS_LABELS).fillna(matt_df['HS_TYPE'])
+
+    progress('Encoding categories', 4 / len(PROCESSING_STEPS))
+    # Dictionary-encode low-cardinality dimensions
+    for col in CATEGORICAL_COLUMNS:
+        matt_df[col] = to_ordered_category(matt_df[col], CATEGORY_ORDERS.get(col))
+
+    return matt_df
+
+# --- Date Parsing ---
+def parse_matt_dates(matt_df: pd.DataFrame) -> dict[str, int]:
+    """
+    Parses every schema date column in place with its fixed format. Each distinct
+    string is parsed once and broadcast back to the rows. Returns the number of
+    non-blank values per column that failed to parse.
+    """
+    failures = {}
+    for col, date_format in DATE_FORMATS.items():
+        if col not in matt_df.columns:
+            continue
+        codes, uniques = pd.factorize(matt_df[col])
+        text = pd.Series(uniques, dtype=str).str.strip()
+        parsed = pd.to_datetime(text, format=date_format, errors='coerce')
+        failures[col] = int(((text != '') & parsed.isna()).to_numpy()[codes[codes >= 0]].sum())
+
+        dates = parsed.to_numpy(dtype='datetime64[ns]')
+        values = np.full(len(codes), np.datetime64('NaT'), dtype='datetime64[ns]')
+        values[codes >= 0] = dates[codes[codes >= 0]]
+        matt_df[col] = values
+    return failures
+
+# --- Investor and Realtor/Direct Labeling ---
+def label_sales_channels(matt_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds the 'Investor Sale' and 'Realtor/Direct' categoricals. Each distinct
+    NHC name / cobroke flag is classified once, then broadcast by its code.
+    """
+    # Investor: NHC name (normalized for casing and spacing) is on the investor list
+    nhc_codes, nhc_names = pd.factorize(matt_df['NHC_NAME'])
+    is_investor = normalize_nhc_names(pd.Series(nhc_names, dtype=str)).isin(load_investor_names()).to_numpy()
+    investor_flags = np.append(is_investor, False)[nhc_codes]  # code -1 (missing) takes the last slot
+    matt_df['Investor Sale'] = flags_to_category(investor_flags, 'Investor', 'Retail', 'Investor Sale')
+
+    # Realtor/Direct: only an explicit 'Y' cobroke flag counts as a realtor sale
+    cobroke_codes, cobroke_values = pd.factorize(matt_df['COBROKE_Y_N'])
+    is_realtor = (pd.Series(cobroke_values, dtype=str).str.strip() == 'Y').to_numpy()
+    realtor_flags = np.append(is_realtor, False)[cobroke_codes]
+    matt_df['Realtor/Direct'] = flags_to_category(realtor_flags, 'Realtor', 'Direct', 'Realtor/Direct')
+    return matt_df
+
+
+def flags_to_category(flags: np.ndarray, true_label: str, false_label: str, column: str) -> pd.Categorical:
+    categories = CATEGORY_ORDERS[column]
+    codes = np.where(flags, categories.index(true_label), categories.index(false_label))
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+# --- Categorical Encoding ---
+def to_ordered_category(values: pd.Series, order: list[str] | None = None) -> pd.Series:
+    """
+    Converts a text column to a categorical with a stable category order:
+    the given order first, then any other values alphabetically.
+    """
+    observed = values.dropna().unique()
+    order = order or []
+    extras = sorted(str(v) for v in observed if v not in set(order))
+    return pd.Categorical(values.astype(object).where(values.notna(), None), categories=order + extras)
+
+# --- Accounting Number Parser ---
+def parse_accounting_numbers(values: pd.Series, percent: bool = False) -> pd.Series:
+    """
+    Converts accounting-format text such as "323,698", "$(5,749)" or "35.08%" to floats.
+    Parentheses mean negative and percents become fractions (35.08% -> 0.3508).
+    Each distinct string is parsed once and broadcast back to the rows.
+    """
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=str).str.replace('$', '', regex=False).str.strip()
+    negative = text.str.startswith('(') & text.str.endswith(')')
+    for token in (',', '(', ')', '%'):
+        text = text.str.replace(token, '', regex=False)
+
+    parsed = pd.to_numeric(text.str.strip(), errors='coerce').to_numpy(dtype='float64', na_value=np.nan, copy=True)
+    parsed[negative.to_numpy(dtype=bool)] *= -1
+    if percent:
+        parsed /= 100
+
+    result = np.full(len(codes), np.nan)
+    found = codes >= 0
+    result[found] = parsed[codes[found]]
+    return pd.Series(result, index=values.index, name=values.name)
 
 # --- Realtor/Direct Mapper ---
 def map_realtor_direct(cobroke_value):
@@ -101,52 +206,6 @@ def get_fred_data_filtered(start_date: pd.Timestamp, end_date: pd.Timestamp) ->
     df = fetch_fred_30yr_mortgage_rate()
     return df[(df['date'] >= start_date) & (df['date'] <= end_date)].copy()
 
-# --- Plan-Level Pricing Aggregation for Sold Homes ---
-from typing import Union
-
-def compute_plan_pricing(df: pd.DataFrame, start_date: pd.Timestamp, end_date: pd.Timestamp, group_col: Union[str, list[str]] = "Plan Name") -> pd.DataFrame:
-    df = df.copy()
-    df['SALE_DATE'] = pd.to_datetime(df['SALE_DATE'], errors='coerce')
-    df = df[(df['SALE_DATE'] >= start_date) & (df['SALE_DATE'] <= end_date)]
-
-    # Clean pricing columns
-    cols_to_clean = ['BASE_PRICE', 'HOMESITE_PREMIUM', 'PRICE_REDUCTION_INCENTIVES', 'OPTION_REVENUE', 'Net_Sales_Price']
-    for col in cols_to_clean:
-        df[col] = pd.to_numeric(
-            df[col].astype(str)
-                  .str.replace(r'[$,]', '', regex=True)
-                  .str.replace(r'^\((.*)\)$', r'-\1', regex=True),
-            errors='coerce'
-        )
-
-    # Calculate list price
-    df['List Price'] = (
-        df['BASE_PRICE'].fillna(0) +
-        df['HOMESITE_PREMIUM'].fillna(0) +
-        df['PRICE_REDUCTION_INCENTIVES'].fillna(0) +
-        df['OPTION_REVENUE'].fillna(0)
-    )
-
-    # Group and aggregate
-    group_keys = group_col if isinstance(group_col, list) else [group_col]
-    summary = df.groupby(group_keys, as_index=False).agg({
-        'BASE_PRICE': 'mean',
-        'List Price': 'mean',
-        'Net_Sales_Price': 'mean',
-        'TOTAL_SQFT': 'mean'
-    })
-
-    # Rename for display
-    summary.rename(columns={
-        'BASE_PRICE': 'Avg Base Price',
-        'List Price': 'Avg List Price',
-        'Net_Sales_Price': 'Avg Net Revenue',
-        'TOTAL_SQFT': 'Avg SqFt'
-    }, inplace=True)
-
-    summary.sort_values(by='Avg SqFt', inplace=True)
-    return summary
-
 # --- Snapshot Unsold Inventory Calculator ---
 def compute_snapshot_unsold_inventory(df, group_col, snapshot_date, coe_start, coe_end, label):
     snapshot_date = pd.to_datetime(snapshot_date)
@@ -162,39 +221,111 @@ def compute_snapshot_unsold_inventory(df, group_col, snapshot_date, coe_start, c
 
     # Calculate age and aggregate
     snapshot_df['Age'] = (snapshot_df['EST_COE_DATE'] - snapshot_date).dt.days
-    result = snapshot_df.groupby(group_col).agg(
+    result = snapshot_df.groupby(group_col, observed=True).agg(
         Unsold=('EST_COE_DATE', 'count'),
         Avg_Age=('Age', 'mean')
     ).reset_index()
     result['Week'] = label
     return result
 
+# --- Multi-Snapshot Unsold Inventory Engine ---
+def compute_unsold_inventory_snapshots(df: pd.DataFrame, group_col: str, snapshot_dates: list, coe_start, coe_end, timeline=None) -> pd.DataFrame:
+    """
+    Homes not under contract and their average age (days to EST_COE_DATE) per
+    group at every snapshot date, for homes with COE in [coe_start, coe_end].
+    Contract starts and ends come from the homesite status timeline (so
+    cancelled contracts count as sold until cancelled), bucketed by the first
+    snapshot on or after them and cumulated in one sorted pass. Pass the
+    dataset's timeline (matching df's rows) to skip rebuilding it. Returns one
+    row per group and snapshot (Avg_Age is NaN where nothing is unsold).
+    """
+    from scripts.status_timeline import CONTRACT_STATUSES, build_status_timeline, contract_changes
+
+    if timeline is None:
+        timeline = build_status_timeline(df)
+    snapshots = pd.to_datetime(pd.Series(snapshot_dates)).to_numpy(dtype='datetime64[ns]')
+    coe = df['EST_COE_DATE'].to_numpy(dtype='datetime64[ns]')
+    in_window = (coe >= np.datetime64(pd.Timestamp(coe_start), 'ns')) & (coe <= np.datetime64(pd.Timestamp(coe_end), 'ns'))
+    group_codes, groups = pd.factorize(df[group_col])
+    included = in_window & (group_codes >= 0)
+    coe_days = coe.astype('datetime64[D]').astype(np.int64)
+
+    # Each contract change applies from the first snapshot on or after its date
+    order = np.argsort(snapshots, kind='stable')
+    snapshot_days = snapshots[order].astype('datetime64[D]').astype(np.int64)
+    rows, days, deltas = contract_changes(timeline)
+    keep = included[rows]
+    rows, days, deltas = rows[keep], days[keep], deltas[keep]
+    bucket = np.searchsorted(snapshot_days, days, side='left')
+
+    shape = (len(groups), len(snapshot_days) + 1)
+    contract_counts = np.zeros(shape, dtype=np.int64)
+    contract_coe_days = np.zeros(shape, dtype=np.int64)
+    np.add.at(contract_counts, (group_codes[rows], bucket), deltas)
+    np.add.at(contract_coe_days, (group_codes[rows], bucket), deltas * coe_days[rows])
+
+    # Homes already under contract before any event (earlier, later-cancelled contracts)
+    initial = included & np.isin(timeline.initial_status, CONTRACT_STATUSES)
+    contract_counts[:, 0] += np.bincount(group_codes[initial], minlength=len(groups))
+    contract_coe_days[:, 0] += np.bincount(group_codes[initial], weights=coe_days[initial], minlength=len(groups)).astype(np.int64)
+    contract_counts = np.cumsum(contract_counts, axis=1)[:, :-1]
+    contract_coe_days = np.cumsum(contract_coe_days, axis=1)[:, :-1]
+
+    total_counts = np.bincount(group_codes[included], minlength=len(groups))[:, None]
+    total_coe_days = np.bincount(group_codes[included], weights=coe_days[included], minlength=len(groups))[:, None]
+    unsold = total_counts - contract_counts
+    age_days = (total_coe_days - contract_coe_days) - unsold * snapshot_days[None, :]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_age = np.where(unsold > 0, age_days / unsold, np.nan)
+
+    # Back to the caller's snapshot order, one row per group and snapshot
+    restore = np.argsort(order, kind='stable')
+    return pd.DataFrame({
+        group_col: np.repeat(groups, len(snapshots)),
+        'Snapshot_Date': np.tile(snapshots, len(groups)),
+        'Unsold': unsold[:, restore].ravel(),
+        'Avg_Age': avg_age[:, restore].ravel()
+    })
+
 # --- Pace vs. Margin Calculator ---
-def compute_pace_vs_margin(df: pd.DataFrame, target_date: datetime.date, coe_start: datetime.date, coe_end: datetime.date) -> tuple[pd.DataFrame, float]:
+def compute_pace_vs_margin(df: pd.DataFrame, target_date: datetime.date, coe_start: datetime.date, coe_end: datetime.date, timeline=None) -> tuple[pd.DataFrame, float]:
+    """
+    Unsold homes with COE in [coe_start, coe_end] and the 3-week gross sales
+    pace per community, both read from the homesite status timeline (as the
+    unsold inventory snapshots are). Pass the dataset's timeline (matching
+    df's rows) to skip rebuilding it.
+    """
+    from scripts.status_timeline import BACKLOG, NOT_RELEASED, UNSOLD, build_status_timeline, status_as_of, status_entries
+
     today = datetime.date.today()
+    if timeline is None:
+        timeline = build_status_timeline(df)
 
     # Ensure date parsing
     df['EST_COE_DATE'] = pd.to_datetime(df['EST_COE_DATE'], errors='coerce')
-    df['SALE_DATE'] = pd.to_datetime(df['SALE_DATE'], errors='coerce')
 
-    # Filter unsold homes in COE window
-    unsold_df = df[
-        (df['HS_TYPE'] == 'S') &
+    # Filter homes not under contract today in COE window
+    in_window = (
         (df['EST_COE_DATE'] >= pd.Timestamp(coe_start)) &
         (df['EST_COE_DATE'] <= pd.Timestamp(coe_end))
-    ]
+    ).to_numpy()
+    unsold_df = df[in_window & np.isin(status_as_of(timeline, today), (NOT_RELEASED, UNSOLD))]
 
-    # Compute 3-week pace for backlog + closed
-    three_weeks_ago = pd.Timestamp(today - datetime.timedelta(days=21))
-    sold_df = df[(df['HS_TYPE'].isin(['B', 'Z'])) & (df['SALE_DATE'] >= three_weeks_ago)]
-    pace = sold_df.groupby('Community Name').size() / 3
+    # Compute 3-week pace from homes put under contract in the last three weeks
+    three_weeks_ago = np.datetime64(today - datetime.timedelta(days=21), 'D').astype(np.int64)
+    sale_rows, sale_days = status_entries(timeline, BACKLOG)
+    recent = (sale_days >= three_weeks_ago) & (sale_days <= np.datetime64(today, 'D').astype(np.int64))
+    sold_df = df.iloc[np.unique(sale_rows[recent])]
+    pace = sold_df.groupby('Community Name', observed=True).size() / 3
 
     # Compute slope (homes per week needed)
     weeks_left = (target_date - today).days / 7
     slope = 1 / weeks_left if weeks_left > 0 else 0
 
-    # Combine unsold and pace
-    unsold_counts = unsold_df.groupby('Community Name').size()
+    # Combine unsold and pace (on plain labels; an empty categorical group-by has a narrower code dtype)
+    unsold_counts = unsold_df.groupby('Community Name', observed=True).size()
+    unsold_counts.index = unsold_counts.index.astype(str)
+    pace.index = pace.index.astype(str)
     summary = pd.DataFrame({
         'Unsold': unsold_counts,
         '3Wk Avg Sales Pace': pace
@@ -220,13 +351,21 @@ def compute_pace_vs_margin(df: pd.DataFrame, target_date: datetime.date, coe_sta
 
 # --- Exports ---
 __all__ = [
+    "PROCESSING_STEPS",
     "compute_snapshot_unsold_inventory",
     "compute_pace_vs_margin",
     "process_matt_data",
     "map_realtor_direct",
-    "compute_plan_pricing",
+    "parse_accounting_numbers",
+    "parse_matt_dates",
+    "to_ordered_category",
     "get_fred_data_filtered",
-    "color_map"
+    "color_map",
+    "DOW_ORDER",
+    "STATUS_LABELS",
+    "PROCESSING_VERSION",
+    "HUB_PATH",
+    "PLAN_PATH"
 ]
 
 
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+from scripts.dataset_registry import get_dataset_index, get_session_index
+
+# Cube grain: one cell per sale day and combination of these dimensions
+CUBE_DIMENSIONS = (
+    'DIV_CODE_DESC', 'Hub', 'Community Name', 'Collection', 'Plan Name',
+    'Investor Sale', 'Realtor/Direct', 'HS_TYPE'
+)
+# Day-of-week labels depend only on the sale day, so they add no cells
+CUBE_DAY_ATTRIBUTES = ('DOW_Sale', 'Weekday_Group')
+# Price columns summed per cell (with non-missing counts, so means can be rolled up)
+CUBE_MEASURES = (
+    'BASE_PRICE', 'HOMESITE_PREMIUM', 'PRICE_REDUCTION_INCENTIVES',
+    'OPTION_REVENUE', 'Net_Sales_Price', 'TOTAL_SQFT'
+)
+# Measures summed into a list price (missing components count as 0)
+LIST_PRICE_COMPONENTS = ('BASE_PRICE', 'HOMESITE_PREMIUM', 'PRICE_REDUCTION_INCENTIVES', 'OPTION_REVENUE')
+SALES_CUBE_INDEX_NAME = "sales_cube"
+
+
+# --- Cube Build ---
+def build_sales_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pre-aggregates sold homesites (rows with a SALE_DATE) to day x dimension
+    cells holding the sale count and the sum / non-missing count of each price
+    measure. Cells are sorted by SALE_DATE.
+    """
+    sold = df[df['SALE_DATE'].notna()]
+    keys = ['SALE_DATE', *CUBE_DIMENSIONS, *CUBE_DAY_ATTRIBUTES]
+    grouped = sold.groupby(keys, observed=True, dropna=False, sort=False)
+
+    aggregations = {'Sales': ('SALE_DATE', 'size')}
+    for measure in CUBE_MEASURES:
+        aggregations[f'{measure}_sum'] = (measure, 'sum')
+        aggregations[f'{measure}_count'] = (measure, 'count')
+    cube = grouped.agg(**aggregations).reset_index()
+    return cube.sort_values('SALE_DATE', kind='stable', ignore_index=True)
+
+
+# --- Slice and Roll Up ---
+def query_sales_cube(cube: pd.DataFrame, by: list, filters: dict | None = None,
+                     start=None, end=None) -> pd.DataFrame:
+    """
+    Slices the cube to the sale date range [start, end] and {dimension: values}
+    filters, then rolls it up to the `by` columns: any cube dimension, day
+    attribute, 'SALE_DATE' or 'Sales_Month'. Returns Sales plus the measure
+    sums and counts, indexed by `by`.
+    """
+    dates = cube['SALE_DATE'].to_numpy()
+    lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+    hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right')
+    cells = cube.iloc[lo:max(lo, hi)]
+
+    if filters:
+        mask = np.ones(len(cells), dtype=bool)
+        for column, values in filters.items():
+            mask &= cells[column].isin(values).to_numpy()
+        cells = cells[mask]
+
+    if 'Sales_Month' in by:
+        cells = cells.assign(Sales_Month=cells['SALE_DATE'].dt.to_period('M'))
+
+    value_columns = [col for col in cube.columns if col == 'Sales' or col.endswith(('_sum', '_count'))]
+    return cells.groupby(by, observed=True)[value_columns].sum()
+
+
+def cube_mean(rollup: pd.DataFrame, measure: str) -> pd.Series:
+    """
+    Mean of a measure over the homesites behind each rolled-up cell (missing values skipped).
+    """
+    return rollup[f'{measure}_sum'] / rollup[f'{measure}_count']
+
+
+def cube_plan_pricing(rollup: pd.DataFrame) -> pd.DataFrame:
+    """
+    Average base price, list price, net revenue and square footage per rolled-up
+    group. The list price is the sum of LIST_PRICE_COMPONENTS, with missing
+    components counted as 0.
+    """
+    list_price_sum = sum(rollup[f'{measure}_sum'] for measure in LIST_PRICE_COMPONENTS)
+    summary = pd.DataFrame({
+        'Avg Base Price': cube_mean(rollup, 'BASE_PRICE'),
+        'Avg List Price': list_price_sum / rollup['Sales'],
+        'Avg Net Revenue': cube_mean(rollup, 'Net_Sales_Price'),
+        'Avg SqFt': cube_mean(rollup, 'TOTAL_SQFT')
+    }).reset_index()
+    return summary.sort_values(by='Avg SqFt')
+
+
+# --- Session Dataset Cube ---
+def build_dataset_sales_cube(dataset_id: str) -> None:
+    """
+    Builds the sales cube of a dataset at ingest.
+    """
+    get_dataset_index(dataset_id, SALES_CUBE_INDEX_NAME, build_sales_cube)
+
+
+def get_session_sales_cube() -> pd.DataFrame | None:
+    """
+    Sales cube of this session's dataset, shared by every page and session.
+    """
+    return get_session_index(SALES_CUBE_INDEX_NAME, build_sales_cube)
+
+
+# --- Exports ---
+__all__ = [
+    "CUBE_DIMENSIONS",
+    "CUBE_MEASURES",
+    "build_sales_cube",
+    "query_sales_cube",
+    "cube_mean",
+    "cube_plan_pricing",
+    "build_dataset_sales_cube",
+    "get_session_sales_cube"
+]
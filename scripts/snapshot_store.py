@@ -0,0 +1,172 @@
+import os
+import shutil
+import pandas as pd
+
+from config import ENABLE_SNAPSHOT_STORE, SNAPSHOT_STORE_DIR, SNAPSHOT_STORE_MAX_EXPORTS
+from scripts.dimensions import BASE_DIR
+from scripts.matt_schema import HOMESITE_KEY, parse_as_of_date
+from scripts.dataset_registry import get_dataset, publish_dataset
+from scripts.process_matt import PROCESSING_VERSION
+
+# --- Store Location ---
+# One partition directory per export date: data/history/as_of=2025-07-25/<dataset_id>.v<PROCESSING_VERSION>.parquet
+STORE_PATH = os.path.join(BASE_DIR, SNAPSHOT_STORE_DIR)
+PARTITION_PREFIX = "as_of="
+# Partitions written by another processing version may hold other columns or
+# dtypes; they are skipped (and left on disk, since the raw export is not kept)
+SNAPSHOT_SUFFIX = f".v{PROCESSING_VERSION}.parquet"
+
+
+def _partition_dir(as_of: pd.Timestamp) -> str:
+    return os.path.join(STORE_PATH, f"{PARTITION_PREFIX}{as_of:%Y-%m-%d}")
+
+
+def _partition_file(partition_dir: str) -> str | None:
+    # The partition's export as written by the current processing version
+    names = sorted(name for name in os.listdir(partition_dir) if name.endswith(SNAPSHOT_SUFFIX))
+    return os.path.join(partition_dir, names[-1]) if names else None
+
+
+def _snapshot_dataset_id(path: str) -> str:
+    return os.path.basename(path)[:-len(SNAPSHOT_SUFFIX)]
+
+
+# --- Retention ---
+def is_retained(as_of) -> bool:
+    """
+    Whether an export with this AS OF date stays in the store: it is stored
+    already, or fewer than SNAPSHOT_STORE_MAX_EXPORTS stored exports are newer.
+    """
+    if SNAPSHOT_STORE_MAX_EXPORTS is None:
+        return True
+    as_of = pd.Timestamp(as_of)
+    stored_dates = list_snapshot_dates()
+    return as_of in stored_dates or sum(date > as_of for date in stored_dates) < SNAPSHOT_STORE_MAX_EXPORTS
+
+
+def prune_snapshot_store() -> list[pd.Timestamp]:
+    """
+    Deletes the partitions of all but the newest SNAPSHOT_STORE_MAX_EXPORTS
+    exports and returns their AS OF dates.
+    """
+    if SNAPSHOT_STORE_MAX_EXPORTS is None:
+        return []
+    stored_dates = list_snapshot_dates()
+    pruned = stored_dates[:max(len(stored_dates) - SNAPSHOT_STORE_MAX_EXPORTS, 0)]
+    for as_of in pruned:
+        shutil.rmtree(_partition_dir(as_of), ignore_errors=True)
+    return pruned
+
+
+# --- Write ---
+def store_matt_snapshot(dataset_id: str, df: pd.DataFrame) -> pd.Timestamp | None:
+    """
+    Keeps a processed MATT export in the history store under its AS OF date,
+    with one row per homesite (the last row wins if a key repeats). A later
+    export with the same AS OF date replaces the partition, and exports past
+    SNAPSHOT_STORE_MAX_EXPORTS are pruned. Returns the AS OF date, or None if
+    the store is off, the stamp is unreadable, the export is older than every
+    retained one or the frame cannot be written.
+    """
+    as_of = parse_as_of_date(df)
+    if not ENABLE_SNAPSHOT_STORE or as_of is None or not is_retained(as_of):
+        return None
+
+    partition_dir = _partition_dir(as_of)
+    path = os.path.join(partition_dir, f"{dataset_id}{SNAPSHOT_SUFFIX}")
+    if os.path.exists(path):
+        return as_of
+
+    snapshot = df.drop_duplicates(subset=HOMESITE_KEY, keep='last')
+    os.makedirs(STORE_PATH, exist_ok=True)
+    tmp_dir = f"{partition_dir}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(tmp_dir, exist_ok=True)
+        snapshot.to_parquet(os.path.join(tmp_dir, f"{dataset_id}{SNAPSHOT_SUFFIX}"), index=False, compression='zstd')
+        if os.path.isdir(partition_dir):
+            shutil.rmtree(partition_dir)
+        os.replace(tmp_dir, partition_dir)
+    except (ImportError, ValueError, TypeError, OSError):
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return None
+    prune_snapshot_store()
+    return as_of
+
+
+# --- Time-Travel Reads ---
+def list_snapshot_dates() -> list[pd.Timestamp]:
+    """
+    AS OF dates of every export in the store written by the current
+    processing version, oldest first.
+    """
+    if not os.path.isdir(STORE_PATH):
+        return []
+
+    dates = []
+    for name in os.listdir(STORE_PATH):
+        if not name.startswith(PARTITION_PREFIX) or name.endswith(".tmp"):
+            continue
+        as_of = pd.to_datetime(name[len(PARTITION_PREFIX):], format="%Y-%m-%d", errors='coerce')
+        if not pd.isna(as_of) and _partition_file(os.path.join(STORE_PATH, name)):
+            dates.append(as_of)
+    return sorted(dates)
+
+
+def resolve_snapshot_date(as_of) -> pd.Timestamp | None:
+    """
+    The latest stored export on or before as_of, or None if there is none.
+    """
+    candidates = [date for date in list_snapshot_dates() if date <= pd.Timestamp(as_of)]
+    return candidates[-1] if candidates else None
+
+
+def load_matt_snapshot(as_of) -> tuple[str, pd.DataFrame] | None:
+    """
+    The dataset ID and processed frame of the export in effect on as_of (the
+    latest one on or before it), read straight from the store.
+    """
+    stored_date = resolve_snapshot_date(as_of)
+    if stored_date is None:
+        return None
+
+    path = _partition_file(_partition_dir(stored_date))
+    if path is None:
+        return None
+    try:
+        df = pd.read_parquet(path)
+    except (ImportError, ValueError, OSError):
+        return None
+    return _snapshot_dataset_id(path), df
+
+
+def open_matt_snapshot(as_of) -> str | None:
+    """
+    Publishes the export in effect on as_of to the dataset registry (unless it
+    is already there) and returns its dataset ID, ready for set_session_dataset.
+    """
+    stored_date = resolve_snapshot_date(as_of)
+    if stored_date is None:
+        return None
+
+    path = _partition_file(_partition_dir(stored_date))
+    dataset_id = _snapshot_dataset_id(path) if path else None
+    if dataset_id is not None and get_dataset(dataset_id) is not None:
+        return dataset_id
+
+    loaded = load_matt_snapshot(stored_date)
+    if loaded is None:
+        return None
+    dataset_id, df = loaded
+    return publish_dataset(dataset_id, df)
+
+
+# --- Exports ---
+__all__ = [
+    "is_retained",
+    "prune_snapshot_store",
+    "store_matt_snapshot",
+    "list_snapshot_dates",
+    "resolve_snapshot_date",
+    "load_matt_snapshot",
+    "open_matt_snapshot"
+]
@@ -0,0 +1,162 @@
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+from scripts.dataset_registry import get_dataset_index, get_session_index
+
+# --- Timeline Statuses ---
+TIMELINE_STATUSES = ['Not Released', 'Unsold', 'Backlog', 'Closed', 'Model']
+NOT_RELEASED, UNSOLD, BACKLOG, CLOSED, MODEL = range(len(TIMELINE_STATUSES))
+# Statuses in which a homesite is under contract (not available to sell)
+CONTRACT_STATUSES = (BACKLOG, CLOSED)
+
+# Event columns in same-day order: a cancellation frees the homesite before it
+# can be re-released, re-sold and closed
+TIMELINE_EVENTS = ('SALES_CANCELLATION_DATE', 'REL_FOR_SALE', 'SALE_DATE', 'CLOSING_DATE')
+STATUS_TIMELINE_INDEX_NAME = "status_timeline"
+
+# Event keys pack (row, day) into one sortable integer
+_DAY_ORIGIN = -25567   # 1900-01-01 as days since the epoch
+_KEY_SPAN = 1 << 17    # ~358 years of days per row
+
+
+# --- Event Log ---
+class StatusTimeline(NamedTuple):
+    initial_status: np.ndarray  # status of each homesite before its first event (int8)
+    event_keys: np.ndarray      # row * _KEY_SPAN + day offset, ascending (int64)
+    event_status: np.ndarray    # status from each event on (int8)
+
+
+def build_status_timeline(df: pd.DataFrame) -> StatusTimeline:
+    """
+    Builds each homesite's status history from REL_FOR_SALE, SALE_DATE,
+    SALES_CANCELLATION_DATE and CLOSING_DATE. The MATT row carries only the
+    current contract: a cancellation before SALE_DATE ends an earlier
+    contract, so the homesite counts as Backlog until then. A cancellation
+    with no SALE_DATE has no contract date to start from and is not counted.
+    """
+    cancel, release, sale, close = (df[col].to_numpy(dtype='datetime64[ns]') for col in TIMELINE_EVENTS)
+    has_cancel, has_release, has_sale, has_close = (~np.isnat(v) for v in (cancel, release, sale, close))
+    model = df['HS_TYPE'].eq('M').to_numpy(dtype=bool, na_value=False)
+
+    prior_contract = ~model & has_cancel & has_sale & (cancel < sale)
+    release_event = (
+        ~model & has_release
+        & (~has_sale | (release < sale))
+        & (~has_close | (release < close))
+        & (~prior_contract | (release > cancel))
+    )
+    free_status = np.where(release_event, NOT_RELEASED, UNSOLD)
+    initial_status = np.where(model, MODEL, np.where(prior_contract, BACKLOG, free_status)).astype(np.int8)
+
+    # (present, date, status from the event on), in TIMELINE_EVENTS order
+    events = [
+        (prior_contract, cancel, free_status),
+        (release_event, release, np.full(len(df), UNSOLD)),
+        (~model & has_sale, sale, np.full(len(df), BACKLOG)),
+        (~model & has_close, close, np.full(len(df), CLOSED))
+    ]
+    rows, days, ranks, statuses = [], [], [], []
+    for rank, (present, dates, status) in enumerate(events):
+        event_rows = np.flatnonzero(present)
+        rows.append(event_rows)
+        days.append(dates[event_rows].astype('datetime64[D]').astype(np.int64))
+        ranks.append(np.full(len(event_rows), rank))
+        statuses.append(status[event_rows])
+
+    rows, days, ranks, statuses = (np.concatenate(parts) for parts in (rows, days, ranks, statuses))
+    order = np.lexsort((ranks, days, rows))
+    event_keys = rows[order] * _KEY_SPAN + np.clip(days[order] - _DAY_ORIGIN, 0, _KEY_SPAN - 1)
+    return StatusTimeline(initial_status, event_keys, statuses[order].astype(np.int8))
+
+
+def take_timeline(timeline: StatusTimeline, rows: np.ndarray) -> StatusTimeline:
+    """
+    The timeline of the homesites at ascending row positions (e.g. a filter
+    selection), renumbered to match df.iloc[rows].
+    """
+    new_row = np.full(len(timeline.initial_status), -1, dtype=np.int64)
+    new_row[rows] = np.arange(len(rows))
+    event_rows = new_row[timeline.event_keys // _KEY_SPAN]
+    keep = event_rows >= 0
+    event_keys = event_rows[keep] * _KEY_SPAN + timeline.event_keys[keep] % _KEY_SPAN
+    return StatusTimeline(timeline.initial_status[rows], event_keys, timeline.event_status[keep])
+
+
+# --- As-Of Queries ---
+def status_as_of(timeline: StatusTimeline, date) -> np.ndarray:
+    """
+    Status code of every homesite at the end of date: one binary search per
+    homesite over the event keys.
+    """
+    day = pd.Timestamp(date).to_datetime64().astype('datetime64[D]').astype(np.int64)
+    rows = np.arange(len(timeline.initial_status), dtype=np.int64)
+    last = np.searchsorted(timeline.event_keys, rows * _KEY_SPAN + (day - _DAY_ORIGIN), side='right') - 1
+    last_row = np.where(last >= 0, timeline.event_keys[np.maximum(last, 0)] // _KEY_SPAN, -1)
+    return np.where(last_row == rows, timeline.event_status[np.maximum(last, 0)], timeline.initial_status)
+
+
+def _event_transitions(timeline: StatusTimeline) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # (row, day, status before the event) of every event
+    rows = timeline.event_keys // _KEY_SPAN
+    days = timeline.event_keys % _KEY_SPAN + _DAY_ORIGIN
+    first_event = np.r_[True, rows[1:] != rows[:-1]]
+    previous = np.where(first_event, timeline.initial_status[rows], np.r_[0, timeline.event_status[:-1]])
+    return rows, days, previous
+
+
+def status_entries(timeline: StatusTimeline, status: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (row, day) of every event that moves a homesite into status, e.g. BACKLOG
+    for gross sales.
+    """
+    rows, days, previous = _event_transitions(timeline)
+    entered = (timeline.event_status == status) & (previous != status)
+    return rows[entered], days[entered]
+
+
+def contract_changes(timeline: StatusTimeline) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (row, day, +1/-1) for every event that puts a homesite under contract or
+    frees it, for cumulative under-contract counts over time.
+    """
+    rows, days, previous = _event_transitions(timeline)
+    delta = (np.isin(timeline.event_status, CONTRACT_STATUSES).astype(np.int64)
+             - np.isin(previous, CONTRACT_STATUSES).astype(np.int64))
+    changed = delta != 0
+    return rows[changed], days[changed], delta[changed]
+
+
+# --- Session Dataset Timeline ---
+def build_dataset_status_timeline(dataset_id: str) -> None:
+    """
+    Builds the status timeline of a dataset at ingest.
+    """
+    get_dataset_index(dataset_id, STATUS_TIMELINE_INDEX_NAME, build_status_timeline)
+
+
+def get_session_status_timeline() -> StatusTimeline | None:
+    """
+    Status timeline of this session's dataset, shared by every page and session.
+    """
+    return get_session_index(STATUS_TIMELINE_INDEX_NAME, build_status_timeline)
+
+
+# --- Exports ---
+__all__ = [
+    "TIMELINE_STATUSES",
+    "NOT_RELEASED",
+    "UNSOLD",
+    "BACKLOG",
+    "CLOSED",
+    "MODEL",
+    "CONTRACT_STATUSES",
+    "StatusTimeline",
+    "build_status_timeline",
+    "take_timeline",
+    "status_as_of",
+    "status_entries",
+    "contract_changes",
+    "build_dataset_status_timeline",
+    "get_session_status_timeline"
+]
@@ -0,0 +1,115 @@
+import io
+import os
+import threading
+from typing import Callable
+import numpy as np
+import pandas as pd
+
+from config import INGEST_CHUNK_MB
+from scripts.matt_cache import CACHE_PATH
+from scripts.matt_schema import iter_matt_csv, parse_as_of_date, read_matt_csv
+from scripts.process_matt import CATEGORICAL_COLUMNS, CATEGORY_ORDERS
+from scripts.delta_ingest import delta_baseline, ingest_matt_frame, previous_matt_export, process_matt_delta
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Without pyarrow, processed chunks are kept in memory until the end
+    pa = None
+    pq = None
+
+INGEST_CHUNK_BYTES = INGEST_CHUNK_MB * 1024 * 1024
+# Share of a whole-export ingest's progress spent reading the CSV (the rest is processing)
+READ_SHARE = 0.15
+
+
+def _global_codes(values: pd.Series, categories: list) -> np.ndarray:
+    # Codes of values in categories, appending labels seen for the first time
+    positions = {label: position for position, label in enumerate(categories)}
+    for label in values.cat.categories:
+        if label not in positions:
+            positions[label] = len(categories)
+            categories.append(label)
+    mapping = np.array([positions[label] for label in values.cat.categories] + [-1], dtype=np.int32)
+    return mapping[values.cat.codes.to_numpy()]  # code -1 (missing) takes the last slot
+
+
+# --- Streaming Ingest ---
+def ingest_matt_source(source, size: int | None, progress: Callable[[str, float], None] | None = None) -> pd.DataFrame:
+    """
+    Reads and processes a raw MATT export from a binary source of size bytes
+    (None if unknown), such as a stream from scripts.matt_compression.
+    Exports up to INGEST_CHUNK_MB are read whole; larger ones are read,
+    processed (see scripts.delta_ingest) and spilled to a Parquet file one
+    chunk at a time, so only one chunk's intermediate copies are in memory.
+    progress(step, fraction) is called as each processing step (whole
+    exports) or chunk starts.
+    """
+    progress = progress or (lambda step, fraction: None)
+    if size is not None and size <= INGEST_CHUNK_BYTES:
+        progress('Reading', 0.0)
+        if not isinstance(source, io.BytesIO):
+            source = io.BytesIO(source.read())  # decompressing streams cannot seek back cheaply
+        raw_df = read_matt_csv(source)
+        return ingest_matt_frame(raw_df, lambda step, fraction: progress(step, READ_SHARE + (1 - READ_SHARE) * fraction))
+
+    spill_path = os.path.join(CACHE_PATH, f"ingest.{os.getpid()}.{threading.get_ident()}.tmp")
+    writer, frames = None, []
+    category_lists, failures, reprocessed = {}, {}, 0
+    baseline = None
+    try:
+        progress('Processing chunks', 0.0)
+        for chunk_number, chunk in enumerate(iter_matt_csv(source, INGEST_CHUNK_BYTES)):
+            if chunk_number == 0:
+                baseline = delta_baseline(previous_matt_export(parse_as_of_date(chunk)))
+            processed = process_matt_delta(chunk, baseline=baseline)
+            for col, count in processed.attrs['date_parse_failures'].items():
+                failures[col] = failures.get(col, 0) + count
+            reprocessed += processed.attrs['reprocessed_rows']
+
+            # Category sets differ per chunk, so categoricals are spilled as codes into one growing list per column
+            for col in processed.columns:
+                if isinstance(processed[col].dtype, pd.CategoricalDtype):
+                    processed[col] = _global_codes(processed[col], category_lists.setdefault(col, []))
+
+            if pq is None:
+                frames.append(processed)
+            else:
+                table = pa.Table.from_pandas(processed, preserve_index=False)
+                if writer is None:
+                    os.makedirs(CACHE_PATH, exist_ok=True)
+                    writer = pq.ParquetWriter(spill_path, table.schema)
+                writer.write_table(table.cast(writer.schema))
+            del processed, chunk
+            progress('Processing chunks', min(source.tell() / size, 1.0) if size else 0.0)
+
+        progress('Merging chunks', 1.0)
+        if writer is not None:
+            writer.close()
+            writer = None
+            # Arrow buffers are released column by column as the frame is built
+            processed_df = pq.read_table(spill_path).to_pandas(split_blocks=True, self_destruct=True)
+        else:
+            processed_df = pd.concat(frames, ignore_index=True)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(spill_path):
+            os.remove(spill_path)
+
+    # Restore the categoricals, ordering value-dependent category sets as process_matt_data does
+    for col, categories in category_lists.items():
+        values = pd.Categorical.from_codes(processed_df[col].to_numpy(), categories=categories)
+        if col in CATEGORICAL_COLUMNS:
+            order = CATEGORY_ORDERS.get(col) or []
+            values = values.set_categories(order + sorted(str(label) for label in categories if label not in set(order)))
+        processed_df[col] = values
+    processed_df.attrs['date_parse_failures'] = failures
+    processed_df.attrs['reprocessed_rows'] = reprocessed
+    return processed_df
+
+
+# --- Exports ---
+__all__ = [
+    "ingest_matt_source"
+]
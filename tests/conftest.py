@@ -0,0 +1,40 @@
+import io
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scripts.matt_schema import read_matt_csv
+from scripts.process_matt import process_matt_data
+from scripts.dataset_registry import publish_dataset, set_session_dataset
+
+SAMPLE_PATH = os.path.join(ROOT, 'data', 'Homesite Detail Data (MATT).csv')
+
+
+# --- Sample MATT Export (read-only, shared by every test) ---
+@pytest.fixture(scope='session')
+def sample_bytes() -> bytes:
+    with open(SAMPLE_PATH, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture(scope='session')
+def raw_matt(sample_bytes):
+    return read_matt_csv(io.BytesIO(sample_bytes))
+
+
+@pytest.fixture(scope='session')
+def matt_df(raw_matt):
+    return process_matt_data(raw_matt)
+
+
+@pytest.fixture
+def session_dataset(matt_df) -> str:
+    """
+    Publishes the processed sample and makes it this (bare-mode) session's dataset.
+    """
+    dataset_id = publish_dataset('test-sample', matt_df)
+    set_session_dataset(dataset_id)
+    return dataset_id
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from scripts.bitmap_index import FILTER_DIMENSIONS, bitmap_any, bitmap_to_mask, build_bitmap_index, filter_mask
+
+
+def test_bitmaps_match_value_masks(matt_df):
+    for column in FILTER_DIMENSIONS:
+        values = matt_df[column]
+        index = build_bitmap_index(values)
+        assert index.size == len(values)
+        assert set(index.bitmaps) == set(values.dropna().unique()), column
+        for value, bitmap in index.bitmaps.items():
+            np.testing.assert_array_equal(bitmap_to_mask(bitmap, index.size), (values == value).to_numpy(), err_msg=f"{column}={value}")
+
+
+def test_bitmaps_of_object_column_with_missing_values():
+    values = pd.Series(['b', None, 'a', 'b', np.nan, 'c', 'a', 'b', 'a'])
+    index = build_bitmap_index(values)
+    assert sorted(index.bitmaps) == ['a', 'b', 'c']
+    for value in 'abc':
+        np.testing.assert_array_equal(bitmap_to_mask(index.bitmaps[value], 9), (values == value).to_numpy())
+    assert build_bitmap_index(values.iloc[:0]).bitmaps == {}
+
+
+def test_bitmap_any_matches_isin(matt_df):
+    values = matt_df['Community Name']
+    selected = list(values.dropna().unique()[::7]) + ['Not a community']
+    index = build_bitmap_index(values)
+    np.testing.assert_array_equal(bitmap_to_mask(bitmap_any(index, selected), index.size), values.isin(selected).to_numpy())
+
+
+def test_filter_mask_matches_pandas(matt_df, session_dataset):
+    hubs = list(matt_df['Hub'].dropna().unique()[:3])
+    date_mask = matt_df['SALE_DATE'].notna().to_numpy()
+    expected = matt_df['Hub'].isin(hubs).to_numpy() & matt_df['Investor Sale'].isin(['Retail']).to_numpy() & date_mask
+    mask = filter_mask({'Hub': hubs, 'Investor Sale': ['Retail']}, date_mask)
+    np.testing.assert_array_equal(mask, expected)
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.date_index import build_date_index, date_range_mask, date_range_positions
+
+RANGES = [
+    ('2024-09-01', '2025-07-25'),
+    ('2025-01-01', '2025-01-01'),
+    (None, '2024-12-31'),
+    ('2025-06-01', None),
+    ('2026-01-01', '2025-01-01'),
+]
+
+
+@pytest.mark.parametrize('inclusive', ['both', 'left', 'right', 'neither'])
+@pytest.mark.parametrize('start, end', RANGES)
+def test_range_mask_matches_between(matt_df, start, end, inclusive):
+    dates = matt_df['SALE_DATE']
+    index = build_date_index(dates)
+    lower = pd.Timestamp(start) if start is not None else pd.Timestamp.min
+    upper = pd.Timestamp(end) if end is not None else pd.Timestamp.max
+    expected = dates.between(lower, upper, inclusive=inclusive).to_numpy()
+    np.testing.assert_array_equal(date_range_mask(index, start, end, inclusive), expected)
+    np.testing.assert_array_equal(date_range_positions(index, start, end, inclusive), np.flatnonzero(expected))
+
+
+def test_missing_dates_never_match():
+    dates = pd.Series(pd.to_datetime(['2025-01-02', None, '2025-01-01', None]))
+    index = build_date_index(dates)
+    assert index.size == 4
+    np.testing.assert_array_equal(index.positions, [2, 0])
+    np.testing.assert_array_equal(date_range_mask(index), [True, False, True, False])
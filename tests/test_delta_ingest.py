@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.delta_ingest import ROW_HASH_COLUMN, hash_matt_rows, process_matt_delta
+from scripts.process_matt import process_matt_data
+
+
+def assert_same_frame(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    # Category sets may be listed in another order, so compare their values
+    categories = {col: object for col in expected.columns if isinstance(expected[col].dtype, pd.CategoricalDtype)}
+    pd.testing.assert_frame_equal(actual[expected.columns].astype(categories), expected.astype(categories), check_dtype=False)
+
+
+@pytest.fixture(scope='module')
+def previous_export(raw_matt, matt_df) -> pd.DataFrame:
+    previous = matt_df.copy()
+    previous[ROW_HASH_COLUMN] = hash_matt_rows(raw_matt)
+    return previous
+
+
+@pytest.fixture(scope='module')
+def next_raw_matt(raw_matt) -> pd.DataFrame:
+    # The next week's export: new stamp, 300 price changes, every 250th homesite gone
+    raw = raw_matt.copy()
+    raw['Textbox1'] = raw['Textbox1'].str.replace('7/25/2025', '8/1/2025')
+    changed = np.random.default_rng(1).choice(len(raw), 300, replace=False)
+    raw.iloc[changed, raw.columns.get_loc('BASE_PRICE')] = '1,000,000'
+    raw = raw[np.arange(len(raw)) % 250 != 7].reset_index(drop=True)
+    raw.attrs['changed_rows'] = int((changed % 250 != 7).sum())
+    return raw
+
+
+def test_delta_matches_full_processing(next_raw_matt, previous_export):
+    result = process_matt_delta(next_raw_matt, previous_export)
+    expected = process_matt_data(next_raw_matt)
+    expected[ROW_HASH_COLUMN] = hash_matt_rows(next_raw_matt)
+    assert_same_frame(result, expected)
+    assert result['Textbox1'].eq('The MATT AS OF 8/1/2025').all()
+    assert result.attrs['reprocessed_rows'] == next_raw_matt.attrs['changed_rows']
+
+
+def test_stamp_only_change_reprocesses_nothing(raw_matt, previous_export):
+    raw = raw_matt.copy()
+    raw['Textbox1'] = raw['Textbox1'].str.replace('7/25/2025', '8/1/2025')
+    assert process_matt_delta(raw, previous_export).attrs['reprocessed_rows'] == 0
+
+
+def test_no_previous_export_is_a_full_run(raw_matt):
+    result = process_matt_delta(raw_matt.head(500))
+    assert result.attrs['reprocessed_rows'] == 500
+    np.testing.assert_array_equal(result[ROW_HASH_COLUMN].to_numpy(), hash_matt_rows(raw_matt.head(500)))
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from scripts.filters import apply_filter_spec, make_filter_spec, select_rows
+
+
+# --- Canonical Specs ---
+def test_spec_is_order_independent():
+    a = make_filter_spec({'Hub': ['b', 'a'], 'Plan Name': ['x']}, {'SALE_DATE': ('2025-01-01', '2025-02-01')})
+    b = make_filter_spec({'Plan Name': ['x'], 'Hub': ('a', 'b')}, {'SALE_DATE': (pd.Timestamp('2025-01-01'), '2025-02-01', 'both')})
+    assert a == b
+    assert hash(a) == hash(b)
+
+
+def test_spec_accepts_mixed_and_missing_values():
+    values = ['b', None, 1, np.nan, 'a']
+    a = make_filter_spec({'Hub': values})
+    b = make_filter_spec({'Hub': list(reversed(values))})
+    assert a == b
+    assert len(dict(a.filters)['Hub']) == 5
+
+
+def test_with_filters_overrides_columns():
+    spec = make_filter_spec({'Hub': ['a']}, {'SALE_DATE': ('2025-01-01', '2025-02-01')})
+    extended = spec.with_filters({'Hub': ['b'], 'Collection': ['c']})
+    assert dict(extended.filters) == {'Hub': ('b',), 'Collection': ('c',)}
+    assert extended.date_range('SALE_DATE') == (pd.Timestamp('2025-01-01'), pd.Timestamp('2025-02-01'))
+    assert extended.date_range('EST_COE_DATE') == (None, None)
+
+
+# --- Memoized Row Selections ---
+def test_select_rows_matches_pandas(matt_df, session_dataset):
+    hubs = list(matt_df['Hub'].dropna().unique()[:4])
+    spec = make_filter_spec(
+        {'Hub': hubs, 'Realtor/Direct': ['Realtor']},
+        {'SALE_DATE': ('2024-09-01', '2025-07-25'), 'EST_COE_DATE': ('2025-01-01', None)}
+    )
+    expected = (
+        matt_df['Hub'].isin(hubs)
+        & matt_df['Realtor/Direct'].isin(['Realtor'])
+        & matt_df['SALE_DATE'].between(pd.Timestamp('2024-09-01'), pd.Timestamp('2025-07-25'))
+        & (matt_df['EST_COE_DATE'] >= pd.Timestamp('2025-01-01'))
+    )
+    positions = select_rows(spec)
+    np.testing.assert_array_equal(positions, np.flatnonzero(expected.to_numpy()))
+    assert select_rows(spec) is positions  # served from the selection cache
+    assert not positions.flags.writeable
+    pd.testing.assert_frame_equal(apply_filter_spec(matt_df, spec), matt_df[expected.to_numpy()])
+
+
+def test_empty_spec_selects_every_row(matt_df, session_dataset):
+    np.testing.assert_array_equal(select_rows(make_filter_spec()), np.arange(len(matt_df)))
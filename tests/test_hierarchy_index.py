@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.hierarchy_index import HIERARCHY_LEVELS, build_hierarchy_index, hierarchy_options
+
+
+def expected_options(df: pd.DataFrame, selections: list, date_column=None, start=None, end=None) -> list:
+    mask = np.ones(len(df), dtype=bool)
+    for level, values in zip(HIERARCHY_LEVELS, selections):
+        mask &= df[level].isin(values).to_numpy()
+    if date_column is not None:
+        mask &= df[date_column].between(pd.Timestamp(start), pd.Timestamp(end)).to_numpy()
+    return sorted(df.loc[mask, HIERARCHY_LEVELS[len(selections)]].dropna().unique())
+
+
+@pytest.fixture(scope='module')
+def hierarchy(matt_df):
+    return build_hierarchy_index(matt_df)
+
+
+def _selections(df: pd.DataFrame, depth: int, seed: int) -> list:
+    # Random label subsets per level, each drawn from the options left by the levels above
+    rng = np.random.default_rng(seed)
+    selections = []
+    for _ in range(depth):
+        options = expected_options(df, selections)
+        count = min(len(options), int(rng.integers(1, 4)))
+        selections.append(list(rng.choice(np.array(options, dtype=object), size=count, replace=False)) if count else [])
+    return selections
+
+
+@pytest.mark.parametrize('depth', range(len(HIERARCHY_LEVELS)))
+@pytest.mark.parametrize('seed', range(5))
+def test_options_match_pandas(matt_df, hierarchy, depth, seed):
+    selections = _selections(matt_df, depth, seed)
+    assert hierarchy_options(hierarchy, selections) == expected_options(matt_df, selections)
+
+
+@pytest.mark.parametrize('date_column, start, end', [
+    ('SALE_DATE', '2024-09-01', '2025-07-25'),
+    ('SALE_DATE', '2025-07-01', '2025-07-01'),
+    ('EST_COE_DATE', '2025-06-01', '2025-08-31'),
+    ('EST_COE_DATE', '2030-01-01', '2030-12-31'),
+])
+@pytest.mark.parametrize('depth', range(len(HIERARCHY_LEVELS)))
+def test_date_limited_options_match_pandas(matt_df, hierarchy, date_column, start, end, depth):
+    selections = _selections(matt_df, depth, seed=depth)
+    assert hierarchy_options(hierarchy, selections, date_column, start, end) == expected_options(matt_df, selections, date_column, start, end)
+
+
+def test_unknown_labels_select_nothing(hierarchy):
+    assert hierarchy_options(hierarchy, [['Not a hub']]) == []
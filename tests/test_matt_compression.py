@@ -0,0 +1,70 @@
+import gzip
+import io
+import zipfile
+import pyarrow as pa
+import pytest
+
+from scripts.matt_compression import ZSTD_AVAILABLE, open_matt_source
+from scripts.matt_schema import iter_matt_csv
+
+needs_zstd = pytest.mark.skipif(not ZSTD_AVAILABLE, reason="pyarrow without zstd")
+
+
+def zipped(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def zstd_stream(data: bytes) -> bytes:
+    # Streaming compressors do not record the decompressed size
+    sink = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(sink, 'zstd') as stream:
+        stream.write(data)
+    return sink.getvalue().to_pybytes()
+
+
+def test_plain_gzip_and_zip(sample_bytes):
+    for raw_bytes in (sample_bytes, gzip.compress(sample_bytes), zipped({'__MACOSX/._matt.csv': b'x', 'matt.csv': sample_bytes})):
+        stream, size = open_matt_source(raw_bytes)
+        assert size == len(sample_bytes)
+        assert stream.read() == sample_bytes
+
+
+def test_zip_needs_one_csv(sample_bytes):
+    with pytest.raises(ValueError):
+        open_matt_source(zipped({'a.csv': sample_bytes, 'b.csv': sample_bytes}))
+
+
+@needs_zstd
+@pytest.mark.parametrize('size', [300, 70000, None])
+def test_zstd_frame_content_size(size, sample_bytes):
+    data = sample_bytes[:size]
+    stream, content_size = open_matt_source(pa.compress(data, 'zstd', asbytes=True))
+    assert content_size == len(data)
+    assert stream.read() == data
+
+
+@needs_zstd
+def test_zstd_without_content_size_and_multiple_frames(sample_bytes):
+    half = len(sample_bytes) // 2
+    stream, size = open_matt_source(zstd_stream(sample_bytes))
+    assert size is None
+    assert stream.read() == sample_bytes
+
+    frames = pa.compress(sample_bytes[:half], 'zstd', asbytes=True) + pa.compress(sample_bytes[half:], 'zstd', asbytes=True)
+    stream, size = open_matt_source(frames)
+    assert size == half  # the first frame's size only
+    assert stream.read() == sample_bytes
+
+
+@needs_zstd
+def test_zstd_stream_reads_in_chunks(sample_bytes, raw_matt):
+    stream, _ = open_matt_source(pa.compress(sample_bytes, 'zstd', asbytes=True))
+    rows = 0
+    for chunk in iter_matt_csv(stream, 1024 * 1024):
+        rows += len(chunk)
+        assert 0 < stream.tell() <= len(sample_bytes)
+    assert rows == len(raw_matt)
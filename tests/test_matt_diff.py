@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.matt_diff import CHANGE_CATEGORIES, compare_matt_exports, match_homesites, status_transitions
+
+
+@pytest.fixture(scope='module')
+def exports(matt_df) -> tuple[pd.DataFrame, pd.DataFrame, dict[str, int]]:
+    # An old export and a new one with one change of every kind, at known rows
+    old = matt_df.iloc[:2000].reset_index(drop=True)
+    new = old.copy()
+    unsold = np.flatnonzero((old['HS_TYPE_LABEL'] == 'Unsold').to_numpy() & old['SALE_DATE'].isna().to_numpy())
+    closed = np.flatnonzero((old['HS_TYPE_LABEL'] == 'Closed').to_numpy() & old['EST_COE_DATE'].notna().to_numpy())
+    rows = {'sale': unsold[0], 'slip': closed[0], 'price': closed[1], 'removed': closed[2], 'added': closed[3]}
+
+    new.loc[rows['sale'], 'SALE_DATE'] = pd.Timestamp('2025-07-30')
+    new.loc[rows['sale'], 'HS_TYPE_LABEL'] = 'Backlog'
+    new.loc[rows['slip'], 'EST_COE_DATE'] = old.loc[rows['slip'], 'EST_COE_DATE'] + pd.Timedelta(days=14)
+    new.loc[rows['price'], 'BASE_PRICE'] = old.loc[rows['price'], 'BASE_PRICE'] + 5000
+    new.loc[rows['added'], 'HOMESITE'] = 'NEW-1'
+    new = new.drop(index=rows['removed']).reset_index(drop=True)
+    return old, new, rows
+
+
+def test_match_homesites(exports):
+    old, new, rows = exports
+    positions = match_homesites(old, new)
+    assert (positions == -1).sum() == 1
+    expected = np.delete(np.arange(len(old)), rows['removed'])
+    expected[expected == rows['added']] = -1
+    np.testing.assert_array_equal(positions, expected)
+
+
+def test_every_change_is_reported_once(exports):
+    old, new, rows = exports
+    changes = compare_matt_exports(old, new)
+    assert list(changes) == CHANGE_CATEGORIES
+    homesites = {name: changes[name]['HOMESITE'].tolist() for name in CHANGE_CATEGORIES}
+    assert homesites == {
+        'New Sales': [old.loc[rows['sale'], 'HOMESITE']],
+        'Cancellations': [],
+        'COE Slips': [old.loc[rows['slip'], 'HOMESITE']],
+        'Price Changes': [old.loc[rows['price'], 'HOMESITE']],
+        'Status Changes': [old.loc[rows['sale'], 'HOMESITE']],
+        'New Homesites': ['NEW-1'],
+        'Removed Homesites': [old.loc[rows['removed'], 'HOMESITE'], old.loc[rows['added'], 'HOMESITE']]
+    }
+    assert changes['COE Slips']['Days Slipped'].tolist() == [14]
+    assert changes['Price Changes']['Base Price'].iloc[0] - changes['Price Changes']['Previous Base Price'].iloc[0] == 5000
+    assert status_transitions(changes['Status Changes']).loc['Unsold', 'Backlog'] == 1
+
+
+def test_cancellation_is_reported(exports):
+    old, _, _ = exports
+    backlog = np.flatnonzero(old['SALE_DATE'].notna().to_numpy() & old['SALES_CANCELLATION_DATE'].isna().to_numpy())[0]
+    new = old.copy()
+    new.loc[backlog, 'SALE_DATE'] = pd.NaT
+    new.loc[backlog, 'SALES_CANCELLATION_DATE'] = pd.Timestamp('2025-07-30')
+    changes = compare_matt_exports(old, new)
+    assert changes['Cancellations']['HOMESITE'].tolist() == [old.loc[backlog, 'HOMESITE']]
+    assert changes['New Sales'].empty
+
+
+def test_identical_exports_have_no_changes(exports):
+    old, _, _ = exports
+    assert all(change_set.empty for change_set in compare_matt_exports(old, old.copy()).values())
@@ -0,0 +1,84 @@
+import csv
+import io
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from scripts.matt_compression import ZSTD_AVAILABLE, open_matt_source
+from scripts.matt_schema import read_matt_as_of, read_matt_header, validate_matt_sample
+
+AS_OF = pd.Timestamp('2025-07-25')
+
+
+def edit_rows(sample_bytes: bytes, rows: int, edit) -> bytes:
+    # The header and first rows of the sample, with edit(header, row) applied to every row
+    lines = sample_bytes.decode('utf-8-sig').splitlines()[:rows + 1]
+    reader = csv.reader(lines)
+    header = next(reader)
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator='\n')
+    writer.writerow(header)
+    for row in reader:
+        edit(header, row)
+        writer.writerow(row)
+    return output.getvalue().encode()
+
+
+def test_sample_is_valid(sample_bytes):
+    source = io.BytesIO(sample_bytes)
+    result = validate_matt_sample(source, today=AS_OF + pd.Timedelta(days=1))
+    assert result.errors == []
+    assert result.as_of == AS_OF
+    assert 'BASE_PRICE' in result.columns
+    assert source.tell() == 0
+
+
+def test_stale_export_is_a_warning(sample_bytes):
+    result = validate_matt_sample(io.BytesIO(sample_bytes), max_age_days=14, today=AS_OF + pd.Timedelta(days=30))
+    assert result.errors == []
+    assert any('30 days ago' in warning for warning in result.warnings)
+    result = validate_matt_sample(io.BytesIO(sample_bytes), max_age_days=None, today=AS_OF + pd.Timedelta(days=30))
+    assert not any('days ago' in warning for warning in result.warnings)
+
+
+def test_future_export_is_an_error(sample_bytes):
+    result = validate_matt_sample(io.BytesIO(sample_bytes), today=AS_OF - pd.Timedelta(days=1))
+    assert result.errors == ["The AS OF date 07/25/2025 is in the future."]
+
+
+def test_missing_columns_and_encoding_are_errors(sample_bytes):
+    renamed = sample_bytes.replace(b'BUYER_NAME', b'BUYER', 1)
+    result = validate_matt_sample(io.BytesIO(renamed), today=AS_OF)
+    assert len(result.errors) == 1 and 'BUYER_NAME' in result.errors[0]
+
+    utf16 = sample_bytes[:20000].decode('utf-8-sig').encode('utf-16')
+    result = validate_matt_sample(io.BytesIO(utf16), today=AS_OF)
+    assert len(result.errors) == 1 and 'UTF-16' in result.errors[0]
+
+    result = validate_matt_sample(io.BytesIO(sample_bytes[:sample_bytes.index(b'\n') + 1]), today=AS_OF)
+    assert result.errors == ["The file has no complete data rows."]
+
+
+def test_unreadable_values(sample_bytes):
+    def edit(header, row):
+        row[header.index('TOTAL_SQFT')] = 'n/a'
+        row[header.index('BASE_PRICE')] = 'TBD'
+    result = validate_matt_sample(io.BytesIO(edit_rows(sample_bytes, 10, edit)), today=AS_OF)
+    assert result.errors == ["TOTAL_SQFT should be numeric but has 10 unreadable value(s) in the first 10 rows."]
+    assert "BASE_PRICE has 10 unreadable value(s) in the first 10 rows; they will be left blank." in result.warnings
+
+
+def test_header_and_as_of_leave_source_in_place(sample_bytes):
+    source = io.BytesIO(sample_bytes)
+    assert read_matt_header(source)[:2] == next(csv.reader([sample_bytes.decode('utf-8-sig').splitlines()[0]]))[:2]
+    assert read_matt_as_of(source) == AS_OF
+    assert source.tell() == 0
+
+
+@pytest.mark.skipif(not ZSTD_AVAILABLE, reason="pyarrow without zstd")
+def test_validates_decompressing_stream(sample_bytes):
+    # Decompressing streams cannot seek; the sample is read without rewinding
+    stream, _ = open_matt_source(pa.compress(sample_bytes, 'zstd', asbytes=True))
+    result = validate_matt_sample(stream, today=AS_OF)
+    assert result.errors == []
+    assert result.as_of == AS_OF
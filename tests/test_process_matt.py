@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from scripts.matt_schema import DATE_FORMATS, MATT_KINDS
+from scripts.process_matt import parse_accounting_numbers, parse_matt_dates
+
+
+# --- Accounting Number Parser ---
+def test_parse_accounting_numbers_money():
+    values = pd.Series(['323,698', '(5,749)', '$(5,749)', '($5,749)', ' $ 1,200 ', '-12.5', '', 'n/a', None])
+    parsed = parse_accounting_numbers(values)
+    expected = [323698.0, -5749.0, -5749.0, -5749.0, 1200.0, -12.5, np.nan, np.nan, np.nan]
+    np.testing.assert_array_equal(parsed.to_numpy(), expected)
+
+
+def test_parse_accounting_numbers_percent():
+    parsed = parse_accounting_numbers(pd.Series(['35.08%', '(2.5%)', '0%', None]), percent=True)
+    np.testing.assert_allclose(parsed.to_numpy(), [0.3508, -0.025, 0.0, np.nan])
+
+
+def test_parse_accounting_numbers_keeps_index_and_name():
+    values = pd.Series(['1', '2', '1'], index=[10, 20, 30], name='BASE_PRICE')
+    parsed = parse_accounting_numbers(values)
+    assert parsed.index.tolist() == [10, 20, 30]
+    assert parsed.name == 'BASE_PRICE'
+    assert parsed.tolist() == [1.0, 2.0, 1.0]
+
+
+def test_money_and_percent_columns_are_floats(raw_matt, matt_df):
+    assert len(matt_df) == len(raw_matt)
+    for col, kind in MATT_KINDS.items():
+        if kind in ('money', 'percent') and col in raw_matt.columns and col in matt_df.columns:
+            assert matt_df[col].dtype == 'float64', col
+            # Every non-blank value in the export is readable
+            text = raw_matt[col].astype(str).str.strip().to_numpy()
+            filled = raw_matt[col].notna().to_numpy() & (text != '')
+            assert matt_df[col].notna().to_numpy()[filled].all(), col
+
+
+# --- Date Parsing ---
+def test_parse_matt_dates_counts_failures():
+    df = pd.DataFrame({
+        'SALE_DATE': ['7/25/2025', '07/01/2024', '', None, '2025-07-25', '7/25/2025'],
+        'CLOSING_DATE': [None] * 6,
+        'PROJECT': ['x'] * 6
+    })
+    failures = parse_matt_dates(df)
+    assert failures == {'SALE_DATE': 1, 'CLOSING_DATE': 0}
+    expected = pd.to_datetime(['2025-07-25', '2024-07-01', None, None, None, '2025-07-25'])
+    np.testing.assert_array_equal(df['SALE_DATE'].to_numpy(), expected.to_numpy())
+    assert df['CLOSING_DATE'].isna().all()
+    assert df['PROJECT'].tolist() == ['x'] * 6
+
+
+def test_date_columns_match_pandas_parsing(raw_matt, matt_df):
+    for col, date_format in DATE_FORMATS.items():
+        if col in raw_matt.columns:
+            expected = pd.to_datetime(raw_matt[col], format=date_format, errors='coerce')
+            np.testing.assert_array_equal(matt_df[col].to_numpy(dtype='datetime64[ns]'), expected.to_numpy(dtype='datetime64[ns]'), err_msg=col)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.sales_cube import build_sales_cube, cube_plan_pricing, query_sales_cube
+
+START, END = pd.Timestamp('2024-09-01'), pd.Timestamp('2025-07-25')
+
+
+@pytest.fixture(scope='module')
+def cube(matt_df):
+    return build_sales_cube(matt_df)
+
+
+def _sold(df: pd.DataFrame, filters: dict | None = None, start=START, end=END) -> pd.DataFrame:
+    mask = df['SALE_DATE'].between(start, end)
+    for column, values in (filters or {}).items():
+        mask &= df[column].isin(values)
+    return df[mask]
+
+
+def test_cube_keeps_every_sale(matt_df, cube):
+    assert cube['Sales'].sum() == matt_df['SALE_DATE'].notna().sum()
+    assert cube['SALE_DATE'].is_monotonic_increasing
+
+
+@pytest.mark.parametrize('by', [['Hub'], ['Community Name', 'Plan Name'], ['DOW_Sale'], ['Realtor/Direct', 'Investor Sale']])
+def test_sales_counts_match_group_by(matt_df, cube, by):
+    hubs = list(matt_df['Hub'].dropna().unique()[:5])
+    filters = {'Hub': hubs, 'HS_TYPE': ['B', 'Z']}
+    rollup = query_sales_cube(cube, by, filters, START, END)
+    expected = _sold(matt_df, filters).groupby(by, observed=True).size()
+    pd.testing.assert_series_equal(rollup['Sales'], expected, check_names=False, check_index_type=False)
+
+
+def test_monthly_sales_match_group_by(matt_df, cube):
+    rollup = query_sales_cube(cube, ['Sales_Month'], None, START, END)
+    sold = _sold(matt_df)
+    expected = sold.groupby(sold['SALE_DATE'].dt.to_period('M')).size()
+    np.testing.assert_array_equal(rollup['Sales'].to_numpy(), expected.to_numpy())
+    assert rollup.index.tolist() == expected.index.tolist()
+
+
+def reference_plan_pricing(df: pd.DataFrame, keys: list) -> pd.DataFrame:
+    # Plan pricing straight from the homesite rows
+    sold = _sold(df).copy()
+    sold['List Price'] = sum(sold[col].fillna(0) for col in ('BASE_PRICE', 'HOMESITE_PREMIUM', 'PRICE_REDUCTION_INCENTIVES', 'OPTION_REVENUE'))
+    summary = sold.groupby(keys, as_index=False, observed=True).agg({
+        'BASE_PRICE': 'mean', 'List Price': 'mean', 'Net_Sales_Price': 'mean', 'TOTAL_SQFT': 'mean'
+    })
+    return summary.rename(columns={
+        'BASE_PRICE': 'Avg Base Price', 'List Price': 'Avg List Price',
+        'Net_Sales_Price': 'Avg Net Revenue', 'TOTAL_SQFT': 'Avg SqFt'
+    })
+
+
+@pytest.mark.parametrize('keys', [['Plan Name'], ['Community Name', 'Plan Name'], ['Collection']])
+def test_plan_pricing_matches_homesite_means(matt_df, cube, keys):
+    pricing = cube_plan_pricing(query_sales_cube(cube, keys, None, START, END))
+    assert pricing['Avg SqFt'].is_monotonic_increasing
+    expected = reference_plan_pricing(matt_df, keys)
+    pricing = pricing.sort_values(keys, ignore_index=True)
+    expected = expected.sort_values(keys, ignore_index=True)
+    for col in keys:
+        assert pricing[col].astype(str).tolist() == expected[col].astype(str).tolist()
+    for col in ['Avg Base Price', 'Avg List Price', 'Avg Net Revenue', 'Avg SqFt']:
+        np.testing.assert_allclose(pricing[col].to_numpy(dtype=float), expected[col].to_numpy(dtype=float), rtol=1e-9, err_msg=col)
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from scripts import snapshot_store
+from scripts.dataset_registry import get_dataset
+from scripts.snapshot_store import (
+    list_snapshot_dates, load_matt_snapshot, open_matt_snapshot, resolve_snapshot_date, store_matt_snapshot
+)
+
+
+@pytest.fixture(autouse=True)
+def store_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_store, 'STORE_PATH', str(tmp_path / 'history'))
+    monkeypatch.setattr(snapshot_store, 'ENABLE_SNAPSHOT_STORE', True)
+    return tmp_path / 'history'
+
+
+def export_as_of(matt_df, as_of: str) -> pd.DataFrame:
+    # A small export with its AS OF stamp moved to as_of
+    df = matt_df.head(200).copy()
+    df['Textbox1'] = f"The MATT AS OF {pd.Timestamp(as_of):%m/%d/%Y}"
+    return df
+
+
+def test_store_and_time_travel(matt_df):
+    for as_of in ('2025-07-11', '2025-07-25', '2025-07-18'):
+        assert store_matt_snapshot(f"export-{as_of}", export_as_of(matt_df, as_of)) == pd.Timestamp(as_of)
+    assert list_snapshot_dates() == [pd.Timestamp(d) for d in ('2025-07-11', '2025-07-18', '2025-07-25')]
+
+    assert resolve_snapshot_date('2025-07-10') is None
+    assert resolve_snapshot_date('2025-07-24') == pd.Timestamp('2025-07-18')
+    dataset_id, df = load_matt_snapshot('2025-12-31')
+    assert dataset_id == 'export-2025-07-25'
+    assert len(df) == 200 and df['SALE_DATE'].dtype == matt_df['SALE_DATE'].dtype
+
+    dataset_id = open_matt_snapshot('2025-07-20')
+    assert dataset_id == 'export-2025-07-18'
+    assert get_dataset(dataset_id) is not None
+
+
+def test_retention_keeps_newest_exports(matt_df, monkeypatch):
+    monkeypatch.setattr(snapshot_store, 'SNAPSHOT_STORE_MAX_EXPORTS', 2)
+    for as_of in ('2025-07-11', '2025-07-18', '2025-07-25'):
+        store_matt_snapshot(f"export-{as_of}", export_as_of(matt_df, as_of))
+    assert list_snapshot_dates() == [pd.Timestamp('2025-07-18'), pd.Timestamp('2025-07-25')]
+    # An export older than every retained one is not stored
+    assert store_matt_snapshot('export-old', export_as_of(matt_df, '2025-07-04')) is None
+    assert len(list_snapshot_dates()) == 2
+
+
+def test_other_processing_versions_are_skipped(matt_df, monkeypatch, store_path):
+    monkeypatch.setattr(snapshot_store, 'SNAPSHOT_SUFFIX', '.v0.parquet')
+    store_matt_snapshot('export-stale', export_as_of(matt_df, '2025-07-25'))
+    monkeypatch.undo()
+    monkeypatch.setattr(snapshot_store, 'STORE_PATH', str(store_path))
+
+    assert list_snapshot_dates() == []
+    assert load_matt_snapshot('2025-07-25') is None
+    assert (store_path / 'as_of=2025-07-25' / 'export-stale.v0.parquet').exists()
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+from scripts.process_matt import compute_unsold_inventory_snapshots
+from scripts.status_timeline import (
+    BACKLOG, CLOSED, MODEL, NOT_RELEASED, UNSOLD,
+    build_status_timeline, contract_changes, status_as_of, status_entries, take_timeline
+)
+
+# One homesite per row: released/sold/closed, unsold spec, model, re-sold after a
+# cancelled contract, and a cancellation with no current sale
+HOMESITES = pd.DataFrame({
+    'HS_TYPE': ['B', 'S', 'M', 'B', 'S'],
+    'REL_FOR_SALE': pd.to_datetime(['2025-01-01', '2025-01-01', '2025-01-01', None, '2025-01-01']),
+    'SALE_DATE': pd.to_datetime(['2025-02-01', None, '2025-02-01', '2025-04-01', None]),
+    'SALES_CANCELLATION_DATE': pd.to_datetime([None, None, None, '2025-03-01', '2025-03-01']),
+    'CLOSING_DATE': pd.to_datetime(['2025-05-01', None, None, None, None]),
+    'EST_COE_DATE': pd.to_datetime(['2025-05-01', '2025-06-01', '2025-06-01', '2025-06-01', '2025-06-01']),
+    'Hub': ['A'] * 5
+})
+
+
+def test_status_as_of_each_event():
+    timeline = build_status_timeline(HOMESITES)
+    expected = {
+        '2024-12-31': [NOT_RELEASED, NOT_RELEASED, MODEL, BACKLOG, NOT_RELEASED],
+        '2025-01-01': [UNSOLD, UNSOLD, MODEL, BACKLOG, UNSOLD],
+        '2025-02-01': [BACKLOG, UNSOLD, MODEL, BACKLOG, UNSOLD],
+        '2025-03-01': [BACKLOG, UNSOLD, MODEL, UNSOLD, UNSOLD],
+        '2025-04-01': [BACKLOG, UNSOLD, MODEL, BACKLOG, UNSOLD],
+        '2025-05-01': [CLOSED, UNSOLD, MODEL, BACKLOG, UNSOLD],
+    }
+    for date, statuses in expected.items():
+        np.testing.assert_array_equal(status_as_of(timeline, date), statuses, err_msg=date)
+
+
+def test_status_entries_and_contract_changes():
+    timeline = build_status_timeline(HOMESITES)
+    rows, days = status_entries(timeline, BACKLOG)
+    entries = sorted(zip(rows.tolist(), pd.to_datetime(days, unit='D')))
+    assert entries == [(0, pd.Timestamp('2025-02-01')), (3, pd.Timestamp('2025-04-01'))]
+
+    rows, days, deltas = contract_changes(timeline)
+    changes = sorted(zip(rows.tolist(), pd.to_datetime(days, unit='D'), deltas.tolist()))
+    assert changes == [
+        (0, pd.Timestamp('2025-02-01'), 1),
+        (3, pd.Timestamp('2025-03-01'), -1),
+        (3, pd.Timestamp('2025-04-01'), 1)
+    ]
+
+
+def test_take_timeline_matches_subset():
+    timeline = build_status_timeline(HOMESITES)
+    rows = np.array([1, 3, 4])
+    subset = take_timeline(timeline, rows)
+    rebuilt = build_status_timeline(HOMESITES.iloc[rows])
+    for date in ('2024-12-31', '2025-03-01', '2025-04-01'):
+        np.testing.assert_array_equal(status_as_of(subset, date), status_as_of(rebuilt, date))
+
+
+def test_cancelled_contract_counts_as_sold_until_cancelled():
+    snapshots = ['2025-02-15', '2025-03-15', '2025-04-15']
+    result = compute_unsold_inventory_snapshots(HOMESITES, 'Hub', snapshots, '2025-01-01', '2025-12-31')
+    # Rows 1, 2 (the model) and 4 are never under contract, row 3 only between its cancel and re-sale
+    assert result['Unsold'].tolist() == [3, 4, 3]
+
+
+def test_status_as_of_matches_sample_statuses(matt_df):
+    # Today's status of an ordinary homesite: closed, in backlog, or free
+    timeline = build_status_timeline(matt_df)
+    statuses = status_as_of(timeline, '2100-01-01')
+    closed = matt_df['CLOSING_DATE'].notna().to_numpy()
+    sold = matt_df['SALE_DATE'].notna().to_numpy()
+    model = matt_df['HS_TYPE'].eq('M').to_numpy(dtype=bool, na_value=False)
+    assert (statuses[model] == MODEL).all()
+    assert (statuses[~model & closed] == CLOSED).all()
+    assert (statuses[~model & ~closed & sold] == BACKLOG).all()
+    assert (statuses[~model & ~closed & ~sold] == UNSOLD).all()
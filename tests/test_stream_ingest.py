@@ -0,0 +1,55 @@
+import io
+import pandas as pd
+import pytest
+
+from scripts import snapshot_store, stream_ingest
+from scripts.delta_ingest import ROW_HASH_COLUMN, hash_matt_rows
+from scripts.snapshot_store import store_matt_snapshot
+from scripts.stream_ingest import ingest_matt_source
+
+
+@pytest.fixture(autouse=True)
+def ingest_paths(tmp_path, monkeypatch):
+    monkeypatch.setattr(stream_ingest, 'CACHE_PATH', str(tmp_path / 'cache'))
+    monkeypatch.setattr(snapshot_store, 'STORE_PATH', str(tmp_path / 'history'))
+    return tmp_path
+
+
+@pytest.fixture(scope='module')
+def expected_df(raw_matt, matt_df) -> pd.DataFrame:
+    expected = matt_df.copy()
+    expected[ROW_HASH_COLUMN] = hash_matt_rows(raw_matt)
+    return expected
+
+
+def assert_same_frame(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert list(actual.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_categorical=False)
+    for col in expected.columns:
+        if isinstance(expected[col].dtype, pd.CategoricalDtype):
+            assert list(actual[col].cat.categories) == list(expected[col].cat.categories), col
+
+
+def ingest(data: bytes, chunk_bytes: int, monkeypatch) -> pd.DataFrame:
+    monkeypatch.setattr(stream_ingest, 'INGEST_CHUNK_BYTES', chunk_bytes)
+    return ingest_matt_source(io.BytesIO(data), len(data))
+
+
+@pytest.mark.parametrize('chunk_bytes', [2 * 1024 * 1024, 64 * 1024 * 1024])
+def test_chunked_ingest_matches_whole_file(sample_bytes, expected_df, matt_df, chunk_bytes, monkeypatch, ingest_paths):
+    processed_df = ingest(sample_bytes, chunk_bytes, monkeypatch)
+    assert_same_frame(processed_df, expected_df)
+    assert processed_df.attrs['reprocessed_rows'] == len(expected_df)
+    assert processed_df.attrs['date_parse_failures'] == matt_df.attrs['date_parse_failures']
+    # The spill file is gone once the frame is built
+    assert not list(ingest_paths.glob('cache/*.tmp'))
+
+
+def test_chunked_ingest_reuses_stored_export(sample_bytes, expected_df, monkeypatch):
+    store_matt_snapshot('previous-export', expected_df)
+    next_week = sample_bytes.replace(b'AS OF 7/25/2025', b'AS OF 8/1/2025')
+    processed_df = ingest(next_week, 2 * 1024 * 1024, monkeypatch)
+    assert processed_df.attrs['reprocessed_rows'] == 0
+    expected = expected_df.copy()
+    expected['Textbox1'] = expected['Textbox1'].str.replace('7/25/2025', '8/1/2025')
+    assert_same_frame(processed_df, expected)
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scripts.process_matt import compute_snapshot_unsold_inventory, compute_unsold_inventory_snapshots
+
+SNAPSHOTS = [pd.Timestamp('2025-07-25') - pd.Timedelta(weeks=i) for i in range(51, -1, -1)]
+
+
+@pytest.fixture(scope='module')
+def sale_date_homesites(matt_df) -> pd.DataFrame:
+    # Homesites whose only contract starts at SALE_DATE, where SALE_DATE alone gives the unsold status
+    sale, close = matt_df['SALE_DATE'], matt_df['CLOSING_DATE']
+    keep = (
+        matt_df['SALES_CANCELLATION_DATE'].isna()
+        & (close.isna() | (sale.notna() & (close >= sale)))
+        & ~(matt_df['HS_TYPE'].eq('M').fillna(False) & sale.notna())
+    )
+    return matt_df[keep.to_numpy()]
+
+
+@pytest.mark.parametrize('group_col, coe_start, coe_end', [
+    ('Community Name', '2025-06-01', '2025-12-31'),
+    ('Hub', '2024-01-01', '2026-12-31'),
+])
+def test_snapshots_match_single_snapshot_calculator(sale_date_homesites, group_col, coe_start, coe_end):
+    df = sale_date_homesites
+    result = compute_unsold_inventory_snapshots(df, group_col, SNAPSHOTS[::-1], coe_start, coe_end)
+    assert len(result) == df[group_col].nunique() * len(SNAPSHOTS)
+    for snapshot in SNAPSHOTS:
+        expected = compute_snapshot_unsold_inventory(df, group_col, snapshot, coe_start, coe_end, 'Snapshot')
+        expected = expected.set_index(expected[group_col].astype(str)).sort_index()
+        actual = result[(result['Snapshot_Date'] == snapshot) & (result['Unsold'] > 0)]
+        actual = actual.set_index(actual[group_col].astype(str)).sort_index()
+        assert actual.index.tolist() == expected.index.tolist(), snapshot
+        np.testing.assert_array_equal(actual['Unsold'].to_numpy(), expected['Unsold'].to_numpy())
+        np.testing.assert_allclose(actual['Avg_Age'].to_numpy(), expected['Avg_Age'].to_numpy())
+
+
+def test_counts_and_ages_on_known_homesites():
+    df = pd.DataFrame({
+        'Hub': ['A', 'A', 'B'],
+        'HS_TYPE': ['B', 'S', 'B'],
+        'REL_FOR_SALE': pd.to_datetime(['2024-12-01'] * 3),
+        'SALE_DATE': pd.to_datetime(['2025-01-10', None, '2025-01-05']),
+        'SALES_CANCELLATION_DATE': pd.to_datetime([None] * 3),
+        'CLOSING_DATE': pd.to_datetime([None] * 3),
+        'EST_COE_DATE': pd.to_datetime(['2025-03-01', '2025-04-01', '2025-02-01'])
+    })
+    result = compute_unsold_inventory_snapshots(df, 'Hub', ['2025-01-31', '2025-01-01'], '2025-01-01', '2025-12-31')
+    result = result.set_index(['Hub', 'Snapshot_Date'])
+    assert result.loc[('A', pd.Timestamp('2025-01-01')), 'Unsold'] == 2
+    assert result.loc[('A', pd.Timestamp('2025-01-01')), 'Avg_Age'] == 74.5
+    assert result.loc[('B', pd.Timestamp('2025-01-01')), 'Avg_Age'] == 31
+    assert result.loc[('A', pd.Timestamp('2025-01-31')), 'Unsold'] == 1
+    assert result.loc[('A', pd.Timestamp('2025-01-31')), 'Avg_Age'] == 60
+    assert result.loc[('B', pd.Timestamp('2025-01-31')), 'Unsold'] == 0
+    assert np.isnan(result.loc[('B', pd.Timestamp('2025-01-31')), 'Avg_Age'])